@@ -0,0 +1,170 @@
+"""
+Асинхронные версии view аутентификации для развертывания через ASGI.
+
+Повторяют контракт login, refresh_token и profile из views.py, но не блокируют
+цикл событий: проверка пароля выполняется в ограниченном пуле (см. hashing.py),
+а обращения к базе и кэшу — через async ORM и sync_to_async.
+"""
+
+import json
+import math
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.models import TokenUser
+
+from .backends import CachedJWTAuthentication
+from .cache import get_cached_user
+from .hashing import HashingPoolSaturated, hashing_pool
+from .serializers import LoginSerializer, UserSerializer
+from .tokens import issue_tokens, rotate_refresh_token
+from telecom_backend.throttling import LoginThrottle
+
+User = get_user_model()
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    """
+    Возвращает JSON ответ в том же формате, что и DRF.
+    """
+    return JsonResponse(
+        data,
+        status=status_code,
+        encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def parse_body(request) -> dict:
+    """
+    Разбирает тело запроса в формате JSON или form-data.
+    """
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except (ValueError, UnicodeDecodeError):
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST.dict()
+
+
+@csrf_exempt
+@require_POST
+async def login(request):
+    """
+    Асинхронный endpoint авторизации пользователя.
+    
+    Пользователь загружается через async ORM, пароль проверяется в пуле.
+    Как и ModelBackend, для несуществующего пользователя выполняется
+    холостое хеширование, а неактивный пользователь не проходит проверку.
+    """
+    
+    throttle = LoginThrottle()
+    if not await sync_to_async(throttle.allow_request)(request, None):
+        wait = throttle.wait()
+        response = json_response({
+            'detail': 'Слишком много попыток входа, повторите попытку позже'
+        }, status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
+    
+    data = parse_body(request)
+    if data is None:
+        return json_response({'detail': 'Некорректное тело запроса'}, status.HTTP_400_BAD_REQUEST)
+    
+    serializer = LoginSerializer(data=data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+    
+    username = serializer.validated_data['username']
+    password = serializer.validated_data['password']
+    
+    try:
+        user = await User._default_manager.aget_by_natural_key(username)
+    except User.DoesNotExist:
+        user = None
+    
+    try:
+        valid, new_hash = await hashing_pool.verify(password, user.password if user else None)
+    except HashingPoolSaturated:
+        response = json_response({
+            'error': 'Сервис авторизации перегружен, повторите попытку позже'
+        }, status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = '1'
+        return response
+    
+    if not valid or not user.is_active:
+        return json_response({
+            'error': 'Неверные учетные данные'
+        }, status.HTTP_401_UNAUTHORIZED)
+    
+    if new_hash:
+        user.password = new_hash
+        await user.asave(update_fields=['password'])
+    
+    return json_response({
+        'message': 'Успешная авторизация',
+        'user': UserSerializer(user).data,
+        'tokens': issue_tokens(user)
+    })
+
+
+@csrf_exempt
+@require_POST
+async def refresh_token(request):
+    """
+    Асинхронный endpoint обновления access токена.
+    """
+    
+    data = parse_body(request) or {}
+    raw_token = data.get('refresh')
+    
+    if not raw_token:
+        return json_response({
+            'error': 'Refresh токен не предоставлен'
+        }, status.HTTP_400_BAD_REQUEST)
+    
+    tokens = await sync_to_async(rotate_refresh_token)(raw_token)
+    if tokens is None:
+        return json_response({
+            'error': 'Недействительный refresh токен'
+        }, status.HTTP_401_UNAUTHORIZED)
+    
+    return json_response(tokens)
+
+
+def _authenticate(request):
+    result = CachedJWTAuthentication().authenticate(request)
+    if result is None:
+        raise NotAuthenticated()
+    user, _ = result
+    if isinstance(user, TokenUser):
+        user = get_cached_user(user.id)
+    return user
+
+
+@require_GET
+async def profile(request):
+    """
+    Асинхронный endpoint профиля текущего пользователя.
+    """
+    
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except (AuthenticationFailed, NotAuthenticated) as exc:
+        detail = exc.detail if isinstance(exc.detail, dict) else {'detail': exc.detail}
+        response = json_response(detail, status.HTTP_401_UNAUTHORIZED)
+        response['WWW-Authenticate'] = CachedJWTAuthentication().authenticate_header(request)
+        return response
+    except User.DoesNotExist:
+        return json_response({'error': 'Пользователь не найден'}, status.HTTP_401_UNAUTHORIZED)
+    
+    return json_response({
+        'user': UserSerializer(user).data
+    })
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .cache import get_cached_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с кэшированием пользователя.
+    
+    Пользователь загружается из кэша по user_id и версии записи, поэтому
+    повторные запросы с тем же токеном не обращаются к таблице auth_user.
+    При JWT_CLAIMS_ONLY_SAFE_METHODS = True безопасные методы (GET, HEAD, OPTIONS)
+    аутентифицируются только по claims токена (TokenUser), без кэша и базы.
+    """
+    
+    claims_only = False
+    
+    def authenticate(self, request):
+        self.claims_only = (
+            getattr(settings, 'JWT_CLAIMS_ONLY_SAFE_METHODS', False)
+            and request.method in SAFE_METHODS
+        )
+        return super().authenticate(request)
+    
+    def get_user(self, validated_token):
+        """
+        Возвращает пользователя по токену, используя кэш.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        
+        if self.claims_only:
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+        
+        try:
+            user = get_cached_user(user_id)
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        
+        return user
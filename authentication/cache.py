@@ -0,0 +1,74 @@
+"""
+Кэширование пользователей для JWT-аутентификации.
+
+Пользователь хранится в кэше под ключом с номером версии. Версия увеличивается
+при любом изменении пользователя (смена пароля, деактивация, редактирование
+профиля, удаление), после чего старые записи кэша больше не читаются.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+from telecom_backend.metrics import CACHE_REQUESTS
+
+
+def get_user_cache_timeout() -> int:
+    """
+    Время жизни пользователя в кэше в секундах.
+    """
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+
+
+def _version_key(user_id) -> str:
+    return f'auth:user-version:{user_id}'
+
+
+def _user_key(user_id, version) -> str:
+    return f'auth:user:{user_id}:v{version}'
+
+
+def get_user_version(user_id) -> int:
+    """
+    Возвращает текущую версию записи пользователя в кэше.
+    """
+    return cache.get(_version_key(user_id), 0)
+
+
+def get_cached_user(user_id):
+    """
+    Возвращает пользователя из кэша, а при промахе загружает его из базы.
+    
+    Args:
+        user_id: Значение идентификатора пользователя из токена
+        
+    Returns:
+        User: Пользователь
+        
+    Raises:
+        User.DoesNotExist: Если пользователь не найден
+    """
+    key = _user_key(user_id, get_user_version(user_id))
+    user = cache.get(key)
+    
+    if user is None:
+        CACHE_REQUESTS.labels('user', 'miss').inc()
+        user_model = get_user_model()
+        user = user_model.objects.get(**{api_settings.USER_ID_FIELD: user_id})
+        cache.set(key, user, get_user_cache_timeout())
+    else:
+        CACHE_REQUESTS.labels('user', 'hit').inc()
+    
+    return user
+
+
+def invalidate_cached_user(user_id) -> None:
+    """
+    Инвалидирует кэш пользователя увеличением версии.
+    """
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
@@ -0,0 +1,184 @@
+"""
+Пул для проверки паролей вне цикла событий.
+
+Проверка PBKDF2 занимает ~100 мс процессорного времени, поэтому в асинхронных
+view она выполняется в ограниченном пуле потоков (или процессов). Очередь
+ожидания ограничена: при переполнении запрос отклоняется сразу, а не занимает
+память и соединение. Статистика пула (глубина очереди, выполняемые задачи,
+отказы, время ожидания) доступна через stats(), а глубина очереди и число
+выполняющихся проверок — в метриках password_hash_queue_depth и
+password_hash_in_flight.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+
+from telecom_backend.metrics import PASSWORD_HASH_IN_FLIGHT, PASSWORD_HASH_QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolSaturated(Exception):
+    """
+    Очередь пула проверки паролей заполнена.
+    """
+
+
+def _verify(password, encoded):
+    """
+    Проверяет пароль и определяет, нужно ли перехешировать его.
+    
+    Returns:
+        tuple: (пароль верен, новый хеш или None)
+    """
+    if not check_password(password, encoded):
+        return False, None
+    try:
+        must_update = identify_hasher(encoded).must_update(encoded)
+    except ValueError:
+        must_update = False
+    return True, make_password(password) if must_update else None
+
+
+def _timed(func, *args):
+    """
+    Выполняет функцию в пуле и возвращает момент начала выполнения.
+    """
+    return time.monotonic(), func(*args)
+
+
+def _dummy_hash(password):
+    """
+    Выполняет хеширование для несуществующего пользователя (защита от атак по времени).
+    """
+    make_password(password)
+    return False, None
+
+
+class PasswordHashingPool:
+    """
+    Ограниченный пул для проверки паролей.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._queued = 0
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'max_queue_depth': 0,
+            'wait_seconds_total': 0.0,
+            'hash_seconds_total': 0.0,
+        }
+    
+    @property
+    def max_workers(self) -> int:
+        return getattr(settings, 'AUTH_HASHING_WORKERS', 4)
+    
+    @property
+    def max_queue(self) -> int:
+        return getattr(settings, 'AUTH_HASHING_MAX_QUEUE', 64)
+    
+    def _get_executor(self):
+        if self._executor is None:
+            if getattr(settings, 'AUTH_HASHING_EXECUTOR', 'thread') == 'process':
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='password-hashing'
+                )
+        return self._executor
+    
+    async def verify(self, password: str, encoded: str | None):
+        """
+        Проверяет пароль в пуле.
+        
+        Args:
+            password (str): Введенный пароль
+            encoded (str | None): Хеш пароля пользователя или None, если пользователь не найден
+            
+        Returns:
+            tuple: (пароль верен, новый хеш или None)
+            
+        Raises:
+            HashingPoolSaturated: Если очередь ожидания заполнена
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._stats['rejected'] += 1
+                logger.warning('Очередь проверки паролей заполнена (%s)', self._queued)
+                raise HashingPoolSaturated()
+            self._queued += 1
+            self._publish()
+            self._stats['submitted'] += 1
+            self._stats['max_queue_depth'] = max(self._stats['max_queue_depth'], self._queued)
+            executor = self._get_executor()
+        
+        submitted_at = time.monotonic()
+        if encoded is None:
+            future = executor.submit(_timed, _dummy_hash, password)
+        else:
+            future = executor.submit(_timed, _verify, password, encoded)
+        
+        try:
+            started_at, result = await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                self._queued -= 1
+                self._publish()
+        
+        finished_at = time.monotonic()
+        with self._lock:
+            self._stats['completed'] += 1
+            self._stats['wait_seconds_total'] += started_at - submitted_at
+            self._stats['hash_seconds_total'] += finished_at - started_at
+        
+        return result
+    
+    def queue_depth(self) -> int:
+        """
+        Количество проверок, ожидающих или выполняющихся в пуле.
+        """
+        return self._queued
+    
+    def in_flight(self) -> int:
+        """
+        Количество выполняющихся проверок: пул берет не больше max_workers задач.
+        """
+        return min(self._queued, self.max_workers)
+    
+    def _publish(self) -> None:
+        # Вызывается под self._lock при каждом изменении очереди
+        PASSWORD_HASH_QUEUE_DEPTH.set(self._queued)
+        PASSWORD_HASH_IN_FLIGHT.set(self.in_flight())
+    
+    def stats(self) -> dict:
+        """
+        Возвращает статистику пула.
+        """
+        with self._lock:
+            return {
+                **self._stats,
+                'queue_depth': self._queued,
+                'in_flight': self.in_flight(),
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+            }
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+hashing_pool = PasswordHashingPool()
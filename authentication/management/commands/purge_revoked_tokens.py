@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from authentication.revocation import revocation_store
+
+
+class Command(BaseCommand):
+    """
+    Команда для удаления отозванных токенов с истекшим сроком действия.
+    """
+    
+    help = 'Удаляет порциями отозванные refresh токены с истекшим сроком действия'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество записей в одной порции (по умолчанию 1000)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Пауза между порциями в секундах',
+        )
+    
+    def handle(self, *args, **options):
+        if options['batch_size'] <= 0:
+            raise CommandError('--batch-size должен быть положительным')
+        
+        deleted = revocation_store.purge_expired(
+            batch_size=options['batch_size'],
+            sleep=options['sleep']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Удалено записей: {deleted}'))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.1 on 2026-10-19 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevokedToken',
+            fields=[
+                ('jti', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Идентификатор токена (jti)')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='Срок действия токена')),
+            ],
+            options={
+                'verbose_name': 'Отозванный токен',
+                'verbose_name_plural': 'Отозванные токены',
+                'db_table': 'auth_revoked_tokens',
+            },
+        ),
+    ]
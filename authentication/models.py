@@ -1,3 +1,28 @@
 from django.db import models
 
-# Create your models here.
+
+class RevokedToken(models.Model):
+    """
+    Отозванный refresh токен.
+    
+    Хранит только jti и срок действия токена; записи с истекшим сроком
+    удаляются командой purge_revoked_tokens.
+    """
+    
+    jti = models.CharField(
+        max_length=64,
+        primary_key=True,
+        verbose_name="Идентификатор токена (jti)"
+    )
+    expires_at = models.DateTimeField(
+        db_index=True,
+        verbose_name="Срок действия токена"
+    )
+    
+    class Meta:
+        db_table = 'auth_revoked_tokens'
+        verbose_name = "Отозванный токен"
+        verbose_name_plural = "Отозванные токены"
+    
+    def __str__(self) -> str:
+        return str(self.jti)
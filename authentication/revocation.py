@@ -0,0 +1,220 @@
+"""
+Хранилище отозванных refresh токенов.
+
+Источник истины — компактная таблица RevokedToken (jti и срок действия).
+Каждый процесс держит в памяти фильтр Блума по отозванным jti, поэтому
+проверка неотозванного токена (обычный случай) выполняется за O(1)
+без обращения к базе. Новые отзывы распространяются между процессами через
+журнал в общем кэше: атомарный счетчик и записи журнала по номерам.
+При положительном ответе фильтра или недоступном журнале токен проверяется в базе.
+
+Журнал работает только в кэше, общем для всех процессов (Redis). С локальным
+кэшем процесса (LocMemCache, DummyCache) отзыв в одном воркере не виден
+остальным, поэтому каждая проверка идет в базу.
+"""
+
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+SEQUENCE_KEY = 'auth:revoked:seq'
+JOURNAL_KEY = 'auth:revoked:journal:{}'
+
+
+def is_shared_cache() -> bool:
+    """
+    Проверяет, что кэш по умолчанию общий для процессов.
+    """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+class BloomFilter:
+    """
+    Фильтр Блума фиксированного размера.
+    
+    Не дает ложноотрицательных ответов; доля ложноположительных
+    определяется параметром error_rate при заполнении до capacity.
+    """
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+    
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationStore:
+    """
+    Проверка и отзыв refresh токенов по jti.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._sequence = None
+        self._built_at = 0.0
+    
+    @property
+    def capacity(self) -> int:
+        return getattr(settings, 'JWT_REVOCATION_BLOOM_CAPACITY', 100000)
+    
+    @property
+    def rebuild_interval(self) -> int:
+        return getattr(settings, 'JWT_REVOCATION_REBUILD_INTERVAL', 3600)
+    
+    @property
+    def journal_timeout(self) -> int:
+        return getattr(settings, 'JWT_REVOCATION_JOURNAL_TIMEOUT', 86400)
+    
+    def is_revoked(self, jti: str) -> bool:
+        """
+        Проверяет, отозван ли токен.
+        
+        Returns:
+            bool: True если токен отозван
+        """
+        with self._lock:
+            synced = self._sync()
+            maybe_revoked = synced and jti in self._bloom
+        
+        if synced and not maybe_revoked:
+            return False
+        
+        return RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).exists()
+    
+    def revoke(self, jti: str, expires_at) -> bool:
+        """
+        Отзывает токен до истечения его срока действия.
+        
+        Запись только вставляется, поэтому из нескольких одновременных
+        отзывов одного токена успешен ровно один.
+        
+        Returns:
+            bool: False если токен уже был отозван
+        """
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+        except IntegrityError:
+            return False
+        
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+        
+        cache.add(SEQUENCE_KEY, 0, None)
+        try:
+            sequence = cache.incr(SEQUENCE_KEY)
+        except ValueError:
+            # Счетчик вытеснен между add и incr (или кэш не хранит данные):
+            # процессы не найдут запись журнала и перестроят фильтр из базы
+            return True
+        cache.set(JOURNAL_KEY.format(sequence), jti, self.journal_timeout)
+        return True
+    
+    def purge_expired(self, batch_size: int = 1000, sleep: float = 0) -> int:
+        """
+        Удаляет записи с истекшим сроком действия порциями.
+        
+        Returns:
+            int: Количество удаленных записей
+        """
+        now = timezone.now()
+        deleted_total = 0
+        
+        while True:
+            batch = list(
+                RevokedToken.objects.filter(expires_at__lte=now)
+                .values_list('jti', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            deleted, _ = RevokedToken.objects.filter(jti__in=batch).delete()
+            deleted_total += deleted
+            if sleep:
+                time.sleep(sleep)
+        
+        return deleted_total
+    
+    def warm_up(self) -> None:
+        """
+        Строит локальный фильтр заранее, чтобы первый запрос не платил за это.
+        """
+        with self._lock:
+            self._sync()
+    
+    def reset(self) -> None:
+        """
+        Сбрасывает локальный фильтр; он будет перестроен при следующей проверке.
+        """
+        with self._lock:
+            self._bloom = None
+            self._sequence = None
+    
+    def _sync(self) -> bool:
+        """
+        Применяет к локальному фильтру новые записи журнала.
+        
+        Returns:
+            bool: True если фильтр гарантированно содержит все отзывы
+        """
+        if not is_shared_cache():
+            return False
+        
+        sequence = cache.get(SEQUENCE_KEY)
+        if sequence is None:
+            cache.add(SEQUENCE_KEY, 0, None)
+            sequence = cache.get(SEQUENCE_KEY)
+        
+        expired = time.monotonic() - self._built_at > self.rebuild_interval
+        if self._bloom is None or self._sequence is None or sequence is None or expired:
+            self._rebuild(sequence)
+            return sequence is not None
+        
+        if sequence > self._sequence:
+            keys = [JOURNAL_KEY.format(number) for number in range(self._sequence + 1, sequence + 1)]
+            entries = cache.get_many(keys)
+            if len(entries) != len(keys):
+                self._rebuild(sequence)
+                return True
+            for jti in entries.values():
+                self._bloom.add(jti)
+            self._sequence = sequence
+        
+        return True
+    
+    def _rebuild(self, sequence) -> None:
+        bloom = BloomFilter(self.capacity)
+        active = RevokedToken.objects.filter(expires_at__gt=timezone.now())
+        for jti in active.values_list('jti', flat=True).iterator(chunk_size=5000):
+            bloom.add(jti)
+        self._bloom = bloom
+        self._sequence = sequence
+        self._built_at = time.monotonic()
+
+
+revocation_store = RevocationStore()
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import invalidate_cached_user
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """
+    Сбрасывает кэш пользователя при изменении или удалении записи.
+    
+    Обновление только last_login кэш не сбрасывает. Версия увеличивается после
+    фиксации транзакции: иначе параллельный запрос успел бы закэшировать старую
+    строку под новой версией.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    
+    user_id = getattr(instance, api_settings.USER_ID_FIELD)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id), using=kwargs.get('using'))
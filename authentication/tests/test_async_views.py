@@ -0,0 +1,173 @@
+"""
+Тесты асинхронных view аутентификации.
+Покрывают вход с проверкой пароля в пуле, обновление токена и профиль.
+"""
+
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncRequestFactory
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication import async_views
+from authentication.hashing import hashing_pool
+from tests.factories import UserFactory
+
+
+def call(view, request):
+    response = async_to_sync(view)(request)
+    return response, json.loads(response.content)
+
+
+def post(view, path, data):
+    request = AsyncRequestFactory().post(path, data=json.dumps(data), content_type='application/json')
+    return call(view, request)
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestAsyncLogin:
+    """Тесты асинхронного входа."""
+    
+    def test_successful_login(self):
+        """Тест успешного входа."""
+        user = UserFactory(username='asyncuser', password='secret-pass-1')
+        
+        response, data = post(async_views.login, '/api/user/login/', {
+            'username': 'asyncuser',
+            'password': 'secret-pass-1'
+        })
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert data['user']['id'] == user.id
+        assert 'access' in data['tokens']
+        assert 'refresh' in data['tokens']
+    
+    @pytest.mark.parametrize('username, password', [
+        ('asyncuser', 'wrong-password'),
+        ('nonexistent', 'secret-pass-1'),
+    ])
+    def test_invalid_credentials(self, username, password):
+        """Тест входа с неверными учетными данными."""
+        UserFactory(username='asyncuser', password='secret-pass-1')
+        
+        response, data = post(async_views.login, '/api/user/login/', {
+            'username': username,
+            'password': password
+        })
+        
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert data['error'] == 'Неверные учетные данные'
+    
+    def test_inactive_user(self):
+        """Тест входа неактивного пользователя."""
+        UserFactory(username='asyncuser', password='secret-pass-1', is_active=False)
+        
+        response, _ = post(async_views.login, '/api/user/login/', {
+            'username': 'asyncuser',
+            'password': 'secret-pass-1'
+        })
+        
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_validation_errors(self):
+        """Тест ошибок валидации в формате DRF."""
+        response, data = post(async_views.login, '/api/user/login/', {'username': ''})
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'username' in data
+        assert 'password' in data
+    
+    def test_pool_saturated(self, settings):
+        """Тест отказа при заполненной очереди проверки паролей."""
+        settings.AUTH_HASHING_MAX_QUEUE = 0
+        UserFactory(username='asyncuser', password='secret-pass-1')
+        rejected = hashing_pool.stats()['rejected']
+        
+        response, _ = post(async_views.login, '/api/user/login/', {
+            'username': 'asyncuser',
+            'password': 'secret-pass-1'
+        })
+        
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response['Retry-After'] == '1'
+        assert hashing_pool.stats()['rejected'] == rejected + 1
+    
+    def test_throttled(self, settings):
+        """Тест ограничения частоты попыток входа."""
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'async-login-throttle',
+            }
+        }
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'login': '1/min'},
+        }
+        
+        post(async_views.login, '/api/user/login/', {'username': 'x', 'password': 'y'})
+        response, data = post(async_views.login, '/api/user/login/', {'username': 'x', 'password': 'y'})
+        
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) > 0
+        assert 'detail' in data
+    
+    def test_pool_stats(self):
+        """Тест статистики пула проверки паролей."""
+        UserFactory(username='asyncuser', password='secret-pass-1')
+        completed = hashing_pool.stats()['completed']
+        
+        post(async_views.login, '/api/user/login/', {
+            'username': 'asyncuser',
+            'password': 'secret-pass-1'
+        })
+        
+        stats = hashing_pool.stats()
+        assert stats['completed'] == completed + 1
+        assert stats['queue_depth'] == 0
+        assert stats['max_queue_depth'] >= 1
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestAsyncRefreshAndProfile:
+    """Тесты асинхронного обновления токена и профиля."""
+    
+    def test_refresh(self):
+        """Тест обновления access токена."""
+        refresh = RefreshToken.for_user(UserFactory())
+        
+        response, data = post(async_views.refresh_token, '/api/user/refresh/', {'refresh': str(refresh)})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert 'access' in data
+    
+    def test_refresh_invalid(self):
+        """Тест обновления с недействительным токеном."""
+        response, data = post(async_views.refresh_token, '/api/user/refresh/', {'refresh': 'invalid'})
+        
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_profile(self):
+        """Тест получения профиля по access токену."""
+        user = UserFactory()
+        token = RefreshToken.for_user(user).access_token
+        request = AsyncRequestFactory().get('/api/user/profile/', headers={'Authorization': f'Bearer {token}'})
+        
+        response, data = call(async_views.profile, request)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert data['user']['username'] == user.username
+    
+    def test_profile_without_token(self):
+        """Тест профиля без токена."""
+        request = AsyncRequestFactory().get('/api/user/profile/')
+        
+        response, data = call(async_views.profile, request)
+        
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert 'detail' in data
+        assert 'WWW-Authenticate' in response
@@ -0,0 +1,167 @@
+"""
+Тесты хранилища отозванных refresh токенов.
+Покрывают ротацию токенов, фильтр Блума и очистку истекших записей.
+"""
+
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.models import RevokedToken
+from authentication.revocation import BloomFilter, revocation_store
+from tests.factories import UserFactory
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    # Файловый кэш общий для процессов, в отличие от LocMemCache
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'cache'),
+        }
+    }
+    settings.SIMPLE_JWT = {**settings.SIMPLE_JWT, 'BLACKLIST_AFTER_ROTATION': True}
+    cache.clear()
+    revocation_store.reset()
+    yield cache
+    cache.clear()
+    revocation_store.reset()
+
+
+class TestBloomFilter:
+    """Тесты фильтра Блума."""
+    
+    def test_no_false_negatives(self):
+        """Тест что добавленные элементы всегда находятся."""
+        bloom = BloomFilter(capacity=1000)
+        items = [f'jti-{i}' for i in range(1000)]
+        for item in items:
+            bloom.add(item)
+        
+        assert all(item in bloom for item in items)
+    
+    def test_false_positive_rate(self):
+        """Тест доли ложноположительных ответов."""
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        assert false_positives < 300
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestRefreshRotation:
+    """Тесты ротации и отзыва refresh токенов."""
+    
+    url = reverse('authentication:refresh')
+    
+    def test_rotation_revokes_previous_token(self, api_client, shared_cache):
+        """Тест что после ротации старый refresh токен недействителен."""
+        refresh = str(RefreshToken.for_user(UserFactory()))
+        
+        response = api_client.post(self.url, {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+        assert 'access' in response.data
+        assert response.data['refresh'] != refresh
+        
+        response = api_client.post(self.url, {'refresh': refresh}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_new_token_checked_without_db(self, api_client, shared_cache):
+        """Тест что проверка неотозванного токена не обращается к базе."""
+        user = UserFactory()
+        api_client.post(self.url, {'refresh': str(RefreshToken.for_user(user))}, format='json')
+        
+        refresh = RefreshToken.for_user(user)
+        with CaptureQueriesContext(connection) as ctx:
+            assert not revocation_store.is_revoked(refresh['jti'])
+        
+        assert ctx.captured_queries == []
+    
+    def test_revocation_visible_to_other_process(self, shared_cache):
+        """Тест что отзыв распространяется через журнал в кэше."""
+        revocation_store.is_revoked('warmup')
+        other_store = type(revocation_store)()
+        other_store.is_revoked('warmup')
+        
+        revocation_store.revoke('revoked-jti', timezone.now() + timedelta(days=1))
+        
+        assert other_store.is_revoked('revoked-jti')
+    
+    def test_local_cache_checks_database(self, settings):
+        """Тест что с локальным кэшем процесса отзыв проверяется в базе."""
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'revocation-local',
+            }
+        }
+        revocation_store.reset()
+        revocation_store.is_revoked('warmup')
+        
+        with CaptureQueriesContext(connection) as ctx:
+            assert not revocation_store.is_revoked('other-jti')
+        
+        assert len(ctx.captured_queries) == 1
+        revocation_store.reset()
+    
+    def test_revoke_is_insert_only(self, shared_cache):
+        """Тест что повторный отзыв того же токена не проходит."""
+        expires_at = timezone.now() + timedelta(days=1)
+        
+        assert revocation_store.revoke('jti', expires_at)
+        assert not revocation_store.revoke('jti', expires_at)
+    
+    def test_journal_created_on_first_revoke(self, shared_cache):
+        """Тест что первый отзыв создает счетчик журнала."""
+        revocation_store.revoke('first-jti', timezone.now() + timedelta(days=1))
+        
+        assert cache.get('auth:revoked:seq') == 1
+        assert cache.get('auth:revoked:journal:1') == 'first-jti'
+    
+    def test_concurrent_refresh_rejected(self, api_client, shared_cache, monkeypatch):
+        """Тест что из двух одновременных обновлений одного токена проходит одно."""
+        refresh = RefreshToken.for_user(UserFactory())
+        # Оба запроса прошли проверку is_revoked до отзыва токена другим
+        monkeypatch.setattr(revocation_store, 'is_revoked', lambda jti: False)
+        
+        first = api_client.post(self.url, {'refresh': str(refresh)}, format='json')
+        second = api_client.post(self.url, {'refresh': str(refresh)}, format='json')
+        
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_invalid_refresh_token(self, api_client):
+        """Тест обновления с недействительным токеном."""
+        response = api_client.post(self.url, {'refresh': 'invalid'}, format='json')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestPurgeRevokedTokens:
+    """Тесты очистки истекших записей."""
+    
+    def test_purge_expired_in_batches(self):
+        """Тест что удаляются только истекшие записи."""
+        now = timezone.now()
+        RevokedToken.objects.bulk_create(
+            [RevokedToken(jti=f'old-{i}', expires_at=now - timedelta(hours=1)) for i in range(5)]
+            + [RevokedToken(jti='fresh', expires_at=now + timedelta(hours=1))]
+        )
+        
+        out = StringIO()
+        call_command('purge_revoked_tokens', batch_size=2, stdout=out)
+        
+        assert 'Удалено записей: 5' in out.getvalue()
+        assert list(RevokedToken.objects.values_list('jti', flat=True)) == ['fresh']
@@ -0,0 +1,141 @@
+"""
+Тесты кэширования пользователей при JWT-аутентификации.
+Покрывают отсутствие запросов к auth_user, инвалидацию и режим claims-only.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.cache import get_user_version
+from tests.factories import UserFactory
+
+LOCMEM_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'user-cache-tests',
+    }
+}
+
+
+def auth_user_queries(ctx):
+    return [query for query in ctx.captured_queries if 'auth_user' in query['sql']]
+
+
+@pytest.fixture
+def cached_client(api_client, settings):
+    settings.CACHES = LOCMEM_CACHE
+    cache.clear()
+    user = UserFactory()
+    refresh = RefreshToken.for_user(user)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+    api_client.user = user
+    yield api_client
+    cache.clear()
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestCachedUserResolution:
+    """Тесты кэширования пользователя."""
+    
+    url = reverse('equipment:equipment-list-create')
+    
+    def test_second_request_skips_auth_user(self, cached_client):
+        """Тест что повторный запрос не обращается к auth_user."""
+        cached_client.get(self.url)
+        
+        with CaptureQueriesContext(connection) as ctx:
+            response = cached_client.get(self.url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert auth_user_queries(ctx) == []
+    
+    def test_profile_edit_invalidates_cache(self, cached_client, django_capture_on_commit_callbacks):
+        """Тест что изменение профиля сбрасывает кэш."""
+        profile_url = reverse('authentication:profile')
+        cached_client.get(profile_url)
+        
+        user = cached_client.user
+        user.first_name = 'Changed'
+        with django_capture_on_commit_callbacks(execute=True):
+            user.save()
+        
+        response = cached_client.get(profile_url)
+        assert response.data['user']['first_name'] == 'Changed'
+    
+    def test_deactivation_rejects_cached_user(self, cached_client, django_capture_on_commit_callbacks):
+        """Тест что деактивированный пользователь не проходит аутентификацию."""
+        cached_client.get(self.url)
+        
+        user = cached_client.user
+        user.is_active = False
+        with django_capture_on_commit_callbacks(execute=True):
+            user.save()
+        
+        response = cached_client.get(self.url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    def test_password_change_invalidates_cache(self, cached_client, django_capture_on_commit_callbacks):
+        """Тест что смена пароля сбрасывает кэш."""
+        cached_client.get(self.url)
+        
+        user = cached_client.user
+        user.set_password('new-password-123')
+        with django_capture_on_commit_callbacks(execute=True):
+            user.save()
+        
+        with CaptureQueriesContext(connection) as ctx:
+            cached_client.get(self.url)
+        
+        assert len(auth_user_queries(ctx)) == 1
+    
+    def test_invalidation_waits_for_commit(self, cached_client, django_capture_on_commit_callbacks):
+        """Тест что версия кэша увеличивается только после фиксации транзакции."""
+        user = cached_client.user
+        version = get_user_version(user.pk)
+        
+        with django_capture_on_commit_callbacks(execute=True):
+            user.is_active = False
+            user.save()
+            assert get_user_version(user.pk) == version
+        
+        assert get_user_version(user.pk) == version + 1
+    
+    def test_deleted_user_rejected(self, cached_client, django_capture_on_commit_callbacks):
+        """Тест что удаленный пользователь не проходит аутентификацию."""
+        cached_client.get(self.url)
+        with django_capture_on_commit_callbacks(execute=True):
+            cached_client.user.delete()
+        
+        response = cached_client.get(self.url)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestClaimsOnlyMode:
+    """Тесты режима аутентификации только по claims."""
+    
+    @pytest.fixture(autouse=True)
+    def claims_only(self, settings):
+        settings.JWT_CLAIMS_ONLY_SAFE_METHODS = True
+    
+    def test_get_without_auth_queries(self, cached_client):
+        """Тест что GET не выполняет запросов к auth_user даже при пустом кэше."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = cached_client.get(reverse('equipment:equipment-list-create'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert auth_user_queries(ctx) == []
+    
+    def test_profile_returns_full_user(self, cached_client):
+        """Тест что профиль возвращает полные данные пользователя."""
+        response = cached_client.get(reverse('authentication:profile'))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['user']['username'] == cached_client.user.username
@@ -0,0 +1,53 @@
+from rest_framework_simplejwt import settings as jwt_settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .revocation import revocation_store
+
+
+def issue_tokens(user) -> dict:
+    """
+    Выпускает пару access и refresh токенов для пользователя.
+    """
+    refresh = RefreshToken.for_user(user)
+    return {
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+    }
+
+
+def rotate_refresh_token(raw_token: str):
+    """
+    Выпускает новый access токен по refresh токену.
+    
+    При ROTATE_REFRESH_TOKENS выдает новый refresh токен, а при
+    BLACKLIST_AFTER_ROTATION отзывает предыдущий.
+    
+    Returns:
+        dict | None: Новые токены или None, если refresh токен недействителен
+    """
+    try:
+        refresh = RefreshToken(raw_token)
+    except TokenError:
+        return None
+    
+    api_settings = jwt_settings.api_settings
+    jti = refresh[api_settings.JTI_CLAIM]
+    if revocation_store.is_revoked(jti):
+        return None
+    
+    if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+        # Одновременные обновления одного токена: успешно только первое
+        if not revocation_store.revoke(jti, expires_at=datetime_from_epoch(refresh['exp'])):
+            return None
+    
+    data = {'access': str(refresh.access_token)}
+    
+    if api_settings.ROTATE_REFRESH_TOKENS:
+        refresh.set_jti()
+        refresh.set_exp()
+        refresh.set_iat()
+        data['refresh'] = str(refresh)
+    
+    return data
@@ -1,6 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if getattr(settings, 'AUTH_ASYNC_VIEWS', False):
+    # Асинхронные версии для развертывания через ASGI (telecom_backend.asgi)
+    from . import async_views as views
+
 app_name = 'authentication'
 
 urlpatterns = [
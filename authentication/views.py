@@ -1,16 +1,20 @@
 from django.shortcuts import render
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.models import TokenUser
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from .cache import get_cached_user
 from .serializers import LoginSerializer, UserSerializer
+from .tokens import issue_tokens, rotate_refresh_token
+from telecom_backend.throttling import LoginThrottle
 
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def login(request):
     """
     API endpoint для авторизации пользователя и получения JWT токена.
@@ -36,17 +40,12 @@ def login(request):
             'error': 'Аккаунт пользователя деактивирован'
         }, status=status.HTTP_401_UNAUTHORIZED)
     
-    refresh = RefreshToken.for_user(user)
-    
     user_serializer = UserSerializer(user)
     
     return Response({
         'message': 'Успешная авторизация',
         'user': user_serializer.data,
-        'tokens': {
-            'access': str(refresh.access_token),
-            'refresh': str(refresh),
-        }
+        'tokens': issue_tokens(user)
     }, status=status.HTTP_200_OK)
 
 
@@ -55,6 +54,9 @@ def login(request):
 def refresh_token(request):
     """
     API endpoint для обновления access токена с помощью refresh токена.
+    
+    При ROTATE_REFRESH_TOKENS выдает новый refresh токен, а при
+    BLACKLIST_AFTER_ROTATION отзывает предыдущий.
     """
     
     refresh_token = request.data.get('refresh')
@@ -64,15 +66,13 @@ def refresh_token(request):
             'error': 'Refresh токен не предоставлен'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    try:
-        refresh = RefreshToken(refresh_token)
-        return Response({
-            'access': str(refresh.access_token),
-        }, status=status.HTTP_200_OK)
-    except Exception:
+    tokens = rotate_refresh_token(refresh_token)
+    if tokens is None:
         return Response({
             'error': 'Недействительный refresh токен'
         }, status=status.HTTP_401_UNAUTHORIZED)
+    
+    return Response(tokens, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
@@ -81,7 +81,17 @@ def profile(request):
     API endpoint для получения профиля текущего пользователя.
     """
     
-    user_serializer = UserSerializer(request.user)
+    user = request.user
+    if isinstance(user, TokenUser):
+        # В режиме claims-only пользователь не загружен — берем его из кэша
+        try:
+            user = get_cached_user(user.id)
+        except User.DoesNotExist:
+            return Response({
+                'error': 'Пользователь не найден'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+    
+    user_serializer = UserSerializer(user)
     
     return Response({
         'user': user_serializer.data
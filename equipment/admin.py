@@ -1,7 +1,104 @@
 from django.contrib import admin
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Count, Q
+from django.utils.functional import cached_property
 from django import forms
-from .models import EquipmentType, Equipment
+from .models import EquipmentType, Equipment, ArchivedEquipment
+
+
+def high_volume_mode() -> bool:
+    """
+    Включен ли режим административной панели для больших объемов данных.
+    """
+    return getattr(settings, 'EQUIPMENT_ADMIN_HIGH_VOLUME', True)
+
+
+def estimate_row_count(model, using='default'):
+    """
+    Возвращает оценку количества строк таблицы по статистике СУБД.
+    
+    Args:
+        model: Модель, для таблицы которой нужна оценка
+        using (str): Алиас базы данных
+        
+    Returns:
+        int | None: Оценка количества строк или None, если статистика недоступна
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    
+    if connection.vendor == 'mysql':
+        sql = (
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+        )
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+    elif connection.vendor == 'sqlite':
+        sql = 'SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    else:
+        return None
+    
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор, использующий оценку количества строк для нефильтрованных выборок.
+    
+    Точный COUNT(*) выполняется только для отфильтрованных списков
+    и для небольших таблиц (меньше exact_count_threshold строк).
+    """
+    
+    exact_count_threshold = 10000
+    
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        query = getattr(object_list, 'query', None)
+        
+        if query is not None and not query.where:
+            estimate = estimate_row_count(object_list.model, using=object_list.db)
+            if estimate is not None and estimate >= self.exact_count_threshold:
+                return estimate
+        
+        return super().count
+
+
+class DeletedStatusFilter(admin.SimpleListFilter):
+    """
+    Фильтр по статусу мягкого удаления.
+    
+    В отличие от фильтра по дате удаления не строит список дат по всей таблице.
+    """
+    
+    title = 'Статус'
+    parameter_name = 'status'
+    
+    def lookups(self, request, model_admin):
+        return (
+            ('active', 'Активные'),
+            ('deleted', 'Удаленные'),
+        )
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'active':
+            return queryset.filter(deleted_at__isnull=True)
+        if self.value() == 'deleted':
+            return queryset.filter(deleted_at__isnull=False)
+        return queryset
 
 
 class EquipmentAdminForm(forms.ModelForm):
@@ -75,13 +172,27 @@ class EquipmentTypeAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
     ordering = ['name']
     
+    def get_queryset(self, request):
+        """
+        Возвращает QuerySet с аннотированным количеством активного оборудования.
+        """
+        return super().get_queryset(request).annotate(
+            _equipment_count=Count(
+                'equipment',
+                filter=Q(equipment__deleted_at__isnull=True)
+            )
+        )
+    
     def equipment_count(self, obj):
         """
         Возвращает количество единиц оборудования данного типа.
         """
+        if hasattr(obj, '_equipment_count'):
+            return obj._equipment_count
         return obj.equipment.count()
     
     equipment_count.short_description = 'Количество оборудования'
+    equipment_count.admin_order_field = '_equipment_count'
 
 
 @admin.register(Equipment)
@@ -109,7 +220,9 @@ class EquipmentAdmin(admin.ModelAdmin):
     search_fields = ['serial_number', 'note', 'equipment_type__name']
     readonly_fields = ['created_at', 'updated_at', 'deleted_at']
     ordering = ['-created_at']
-    raw_id_fields = ['equipment_type']
+    autocomplete_fields = ['equipment_type']
+    list_select_related = ['equipment_type']
+    date_hierarchy = 'created_at'
     
     fieldsets = (
         ('Основная информация', {
@@ -147,6 +260,36 @@ class EquipmentAdmin(admin.ModelAdmin):
         """
         return Equipment.all_objects.select_related('equipment_type')
     
+    def get_list_filter(self, request):
+        """
+        В режиме больших объемов оставляет только фильтры, опирающиеся на индексы.
+        """
+        if high_volume_mode():
+            return ['equipment_type', DeletedStatusFilter]
+        return super().get_list_filter(request)
+    
+    def get_search_fields(self, request):
+        """
+        В режиме больших объемов ищет только по префиксу серийного номера.
+        """
+        if high_volume_mode():
+            return ['^serial_number']
+        return super().get_search_fields(request)
+    
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        """
+        В режиме больших объемов использует оценку количества строк.
+        """
+        paginator_class = EstimatedCountPaginator if high_volume_mode() else Paginator
+        return paginator_class(queryset, per_page, orphans, allow_empty_first_page)
+    
+    @property
+    def show_full_result_count(self):
+        """
+        Полный подсчет записей отключается в режиме больших объемов.
+        """
+        return not high_volume_mode()
+    
     actions = ['soft_delete_selected', 'restore_selected']
     
     def soft_delete_selected(self, request, queryset):
@@ -176,3 +319,38 @@ class EquipmentAdmin(admin.ModelAdmin):
         self.message_user(request, f'Восстановлено {count} записей.')
     
     restore_selected.short_description = 'Восстановить выбранные записи'
+
+
+@admin.register(ArchivedEquipment)
+class ArchivedEquipmentAdmin(admin.ModelAdmin):
+    """
+    Админ панель для архива удаленного оборудования (только просмотр и восстановление).
+    """
+    
+    list_display = ['id', 'equipment_type', 'serial_number', 'deleted_at', 'archived_at']
+    list_select_related = ['equipment_type']
+    search_fields = ['^serial_number']
+    ordering = ['-deleted_at']
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    
+    actions = ['restore_selected']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def restore_selected(self, request, queryset):
+        """
+        Возвращение выбранных записей в основную таблицу.
+        """
+        count = 0
+        for obj in queryset:
+            obj.restore()
+            count += 1
+        
+        self.message_user(request, f'Восстановлено {count} записей.')
+    
+    restore_selected.short_description = 'Восстановить выбранные записи'
@@ -0,0 +1,200 @@
+"""
+Асинхронные версии view оборудования для развертывания через ASGI.
+
+Список, детальная запись, статистика и восстановление читают базу через
+async ORM (acount, aget, асинхронная итерация), поэтому ожидание базы не
+занимает поток. Аутентификация, права, throttling и разбор фильтров
+выполняются теми же классами DRF, что и в views.py, одним переходом в
+sync_to_async; ответы и ошибки совпадают с синхронными view.
+
+Методы, которые не обрабатываются асинхронно (создание, изменение,
+удаление), передаются синхронным view из views.py.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage
+from django.db import IntegrityError
+from django.db.models import Count, Q
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound
+
+from authentication.async_views import json_response
+from . import views
+from .models import ArchivedEquipment, Equipment, EquipmentType
+from .serializers import EquipmentSerializer
+
+
+def _render(response):
+    response.render()
+    return response
+
+
+def _initial(view_class, request, kwargs):
+    """
+    Создает DRF view и выполняет аутентификацию, проверку прав и throttling.
+
+    Returns:
+        tuple: (view, ответ об ошибке или None)
+    """
+    view = view_class()
+    view.args = ()
+    view.kwargs = kwargs
+    view.request = view.initialize_request(request, **kwargs)
+    view.headers = view.default_response_headers
+    try:
+        view.initial(view.request, **kwargs)
+    except Exception as exc:
+        return view, _error(view, exc)
+    return view, None
+
+
+def _error(view, exc):
+    response = view.handle_exception(exc)
+    return _render(view.finalize_response(view.request, response))
+
+
+def async_api_view(sync_view, methods=('GET',)):
+    """
+    Декоратор асинхронного view с семантикой DRF view sync_view.
+
+    Обрабатывает methods асинхронно, остальные методы передает sync_view.
+    Декорируемая функция получает подготовленный DRF view.
+    """
+    view_class = getattr(sync_view, 'cls', sync_view)
+    sync_callable = getattr(sync_view, 'as_view', lambda: sync_view)()
+
+    def decorator(func):
+        @csrf_exempt
+        @wraps(func)
+        async def wrapper(request, **kwargs):
+            if request.method not in methods:
+                response = await sync_to_async(sync_callable)(request, **kwargs)
+                return await sync_to_async(_render)(response)
+
+            view, error = await sync_to_async(_initial)(view_class, request, kwargs)
+            if error is not None:
+                return error
+            try:
+                return await func(view, **kwargs)
+            except APIException as exc:
+                return await sync_to_async(_error)(view, exc)
+
+        return wrapper
+    return decorator
+
+
+@async_api_view(views.EquipmentListCreateView)
+async def equipment_list(view):
+    """
+    Асинхронный список оборудования с фильтрами, поиском и пагинацией.
+    """
+
+    request = view.request
+    # Фильтры проверяют значения запросом к базе (ModelChoiceFilter)
+    queryset = await sync_to_async(lambda: view.filter_queryset(view.get_queryset()))()
+
+    pagination = view.paginator
+    paginator = pagination.django_paginator_class(queryset, pagination.get_page_size(request))
+    paginator.count = await queryset.acount()
+
+    page_number = pagination.get_page_number(request, paginator)
+    if page_number in pagination.last_page_strings:
+        page_number = paginator.num_pages
+    try:
+        page = paginator.page(page_number)
+    except InvalidPage as exc:
+        raise NotFound(pagination.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+    pagination.page = page
+    pagination.request = request
+    results = [equipment async for equipment in page.object_list]
+
+    data = EquipmentSerializer(results, many=True, context=view.get_serializer_context()).data
+    return json_response(pagination.get_paginated_response(data).data)
+
+
+@async_api_view(views.EquipmentDetailView)
+async def equipment_detail(view, pk):
+    """
+    Асинхронное получение оборудования по ID.
+    """
+
+    try:
+        equipment = await view.get_queryset().aget(pk=pk)
+    except Equipment.DoesNotExist:
+        raise NotFound()
+
+    return json_response(EquipmentSerializer(equipment, context=view.get_serializer_context()).data)
+
+
+@async_api_view(views.equipment_stats)
+async def equipment_stats(view):
+    """
+    Асинхронная статистика по оборудованию.
+    """
+
+    total_equipment = await Equipment.objects.acount()
+    total_deleted = (
+        await Equipment.all_objects.filter(deleted_at__isnull=False).acount()
+        + await ArchivedEquipment.objects.acount()
+    )
+    total_types = await EquipmentType.objects.acount()
+
+    # Один запрос с подсчетом вместо prefetch всех записей оборудования;
+    # Meta.ordering к запросам с GROUP BY не применяется
+    types = EquipmentType.objects.annotate(
+        equipment_count=Count('equipment', filter=Q(equipment__deleted_at__isnull=True))
+    ).order_by(*EquipmentType._meta.ordering)
+    type_stats = [
+        {
+            'id': equipment_type.id,
+            'name': equipment_type.name,
+            'equipment_count': equipment_type.equipment_count,
+            'serial_mask': equipment_type.serial_mask
+        }
+        async for equipment_type in types
+    ]
+
+    return json_response({
+        'total_equipment': total_equipment,
+        'total_deleted': total_deleted,
+        'total_active': total_equipment,
+        'total_types': total_types,
+        'type_statistics': type_stats
+    })
+
+
+@async_api_view(views.restore_equipment, methods=('POST',))
+async def restore_equipment(view, pk):
+    """
+    Асинхронное восстановление мягко удаленного оборудования.
+    """
+
+    try:
+        equipment = await Equipment.all_objects.aget_including_archived(pk=pk)
+    except Equipment.DoesNotExist:
+        return json_response({
+            'error': 'Оборудование не найдено'
+        }, status.HTTP_404_NOT_FOUND)
+
+    if not equipment.is_deleted:
+        return json_response({
+            'error': 'Оборудование не удалено'
+        }, status.HTTP_400_BAD_REQUEST)
+
+    try:
+        await sync_to_async(equipment.restore)()
+    except IntegrityError:
+        return json_response({
+            'error': 'Оборудование с таким серийным номером уже существует'
+        }, status.HTTP_400_BAD_REQUEST)
+
+    # Запись из архива восстанавливается без загруженного типа
+    equipment = await Equipment.objects.select_related('equipment_type').aget(pk=equipment.pk)
+    return json_response({
+        'message': 'Оборудование успешно восстановлено',
+        'data': EquipmentSerializer(equipment).data
+    })
@@ -0,0 +1,118 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+from equipment.models import ARCHIVE_FIELDS, Equipment, ArchivedEquipment
+from telecom_backend.db.sqlite import retry_on_locked
+
+
+class Command(BaseCommand):
+    """
+    Команда для переноса давно удаленного оборудования в архив.
+    
+    Записи обрабатываются порциями в порядке первичного ключа (keyset),
+    каждая порция переносится в отдельной транзакции с паузой между порциями.
+    Архивная запись с тем же id (остаток прежнего цикла восстановления
+    и удаления) перезаписывается, поэтому удаляются только записи,
+    данные которых есть в архиве.
+    """
+    
+    help = 'Переносит мягко удаленное оборудование старше N дней в архивную таблицу'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Архивировать записи, удаленные более N дней назад (по умолчанию 90)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество записей в одной порции (по умолчанию 1000)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.1,
+            help='Пауза между порциями в секундах (по умолчанию 0.1)',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Максимальное количество записей за запуск',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать количество записей для архивации',
+        )
+    
+    def handle(self, *args, **options):
+        days = options['days']
+        batch_size = options['batch_size']
+        
+        if days < 0:
+            raise CommandError('--days не может быть отрицательным')
+        if batch_size <= 0:
+            raise CommandError('--batch-size должен быть положительным')
+        
+        cutoff = timezone.now() - timedelta(days=days)
+        candidates = Equipment.all_objects.filter(deleted_at__lt=cutoff)
+        
+        if options['dry_run']:
+            self.stdout.write(f'Записей для архивации: {candidates.count()}')
+            return
+        
+        limit = options['limit']
+        last_pk = 0
+        archived_total = 0
+        
+        while limit is None or archived_total < limit:
+            size = batch_size if limit is None else min(batch_size, limit - archived_total)
+            archived, last_pk = self.archive_batch(cutoff, last_pk, size)
+            if not archived:
+                break
+            
+            archived_total += archived
+            self.stdout.write(f'  Перенесено {archived_total} записей (id <= {last_pk})')
+            
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        
+        self.stdout.write(self.style.SUCCESS(f'Архивировано записей: {archived_total}'))
+    
+    @retry_on_locked
+    def archive_batch(self, cutoff, last_pk, size):
+        """
+        Переносит в архив одну порцию записей с id больше last_pk.
+        
+        Returns:
+            tuple: Количество перенесенных записей и последний обработанный id
+        """
+        with transaction.atomic():
+            batch = list(
+                Equipment.all_objects
+                .select_for_update()
+                .filter(deleted_at__lt=cutoff, pk__gt=last_pk)
+                .order_by('pk')[:size]
+            )
+            if not batch:
+                return 0, last_pk
+            
+            unique_fields = None
+            if connections[ArchivedEquipment.objects.db].features.supports_update_conflicts_with_target:
+                unique_fields = ['id']
+            ArchivedEquipment.objects.bulk_create(
+                [ArchivedEquipment.from_equipment(equipment) for equipment in batch],
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=[field for field in ARCHIVE_FIELDS if field != 'id'] + ['archived_at']
+            )
+            Equipment.all_objects.filter(pk__in=[equipment.pk for equipment in batch]).delete()
+        
+        return len(batch), batch[-1].pk
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-19 04:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0002_remove_equipment_equipment_equipme_324fad_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['equipment_type', 'created_at'], name='equipment_equipme_871071_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['serial_number'], name='equipment_serial__ac559e_idx'),
+        ),
+    ]
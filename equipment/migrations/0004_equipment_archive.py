@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-19 04:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0003_admin_high_volume_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedEquipment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('serial_number', models.CharField(max_length=100, verbose_name='Серийный номер')),
+                ('note', models.TextField(blank=True, null=True, verbose_name='Примечание')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('deleted_at', models.DateTimeField(verbose_name='Дата удаления')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+                ('equipment_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_equipment', to='equipment.equipmenttype', verbose_name='Тип оборудования')),
+            ],
+            options={
+                'verbose_name': 'Архивное оборудование',
+                'verbose_name_plural': 'Архивное оборудование',
+                'db_table': 'equipment_archive',
+                'ordering': ['-deleted_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-19 04:07
+
+from django.db import migrations, models
+
+
+# В MySQL нет частичных индексов, и Django пропускает индексы с condition.
+# Оптимизатор MySQL не подставляет generated-колонки для предиката IS NULL,
+# поэтому эквивалентом служат составные индексы, начинающиеся с deleted_at:
+# фильтр EquipmentManager (deleted_at IS NULL) становится ref-доступом по индексу,
+# и активные строки читаются из отдельного непрерывного диапазона.
+MYSQL_ACTIVE_INDEXES = {
+    'equip_active_type_created_my': ['deleted_at', 'equipment_type_id', 'created_at'],
+    'equip_active_created_my': ['deleted_at', 'created_at'],
+    'equip_active_serial_my': ['deleted_at', 'serial_number'],
+    'equip_active_updated_my': ['deleted_at', 'updated_at'],
+}
+
+
+def create_mysql_active_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    quote = schema_editor.quote_name
+    for name, columns in MYSQL_ACTIVE_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX {quote(name)} ON {quote("equipment")} '
+            f'({", ".join(quote(column) for column in columns)})'
+        )
+
+
+def drop_mysql_active_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'mysql':
+        return
+    quote = schema_editor.quote_name
+    for name in MYSQL_ACTIVE_INDEXES:
+        schema_editor.execute(f'DROP INDEX {quote(name)} ON {quote("equipment")}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_equipment_archive'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['equipment_type', 'created_at'], name='equip_active_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_at'], name='equip_active_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['serial_number'], name='equip_active_serial_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['updated_at'], name='equip_active_updated_idx'),
+        ),
+        migrations.RunPython(create_mysql_active_indexes, drop_mysql_active_indexes),
+    ]
@@ -1,5 +1,8 @@
+from asgiref.sync import sync_to_async
 from django.db import models
+from django.db.models import Q
 from django.core.validators import RegexValidator
+from functools import lru_cache
 import re
 
 
@@ -58,6 +61,14 @@ class EquipmentType(models.Model):
                 pattern += re.escape(char)
         return f'^{pattern}$'
     
+    def get_compiled_pattern(self) -> re.Pattern:
+        """
+        Возвращает скомпилированное регулярное выражение для маски.
+        
+        Скомпилированные выражения кэшируются по маске.
+        """
+        return compile_serial_mask(str(self.serial_mask))
+    
     def validate_serial_number(self, serial_number: str) -> bool:
         """
         Валидирует серийный номер согласно маске.
@@ -68,8 +79,28 @@ class EquipmentType(models.Model):
         Returns:
             bool: True если номер соответствует маске, False иначе
         """
-        pattern = self.get_regex_pattern()
-        return bool(re.match(pattern, serial_number))
+        return bool(self.get_compiled_pattern().match(serial_number))
+    
+    def invalid_serial_numbers(self, serial_numbers) -> list:
+        """
+        Возвращает серийные номера, не соответствующие маске.
+        
+        Args:
+            serial_numbers: Итерируемый набор серийных номеров
+            
+        Returns:
+            list: Номера, не прошедшие проверку, в исходном порядке
+        """
+        match = self.get_compiled_pattern().match
+        return [serial_number for serial_number in serial_numbers if not match(serial_number)]
+
+
+@lru_cache(maxsize=1024)
+def compile_serial_mask(serial_mask: str) -> re.Pattern:
+    """
+    Компилирует маску серийного номера в регулярное выражение.
+    """
+    return re.compile(EquipmentType(serial_mask=serial_mask).get_regex_pattern())
 
 
 class EquipmentManager(models.Manager):
@@ -89,11 +120,57 @@ class EquipmentManager(models.Manager):
         """
         return super().get_queryset()
     
-    def deleted_only(self):
+    def deleted_only(self, include_archived=False):
         """
         Возвращает только удаленные записи.
+        
+        С include_archived=True выборка объединяется (UNION) с архивом удаленного
+        оборудования, поэтому к ней применимы только order_by(), срезы и count().
         """
-        return super().get_queryset().filter(deleted_at__isnull=False)
+        queryset = super().get_queryset().filter(deleted_at__isnull=False)
+        if not include_archived:
+            return queryset
+        return union_with_archive(queryset, ArchivedEquipment.objects.all())
+
+
+class AllEquipmentManager(models.Manager):
+    """
+    Менеджер для всех записей оборудования, включая удаленные.
+    
+    Записи, перенесенные в архив, находятся явно через get_including_archived()
+    и доступны через with_archived(). Обычный get() и цепочки filter().get()
+    архив не затрагивают.
+    """
+    
+    def get_including_archived(self, *args, **kwargs):
+        """
+        Возвращает запись из основной таблицы, а при ее отсутствии — из архива.
+        
+        Условия применяются к обеим таблицам, поэтому допустимы только поля,
+        которые есть в архиве (ARCHIVE_FIELDS).
+        """
+        try:
+            return self.get(*args, **kwargs)
+        except self.model.DoesNotExist:
+            try:
+                archived = ArchivedEquipment.objects.get(*args, **kwargs)
+            except ArchivedEquipment.DoesNotExist:
+                raise self.model.DoesNotExist(
+                    f'{self.model._meta.object_name} matching query does not exist.'
+                )
+            return archived.as_equipment()
+    
+    async def aget_including_archived(self, *args, **kwargs):
+        """
+        Асинхронный get_including_archived().
+        """
+        return await sync_to_async(self.get_including_archived)(*args, **kwargs)
+    
+    def with_archived(self):
+        """
+        Возвращает все записи вместе с архивом (UNION).
+        """
+        return union_with_archive(self.get_queryset(), ArchivedEquipment.objects.all())
 
 
 class DeletedEquipmentManager(models.Manager):
@@ -143,7 +220,10 @@ class Equipment(models.Model):
     
     objects = EquipmentManager()
     deleted_objects = DeletedEquipmentManager()
-    all_objects = models.Manager()
+    all_objects = AllEquipmentManager()
+    
+    # Признак записи, загруженной из архива (см. ArchivedEquipment)
+    from_archive = False
     
     class Meta:
         db_table = 'equipment'
@@ -155,6 +235,33 @@ class Equipment(models.Model):
             models.Index(fields=['equipment_type']),
             models.Index(fields=['created_at']),
             models.Index(fields=['deleted_at']),
+            # Полные индексы нужны админке больших объемов: она читает all_objects,
+            # в том числе удаленные записи, и частичные индексы ей не подходят
+            models.Index(fields=['equipment_type', 'created_at']),
+            models.Index(fields=['serial_number']),
+            # Частичные индексы только по активным записям: условие совпадает с фильтром
+            # EquipmentManager, поэтому планировщик использует их для запросов через objects.
+            # В MySQL частичных индексов нет — см. миграцию 0005_active_equipment_indexes.
+            models.Index(
+                fields=['equipment_type', 'created_at'],
+                name='equip_active_type_created_idx',
+                condition=Q(deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=['created_at'],
+                name='equip_active_created_idx',
+                condition=Q(deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=['serial_number'],
+                name='equip_active_serial_idx',
+                condition=Q(deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=['updated_at'],
+                name='equip_active_updated_idx',
+                condition=Q(deleted_at__isnull=True),
+            ),
         ]
     
     def __str__(self) -> str:
@@ -171,7 +278,19 @@ class Equipment(models.Model):
     def restore(self):
         """
         Восстанавливает мягко удаленную запись.
+        
+        Запись, перенесенная в архив, возвращается в основную таблицу.
         """
+        if self.from_archive:
+            restored = ArchivedEquipment.objects.get(pk=self.pk).restore()
+            self.__dict__.update({
+                field.attname: getattr(restored, field.attname)
+                for field in self._meta.concrete_fields
+            })
+            self._state.adding = False
+            self.from_archive = False
+            return
+        
         self.deleted_at = None
         self.save()
     
@@ -184,3 +303,108 @@ class Equipment(models.Model):
             bool: True если запись удалена, False иначе
         """
         return self.deleted_at is not None
+
+
+ARCHIVE_FIELDS = (
+    'id',
+    'equipment_type_id',
+    'serial_number',
+    'note',
+    'created_at',
+    'updated_at',
+    'deleted_at',
+)
+
+
+def union_with_archive(queryset, archive_queryset):
+    """
+    Объединяет выборку оборудования с выборкой из архива.
+    
+    Возвращает экземпляры Equipment; у записей из архива from_archive=True.
+    """
+    archive_queryset = archive_queryset.order_by().annotate(
+        from_archive=models.Value(True, output_field=models.BooleanField())
+    ).values_list(*ARCHIVE_FIELDS, 'from_archive')
+    
+    return queryset.order_by().only(*ARCHIVE_FIELDS).annotate(
+        from_archive=models.Value(False, output_field=models.BooleanField())
+    ).union(archive_queryset, all=True)
+
+
+class ArchivedEquipment(models.Model):
+    """
+    Архив мягко удаленного оборудования.
+    
+    Записи переносятся сюда командой archive_deleted_equipment,
+    чтобы основная таблица содержала только актуальные данные.
+    Первичный ключ совпадает с исходным id оборудования.
+    """
+    
+    id = models.BigIntegerField(primary_key=True)
+    equipment_type = models.ForeignKey(
+        EquipmentType,
+        on_delete=models.CASCADE,
+        related_name='archived_equipment',
+        verbose_name="Тип оборудования"
+    )
+    serial_number = models.CharField(
+        max_length=100,
+        verbose_name="Серийный номер"
+    )
+    note = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name="Примечание"
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    deleted_at = models.DateTimeField(verbose_name="Дата удаления")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата архивации")
+    
+    class Meta:
+        db_table = 'equipment_archive'
+        verbose_name = "Архивное оборудование"
+        verbose_name_plural = "Архивное оборудование"
+        ordering = ['-deleted_at']
+    
+    def __str__(self) -> str:
+        return f"{self.equipment_type_id} - {self.serial_number}"
+    
+    @classmethod
+    def from_equipment(cls, equipment):
+        """
+        Создает (не сохраняя) архивную запись по записи оборудования.
+        """
+        return cls(**{field: getattr(equipment, field) for field in ARCHIVE_FIELDS})
+    
+    def as_equipment(self):
+        """
+        Возвращает несохраненный экземпляр Equipment с данными архивной записи.
+        """
+        equipment = Equipment(**{field: getattr(self, field) for field in ARCHIVE_FIELDS})
+        equipment.from_archive = True
+        return equipment
+    
+    def restore(self):
+        """
+        Возвращает запись в основную таблицу оборудования.
+        
+        Returns:
+            Equipment: Восстановленная запись
+        """
+        from django.db import transaction
+        
+        with transaction.atomic():
+            equipment = Equipment(
+                id=self.id,
+                equipment_type_id=self.equipment_type_id,
+                serial_number=self.serial_number,
+                note=self.note,
+            )
+            equipment.save(force_insert=True)
+            # auto_now_add перезаписывает created_at при вставке — возвращаем исходное значение
+            Equipment.all_objects.filter(pk=equipment.pk).update(created_at=self.created_at)
+            equipment.created_at = self.created_at
+            self.delete()
+        
+        return equipment
@@ -1,5 +1,7 @@
 from rest_framework.pagination import PageNumberPagination
 
+from telecom_backend.timing import TimedPaginator
+
 
 class CustomPageNumberPagination(PageNumberPagination):
     """
@@ -8,6 +10,7 @@ class CustomPageNumberPagination(PageNumberPagination):
     Позволяет клиенту указывать размер страницы через параметр 'page_size'.
     Максимальный размер страницы ограничен 100 элементами.
     """
+    django_paginator_class = TimedPaginator
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
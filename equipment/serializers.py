@@ -1,6 +1,27 @@
+import time
+
 from rest_framework import serializers
 from django.db import transaction
-from .models import Equipment, EquipmentType
+from telecom_backend.db.sqlite import retry_on_locked
+from telecom_backend.metrics import BULK_CREATE_BATCH_SIZE, SERIAL_VALIDATION_SECONDS, SERIAL_VALIDATIONS
+from .models import ArchivedEquipment, Equipment, EquipmentType
+
+
+def find_invalid_serial_numbers(equipment_type, serial_numbers) -> list:
+    """
+    Проверяет номера по маске типа и учитывает проверку в метриках.
+    
+    Returns:
+        list: Номера, не прошедшие проверку, в исходном порядке
+    """
+    started = time.perf_counter()
+    serial_numbers = list(serial_numbers)
+    invalid = equipment_type.invalid_serial_numbers(serial_numbers)
+    
+    SERIAL_VALIDATION_SECONDS.inc(time.perf_counter() - started)
+    SERIAL_VALIDATIONS.labels('valid').inc(len(serial_numbers) - len(invalid))
+    SERIAL_VALIDATIONS.labels('invalid').inc(len(invalid))
+    return invalid
 
 
 class EquipmentTypeSerializer(serializers.ModelSerializer):
@@ -27,7 +48,11 @@ class EquipmentTypeSerializer(serializers.ModelSerializer):
     def get_equipment_count(self, obj) -> int:
         """
         Возвращает количество единиц оборудования данного типа.
+        
+        Использует аннотацию _equipment_count из queryset, если она есть.
         """
+        if hasattr(obj, '_equipment_count'):
+            return obj._equipment_count
         return obj.equipment.count()
 
 
@@ -124,29 +149,60 @@ class EquipmentCreateSerializer(serializers.Serializer):
         help_text="Примечание для всех создаваемых записей"
     )
     
+    upsert = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Режим upsert: существующие записи обновляются, удаленные восстанавливаются"
+    )
+    
+    upsert_batch_size = 1000
+    
     def validate(self, attrs):
         """
         Валидирует данные для создания оборудования.
+        
+        Существование номеров в базе проверяется одним запросом;
+        в режиме upsert существующие номера ошибкой не считаются.
+        Номера из архива отклоняются в обоих режимах: новая запись
+        помешала бы восстановить архивную.
         """
         equipment_type = attrs.get('equipment_type')
         serial_numbers = attrs.get('serial_numbers', [])
+        upsert = attrs.get('upsert', False)
+        
+        invalid_serial_numbers = set(find_invalid_serial_numbers(equipment_type, serial_numbers))
+        existing_serial_numbers = set()
+        if not upsert:
+            existing_serial_numbers = set(
+                Equipment.objects.filter(
+                    equipment_type=equipment_type,
+                    serial_number__in=set(serial_numbers)
+                ).values_list('serial_number', flat=True)
+            )
+        archived_serial_numbers = set(
+            ArchivedEquipment.objects.filter(
+                equipment_type=equipment_type,
+                serial_number__in=set(serial_numbers)
+            ).values_list('serial_number', flat=True)
+        )
         
         validation_errors = []
         valid_serial_numbers = []
+        seen_serial_numbers = set()
         
         for serial_number in serial_numbers:
             errors = []
             
-            if not equipment_type.validate_serial_number(serial_number):
+            if serial_number in invalid_serial_numbers:
                 errors.append(f'не соответствует маске {equipment_type.serial_mask}')
             
-            if Equipment.objects.filter(
-                equipment_type=equipment_type,
-                serial_number=serial_number
-            ).exists():
+            if serial_number in existing_serial_numbers:
                 errors.append('уже существует в базе данных')
             
-            if serial_number in valid_serial_numbers:
+            if serial_number in archived_serial_numbers:
+                errors.append('находится в архиве, восстановите архивную запись')
+            
+            if serial_number in seen_serial_numbers:
                 errors.append('дублируется в текущем запросе')
             
             if errors:
@@ -156,6 +212,7 @@ class EquipmentCreateSerializer(serializers.Serializer):
                 })
             else:
                 valid_serial_numbers.append(serial_number)
+                seen_serial_numbers.add(serial_number)
         
         if validation_errors:
             raise serializers.ValidationError({
@@ -166,11 +223,18 @@ class EquipmentCreateSerializer(serializers.Serializer):
         attrs['valid_serial_numbers'] = valid_serial_numbers
         return attrs
     
+    @retry_on_locked
     @transaction.atomic
     def create(self, validated_data):
         """
         Создает записи оборудования.
+        
+        В режиме upsert возвращает словарь с количеством созданных,
+        обновленных и неизмененных записей.
         """
+        if validated_data.get('upsert'):
+            return self.upsert_equipment(validated_data)
+        
         equipment_type = validated_data['equipment_type']
         serial_numbers = validated_data['valid_serial_numbers']
         note = validated_data.get('note', '')
@@ -185,7 +249,83 @@ class EquipmentCreateSerializer(serializers.Serializer):
             equipment_list.append(equipment)
         
         created_equipment = Equipment.objects.bulk_create(equipment_list)
+        BULK_CREATE_BATCH_SIZE.labels('create').observe(len(equipment_list))
         return created_equipment
+    
+    def upsert_equipment(self, validated_data):
+        """
+        Создает новые записи и обновляет существующие одним запросом на порцию.
+        
+        Для каждой порции одним запросом определяются существующие записи,
+        затем все новые и изменившиеся записи записываются одним
+        INSERT ... ON CONFLICT (ON DUPLICATE KEY) UPDATE. Примечание обновляется,
+        только если оно передано; мягко удаленные записи восстанавливаются.
+        """
+        from django.db import connections
+        from django.utils import timezone
+        
+        equipment_type = validated_data['equipment_type']
+        serial_numbers = validated_data['valid_serial_numbers']
+        update_note = 'note' in validated_data
+        note = validated_data.get('note', '')
+        
+        update_fields = ['deleted_at', 'updated_at']
+        if update_note:
+            update_fields.append('note')
+        
+        db = Equipment.all_objects.db
+        unique_fields = None
+        if connections[db].features.supports_update_conflicts_with_target:
+            unique_fields = ['equipment_type', 'serial_number']
+        
+        counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+        now = timezone.now()
+        
+        for start in range(0, len(serial_numbers), self.upsert_batch_size):
+            chunk = serial_numbers[start:start + self.upsert_batch_size]
+            existing = {
+                serial_number: (existing_note, deleted_at)
+                for serial_number, existing_note, deleted_at in Equipment.all_objects.filter(
+                    equipment_type=equipment_type,
+                    serial_number__in=chunk
+                ).values_list('serial_number', 'note', 'deleted_at')
+            }
+            
+            rows = []
+            for serial_number in chunk:
+                if serial_number not in existing:
+                    counts['created'] += 1
+                    rows.append(Equipment(
+                        equipment_type=equipment_type,
+                        serial_number=serial_number,
+                        note=note
+                    ))
+                    continue
+                
+                existing_note, deleted_at = existing[serial_number]
+                if deleted_at is None and (not update_note or existing_note == note):
+                    counts['unchanged'] += 1
+                    continue
+                
+                counts['updated'] += 1
+                rows.append(Equipment(
+                    equipment_type=equipment_type,
+                    serial_number=serial_number,
+                    note=note if update_note else existing_note,
+                    deleted_at=None,
+                    updated_at=now
+                ))
+            
+            if rows:
+                Equipment.all_objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=unique_fields,
+                    update_fields=update_fields
+                )
+                BULK_CREATE_BATCH_SIZE.labels('upsert').observe(len(rows))
+        
+        return counts
 
 
 class EquipmentUpdateSerializer(serializers.ModelSerializer):
@@ -217,4 +357,138 @@ class EquipmentUpdateSerializer(serializers.ModelSerializer):
                 'serial_number': 'Оборудование с таким серийным номером уже существует'
             })
         
-        return attrs 
\ No newline at end of file
+        return attrs 
+
+class EquipmentBulkUpdateSerializer(serializers.Serializer):
+    """
+    Сериализатор для массового обновления оборудования.
+    
+    Записи выбираются по списку ids или по параметрам фильтра EquipmentFilter.
+    Серийные номера проверяются по маске целевого типа за один проход,
+    конфликты с существующими записями — одним запросом.
+    """
+    
+    max_rows = 10000
+    
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        min_length=1,
+        max_length=max_rows,
+        help_text="Идентификаторы обновляемого оборудования"
+    )
+    filter = serializers.DictField(
+        required=False,
+        help_text="Параметры фильтра оборудования (как в GET /api/equipment/)"
+    )
+    equipment_type = serializers.PrimaryKeyRelatedField(
+        queryset=EquipmentType.objects.all(),
+        required=False,
+        help_text="Новый тип оборудования"
+    )
+    note = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        help_text="Новое примечание"
+    )
+    
+    def validate(self, attrs):
+        """
+        Проверяет выборку и новые значения для всех затрагиваемых записей.
+        """
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError({
+                'non_field_errors': ['Укажите либо ids, либо filter']
+            })
+        
+        if 'equipment_type' not in attrs and 'note' not in attrs:
+            raise serializers.ValidationError({
+                'non_field_errors': ['Не указаны поля для обновления']
+            })
+        
+        queryset = self.get_target_queryset(attrs)
+        attrs['queryset'] = queryset
+        
+        equipment_type = attrs.get('equipment_type')
+        if equipment_type is not None:
+            self.validate_type_move(queryset, equipment_type)
+        
+        return attrs
+    
+    def get_target_queryset(self, attrs):
+        """
+        Возвращает QuerySet обновляемых записей.
+        """
+        queryset = Equipment.objects.all()
+        
+        if 'ids' in attrs:
+            return queryset.filter(id__in=set(attrs['ids']))
+        
+        from .filters import EquipmentFilter
+        
+        equipment_filter = EquipmentFilter(data=attrs['filter'], queryset=queryset)
+        if not equipment_filter.is_valid():
+            raise serializers.ValidationError({'filter': equipment_filter.errors})
+        if not any(value not in (None, '') for value in equipment_filter.form.cleaned_data.values()):
+            raise serializers.ValidationError({
+                'filter': ['Фильтр не должен быть пустым']
+            })
+        return equipment_filter.qs
+    
+    def validate_type_move(self, queryset, equipment_type):
+        """
+        Проверяет перенос выбранных записей в другой тип оборудования.
+        """
+        rows = list(queryset.order_by().values_list('id', 'serial_number')[:self.max_rows + 1])
+        if len(rows) > self.max_rows:
+            raise serializers.ValidationError({
+                'non_field_errors': [f'Выборка превышает {self.max_rows} записей']
+            })
+        
+        serial_numbers = [serial_number for _, serial_number in rows]
+        validation_errors = [
+            {'serial_number': serial_number, 'errors': [f'не соответствует маске {equipment_type.serial_mask}']}
+            for serial_number in find_invalid_serial_numbers(equipment_type, serial_numbers)
+        ]
+        
+        seen = set()
+        for serial_number in serial_numbers:
+            if serial_number in seen:
+                validation_errors.append({
+                    'serial_number': serial_number,
+                    'errors': ['дублируется в текущем запросе']
+                })
+            seen.add(serial_number)
+        
+        conflicts = Equipment.all_objects.filter(
+            equipment_type=equipment_type,
+            serial_number__in=queryset.values('serial_number')
+        ).exclude(id__in=queryset.values('id')).values_list('serial_number', flat=True)
+        validation_errors.extend(
+            {'serial_number': serial_number, 'errors': ['уже существует в базе данных']}
+            for serial_number in conflicts
+        )
+        
+        if validation_errors:
+            raise serializers.ValidationError({
+                'validation_errors': validation_errors,
+                'message': 'Обнаружены ошибки валидации серийных номеров'
+            })
+    
+    def save(self):
+        """
+        Применяет изменения одним UPDATE.
+        
+        Returns:
+            int: Количество обновленных записей
+        """
+        from django.utils import timezone
+        
+        values = {'updated_at': timezone.now()}
+        if 'equipment_type' in self.validated_data:
+            values['equipment_type'] = self.validated_data['equipment_type']
+        if 'note' in self.validated_data:
+            values['note'] = self.validated_data['note']
+        
+        return self.validated_data['queryset'].update(**values)
@@ -0,0 +1,111 @@
+"""
+Тесты административной панели оборудования.
+Покрывают режим больших объемов: подсчет, поиск и аннотации.
+"""
+
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from equipment.admin import EquipmentAdmin, EquipmentTypeAdmin, EstimatedCountPaginator
+from equipment.models import Equipment, EquipmentType
+from tests.factories import EquipmentTypeFactory, EquipmentFactory
+
+
+@pytest.mark.django_db
+class TestEquipmentTypeAdmin:
+    """Тесты админки типов оборудования."""
+    
+    def test_equipment_count_is_annotated(self, admin_user):
+        """Тест что количество оборудования считается одним запросом."""
+        for equipment_type in EquipmentTypeFactory.create_batch(3):
+            EquipmentFactory.create_batch(2, equipment_type=equipment_type)
+        deleted = Equipment.objects.first()
+        deleted.soft_delete()
+        
+        request = RequestFactory().get('/')
+        request.user = admin_user
+        model_admin = EquipmentTypeAdmin(EquipmentType, site)
+        
+        with CaptureQueriesContext(connection) as ctx:
+            counts = [model_admin.equipment_count(obj) for obj in model_admin.get_queryset(request)]
+        
+        assert len(ctx.captured_queries) == 1
+        assert sorted(counts) == [1, 2, 2]
+
+
+@pytest.mark.django_db
+class TestEquipmentAdminHighVolume:
+    """Тесты режима больших объемов для админки оборудования."""
+    
+    def _request(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return request
+    
+    def test_prefix_search_and_index_filters(self, admin_user):
+        """Тест что поиск и фильтры ограничены индексируемыми полями."""
+        model_admin = EquipmentAdmin(Equipment, site)
+        request = self._request(admin_user)
+        
+        assert model_admin.get_search_fields(request) == ['^serial_number']
+        assert 'created_at' not in model_admin.get_list_filter(request)
+        assert model_admin.show_full_result_count is False
+        assert model_admin.autocomplete_fields == ['equipment_type']
+    
+    @override_settings(EQUIPMENT_ADMIN_HIGH_VOLUME=False)
+    def test_regular_mode(self, admin_user):
+        """Тест что без режима больших объемов сохраняется прежнее поведение."""
+        model_admin = EquipmentAdmin(Equipment, site)
+        request = self._request(admin_user)
+        
+        assert 'equipment_type__name' in model_admin.get_search_fields(request)
+        assert model_admin.show_full_result_count is True
+    
+    def test_paginator_uses_exact_count_for_filtered_queryset(self):
+        """Тест что для отфильтрованной выборки выполняется точный подсчет."""
+        equipment_type = EquipmentTypeFactory()
+        EquipmentFactory.create_batch(3, equipment_type=equipment_type)
+        
+        queryset = Equipment.all_objects.filter(equipment_type=equipment_type).order_by('id')
+        paginator = EstimatedCountPaginator(queryset, 2)
+        
+        assert paginator.count == 3
+    
+    def test_paginator_uses_estimate_for_unfiltered_queryset(self, monkeypatch):
+        """Тест что для полной таблицы используется оценка СУБД."""
+        monkeypatch.setattr('equipment.admin.estimate_row_count', lambda model, using: 2000000)
+        
+        paginator = EstimatedCountPaginator(Equipment.all_objects.order_by('id'), 100)
+        
+        assert paginator.count == 2000000
+        assert paginator.num_pages == 20000
+    
+    def test_changelist_search(self, client, admin_user):
+        """Тест поиска по префиксу серийного номера в списке."""
+        equipment_type = EquipmentTypeFactory(serial_mask='AAANNN')
+        EquipmentFactory(equipment_type=equipment_type, serial_number='ABC123')
+        EquipmentFactory(equipment_type=equipment_type, serial_number='XYZ123')
+        client.force_login(admin_user)
+        
+        response = client.get(reverse('admin:equipment_equipment_changelist'), {'q': 'ABC'})
+        
+        assert response.status_code == 200
+        assert [obj.serial_number for obj in response.context['cl'].result_list] == ['ABC123']
+    
+    @pytest.mark.skipif(connection.vendor != 'sqlite', reason='план запроса SQLite')
+    @pytest.mark.parametrize('params', [{}, {'q': '12'}, {'created_at__year': '2026'}])
+    def test_changelist_ordering_uses_index(self, admin_user, params):
+        """Тест что сортировка списка с удаленными записями идет по индексу, без сортировки в памяти."""
+        request = RequestFactory().get('/', params)
+        request.user = admin_user
+        model_admin = EquipmentAdmin(Equipment, site)
+        
+        queryset = model_admin.get_changelist_instance(request).get_queryset(request)
+        plan = queryset[:100].explain()
+        
+        assert 'USING INDEX equipment_created_' in plan
+        assert 'TEMP B-TREE' not in plan
@@ -6,13 +6,16 @@ API тесты для Equipment endpoints.
 import pytest
 import json
 from django.test import TestCase
-from django.urls import reverse
+from django.db import OperationalError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, reverse_lazy
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from equipment.models import EquipmentType, Equipment
+from equipment.models import ArchivedEquipment, EquipmentType, Equipment
+from equipment.serializers import EquipmentBulkUpdateSerializer
 from tests.factories import (
     UserFactory, 
     EquipmentTypeFactory, 
@@ -225,4 +228,236 @@ class TestEquipmentRestoreAPI(TestCase):
         response = self.client.post(url)
         
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
-        self.assertIn('не найдено', response.data['error']) 
\ No newline at end of file
+        self.assertIn('не найдено', response.data['error']) 
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestEquipmentBulkUpdateAPI:
+    """Тесты API массового обновления оборудования."""
+    
+    url = reverse_lazy('equipment:equipment-bulk-update')
+    
+    def test_bulk_update_note_by_ids(self, authenticated_client):
+        """Тест обновления примечания по списку ids."""
+        equipment_list = EquipmentFactory.create_batch(3)
+        untouched = EquipmentFactory()
+        
+        response = authenticated_client.patch(self.url, {
+            'ids': [equipment.id for equipment in equipment_list],
+            'note': 'Bulk note'
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 3
+        assert Equipment.objects.filter(note='Bulk note').count() == 3
+        untouched.refresh_from_db()
+        assert untouched.note != 'Bulk note'
+    
+    def test_bulk_update_by_filter(self, authenticated_client):
+        """Тест обновления по параметрам фильтра."""
+        equipment_type = EquipmentTypeFactory()
+        EquipmentFactory.create_batch(2, equipment_type=equipment_type)
+        EquipmentFactory()
+        
+        response = authenticated_client.patch(self.url, {
+            'filter': {'equipment_type': equipment_type.id},
+            'note': ''
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 2
+    
+    def test_bulk_type_move(self, authenticated_client):
+        """Тест переноса оборудования в другой тип."""
+        source = EquipmentTypeFactory(serial_mask='NNNN')
+        target = EquipmentTypeFactory(serial_mask='NNNN')
+        equipment_list = [
+            EquipmentFactory(equipment_type=source, serial_number=serial)
+            for serial in ['1111', '2222']
+        ]
+        
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.patch(self.url, {
+                'ids': [equipment.id for equipment in equipment_list],
+                'equipment_type': target.id
+            }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert Equipment.objects.filter(equipment_type=target).count() == 2
+        # Запросы не зависят от количества записей: пользователь, тип, выборка, конфликты, UPDATE
+        assert len(ctx.captured_queries) <= 8
+    
+    def test_bulk_type_move_mask_mismatch(self, authenticated_client):
+        """Тест что перенос отклоняется при несоответствии маске."""
+        source = EquipmentTypeFactory(serial_mask='NNNN')
+        target = EquipmentTypeFactory(serial_mask='AAAA')
+        equipment = EquipmentFactory(equipment_type=source, serial_number='1234')
+        
+        response = authenticated_client.patch(self.url, {
+            'ids': [equipment.id],
+            'equipment_type': target.id
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['validation_errors'][0]['serial_number'] == '1234'
+        equipment.refresh_from_db()
+        assert equipment.equipment_type == source
+    
+    def test_bulk_type_move_conflict(self, authenticated_client):
+        """Тест что перенос отклоняется при конфликте с существующей записью."""
+        source = EquipmentTypeFactory(serial_mask='NNNN')
+        target = EquipmentTypeFactory(serial_mask='NNNN')
+        equipment = EquipmentFactory(equipment_type=source, serial_number='1234')
+        EquipmentFactory(equipment_type=target, serial_number='1234')
+        
+        response = authenticated_client.patch(self.url, {
+            'ids': [equipment.id],
+            'equipment_type': target.id
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'уже существует в базе данных' in response.data['validation_errors'][0]['errors']
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_bulk_update_revalidates_on_retry(self, authenticated_client, monkeypatch, settings):
+        """Тест что повтор после блокировки базы заново проверяет данные."""
+        settings.SQLITE_WRITE_RETRY_DELAY = 0
+        equipment = EquipmentFactory()
+        validations = []
+        saves = []
+        original_validate = EquipmentBulkUpdateSerializer.validate
+        original_save = EquipmentBulkUpdateSerializer.save
+        
+        def validate(serializer, attrs):
+            validations.append(serializer)
+            return original_validate(serializer, attrs)
+        
+        def save(serializer, **kwargs):
+            saves.append(serializer)
+            if len(saves) == 1:
+                raise OperationalError('database is locked')
+            return original_save(serializer, **kwargs)
+        
+        monkeypatch.setattr(EquipmentBulkUpdateSerializer, 'validate', validate)
+        monkeypatch.setattr(EquipmentBulkUpdateSerializer, 'save', save)
+        
+        response = authenticated_client.patch(self.url, {'ids': [equipment.id], 'note': 'x'}, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert len(validations) == 2
+        assert saves[0] is not saves[1]
+    
+    def test_bulk_update_requires_selection_and_values(self, authenticated_client):
+        """Тест обязательности выборки и обновляемых полей."""
+        equipment = EquipmentFactory()
+        
+        response = authenticated_client.patch(self.url, {'note': 'x'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        
+        response = authenticated_client.patch(self.url, {'ids': [equipment.id]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        
+        response = authenticated_client.patch(self.url, {'filter': {}, 'note': 'x'}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestEquipmentUpsertAPI:
+    """Тесты режима upsert при создании оборудования."""
+    
+    url = reverse_lazy('equipment:equipment-list-create')
+    
+    def test_upsert_counts(self, authenticated_client):
+        """Тест подсчета созданных, обновленных и неизмененных записей."""
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+        EquipmentFactory(equipment_type=equipment_type, serial_number='1111', note='Feed')
+        changed = EquipmentFactory(equipment_type=equipment_type, serial_number='2222', note='Old')
+        deleted = EquipmentFactory(equipment_type=equipment_type, serial_number='3333', note='Feed')
+        deleted.soft_delete()
+        
+        response = authenticated_client.post(self.url, {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['1111', '2222', '3333', '4444'],
+            'note': 'Feed',
+            'upsert': True
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['created'] == 1
+        assert response.data['updated'] == 2
+        assert response.data['unchanged'] == 1
+        
+        changed.refresh_from_db()
+        deleted.refresh_from_db()
+        assert changed.note == 'Feed'
+        assert deleted.deleted_at is None
+        assert Equipment.objects.filter(equipment_type=equipment_type).count() == 4
+    
+    def test_upsert_without_note_keeps_existing_note(self, authenticated_client):
+        """Тест что без примечания upsert только восстанавливает записи."""
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+        deleted = EquipmentFactory(equipment_type=equipment_type, serial_number='1111', note='Keep')
+        deleted.soft_delete()
+        
+        response = authenticated_client.post(self.url, {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['1111'],
+            'upsert': True
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['updated'] == 1
+        deleted.refresh_from_db()
+        assert deleted.note == 'Keep'
+        assert deleted.deleted_at is None
+    
+    def test_upsert_rejects_archived_serial(self, authenticated_client):
+        """Тест что upsert не создает заново номер из архива."""
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+        equipment = EquipmentFactory(equipment_type=equipment_type, serial_number='1111')
+        equipment.soft_delete()
+        archived = ArchivedEquipment.from_equipment(equipment)
+        archived.save()
+        Equipment.all_objects.filter(pk=equipment.pk).delete()
+        
+        response = authenticated_client.post(self.url, {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['1111', '2222'],
+            'upsert': True
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['validation_errors'] == [{
+            'serial_number': '1111',
+            'errors': ['находится в архиве, восстановите архивную запись']
+        }]
+        assert not Equipment.all_objects.filter(equipment_type=equipment_type).exists()
+        assert archived.restore().serial_number == '1111'
+    
+    def test_upsert_still_validates_mask(self, authenticated_client):
+        """Тест что в режиме upsert маска по-прежнему проверяется."""
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+        
+        response = authenticated_client.post(self.url, {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['ABCD'],
+            'upsert': True
+        }, format='json')
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'validation_errors' in response.data
+    
+    def test_create_checks_existing_in_one_query(self, authenticated_client):
+        """Тест что проверка существования не выполняется построчно."""
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+        serial_numbers = [f'{i:04d}' for i in range(50)]
+        
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.post(self.url, {
+                'equipment_type': equipment_type.id,
+                'serial_numbers': serial_numbers
+            }, format='json')
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(ctx.captured_queries) < 10
@@ -0,0 +1,143 @@
+"""
+Тесты архивации мягко удаленного оборудования.
+Покрывают команду archive_deleted_equipment, объединение с архивом и восстановление.
+"""
+
+import pytest
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from equipment.models import Equipment, ArchivedEquipment
+from tests.factories import EquipmentTypeFactory, EquipmentFactory
+
+
+def make_deleted(equipment_type, days_ago, count=1):
+    """Создает оборудование, удаленное указанное количество дней назад."""
+    deleted_at = timezone.now() - timedelta(days=days_ago)
+    equipment_list = EquipmentFactory.create_batch(count, equipment_type=equipment_type)
+    Equipment.all_objects.filter(
+        pk__in=[equipment.pk for equipment in equipment_list]
+    ).update(deleted_at=deleted_at)
+    return equipment_list
+
+
+@pytest.mark.django_db
+class TestArchiveCommand:
+    """Тесты команды архивации."""
+    
+    def test_archives_only_old_deleted_rows(self):
+        """Тест что архивируются только записи, удаленные более N дней назад."""
+        equipment_type = EquipmentTypeFactory()
+        active = EquipmentFactory(equipment_type=equipment_type)
+        recent = make_deleted(equipment_type, days_ago=5)
+        old = make_deleted(equipment_type, days_ago=100, count=5)
+        
+        call_command('archive_deleted_equipment', days=30, batch_size=2, sleep=0, stdout=StringIO())
+        
+        assert set(ArchivedEquipment.objects.values_list('id', flat=True)) == {e.pk for e in old}
+        assert set(Equipment.all_objects.values_list('id', flat=True)) == {active.pk, recent[0].pk}
+    
+    def test_preserves_fields(self):
+        """Тест что архивная запись сохраняет исходные данные."""
+        equipment = make_deleted(EquipmentTypeFactory(), days_ago=100)[0]
+        equipment.refresh_from_db()
+        
+        call_command('archive_deleted_equipment', days=30, sleep=0, stdout=StringIO())
+        
+        archived = ArchivedEquipment.objects.get(pk=equipment.pk)
+        assert archived.serial_number == equipment.serial_number
+        assert archived.note == equipment.note
+        assert archived.created_at == equipment.created_at
+        assert archived.deleted_at == equipment.deleted_at
+    
+    def test_overwrites_stale_archive_row(self):
+        """Тест что оставшаяся в архиве запись с тем же id перезаписывается, а не теряется."""
+        equipment = make_deleted(EquipmentTypeFactory(), days_ago=100)[0]
+        equipment.refresh_from_db()
+        stale = ArchivedEquipment.from_equipment(equipment)
+        stale.serial_number = 'STALE'
+        stale.save()
+        
+        call_command('archive_deleted_equipment', days=30, sleep=0, stdout=StringIO())
+        
+        assert not Equipment.all_objects.filter(pk=equipment.pk).exists()
+        assert ArchivedEquipment.objects.get(pk=equipment.pk).serial_number == equipment.serial_number
+    
+    def test_limit_and_dry_run(self):
+        """Тест ограничения количества записей и пробного запуска."""
+        make_deleted(EquipmentTypeFactory(), days_ago=100, count=5)
+        
+        out = StringIO()
+        call_command('archive_deleted_equipment', days=30, dry_run=True, stdout=out)
+        assert 'Записей для архивации: 5' in out.getvalue()
+        assert ArchivedEquipment.objects.count() == 0
+        
+        call_command('archive_deleted_equipment', days=30, limit=3, sleep=0, stdout=StringIO())
+        assert ArchivedEquipment.objects.count() == 3
+
+
+@pytest.mark.django_db
+class TestArchiveTransparency:
+    """Тесты прозрачной работы менеджеров и восстановления с архивом."""
+    
+    def test_deleted_only_includes_archive(self):
+        """Тест что deleted_only объединяет удаленные и архивные записи."""
+        equipment_type = EquipmentTypeFactory()
+        EquipmentFactory(equipment_type=equipment_type)
+        recent = make_deleted(equipment_type, days_ago=5)[0]
+        old = make_deleted(equipment_type, days_ago=100)[0]
+        call_command('archive_deleted_equipment', days=30, sleep=0, stdout=StringIO())
+        
+        deleted = list(Equipment.objects.deleted_only(include_archived=True).order_by('-deleted_at'))
+        
+        assert [equipment.pk for equipment in deleted] == [recent.pk, old.pk]
+        assert [equipment.from_archive for equipment in deleted] == [False, True]
+        assert Equipment.objects.deleted_only().count() == 1
+        assert Equipment.objects.deleted_only().filter(pk=recent.pk).update(note='x') == 1
+    
+    def test_get_including_archived(self):
+        """Тест что get_including_archived находит запись в архиве, а обычный get — нет."""
+        old = make_deleted(EquipmentTypeFactory(), days_ago=100)[0]
+        call_command('archive_deleted_equipment', days=30, sleep=0, stdout=StringIO())
+        
+        equipment = Equipment.all_objects.get_including_archived(pk=old.pk)
+        
+        assert equipment.from_archive
+        assert equipment.is_deleted
+        with pytest.raises(Equipment.DoesNotExist):
+            Equipment.all_objects.get_including_archived(pk=99999)
+        with pytest.raises(Equipment.DoesNotExist):
+            Equipment.all_objects.get(pk=old.pk)
+        with pytest.raises(Equipment.DoesNotExist):
+            Equipment.all_objects.select_related('equipment_type').get(pk=old.pk)
+    
+    def test_restore_endpoint_restores_from_archive(self, authenticated_client):
+        """Тест восстановления архивной записи через API."""
+        old = make_deleted(EquipmentTypeFactory(), days_ago=100)[0]
+        old.refresh_from_db()
+        call_command('archive_deleted_equipment', days=30, sleep=0, stdout=StringIO())
+        
+        url = reverse('equipment:equipment-restore', kwargs={'pk': old.pk})
+        response = authenticated_client.post(url)
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert not ArchivedEquipment.objects.filter(pk=old.pk).exists()
+        restored = Equipment.objects.get(pk=old.pk)
+        assert restored.serial_number == old.serial_number
+        assert restored.created_at == old.created_at
+    
+    def test_restore_conflict_with_reused_serial(self, authenticated_client):
+        """Тест восстановления архивной записи, серийный номер которой уже занят."""
+        old = make_deleted(EquipmentTypeFactory(), days_ago=100)[0]
+        call_command('archive_deleted_equipment', days=30, sleep=0, stdout=StringIO())
+        EquipmentFactory(equipment_type=old.equipment_type, serial_number=old.serial_number)
+        
+        url = reverse('equipment:equipment-restore', kwargs={'pk': old.pk})
+        response = authenticated_client.post(url)
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert ArchivedEquipment.objects.filter(pk=old.pk).exists()
@@ -0,0 +1,213 @@
+"""
+Тесты асинхронных view оборудования.
+Сравнивают ответы со синхронными view: фильтры, пагинация, ошибки и восстановление.
+"""
+
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncRequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from equipment import async_views
+from equipment.models import Equipment
+from tests.factories import DeletedEquipmentFactory, EquipmentFactory, EquipmentTypeFactory
+
+
+@pytest.fixture
+def token(regular_user):
+    return str(RefreshToken.for_user(regular_user).access_token)
+
+
+def call(view, method, path, token=None, data=None, **kwargs):
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    factory = AsyncRequestFactory()
+    if method == 'get':
+        request = factory.get(path, data=data, headers=headers)
+    else:
+        request = getattr(factory, method)(
+            path, data=json.dumps(data or {}), content_type='application/json', headers=headers
+        )
+    response = async_to_sync(view)(request, **kwargs)
+    return response, json.loads(response.content)
+
+
+@pytest.fixture
+def equipment_list():
+    router = EquipmentTypeFactory(name='TP-Link TL-WR74', serial_mask='XXAAAAAXAA')
+    switch = EquipmentTypeFactory(name='D-Link DIR-300', serial_mask='NXXAAXZXaa')
+    EquipmentFactory.create_batch(7, equipment_type=router, note='склад')
+    EquipmentFactory.create_batch(5, equipment_type=switch)
+    DeletedEquipmentFactory(equipment_type=switch)
+    return router, switch
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestAsyncEquipmentList:
+    """Тесты асинхронного списка оборудования."""
+
+    @pytest.mark.parametrize('params', [
+        {},
+        {'page_size': 5},
+        {'page_size': 5, 'page': 3},
+        {'page': 'last', 'page_size': 4},
+        {'note': 'склад'},
+        {'search': 'D-Link'},
+        {'equipment_type_name_contains': 'tp-link', 'ordering': 'serial_number'},
+        {'page_size': 1000},
+    ])
+    def test_matches_sync_view(self, authenticated_client, token, equipment_list, params):
+        """Тест совпадения ответа с синхронным view."""
+        url = reverse('equipment:equipment-list-create')
+        expected = authenticated_client.get(url, params)
+
+        response, data = call(async_views.equipment_list, 'get', url, token, params)
+
+        assert response.status_code == expected.status_code == status.HTTP_200_OK
+        assert data == expected.json()
+
+    def test_filter_by_type(self, authenticated_client, token, equipment_list):
+        """Тест фильтра по типу оборудования."""
+        router, _ = equipment_list
+        url = reverse('equipment:equipment-list-create')
+
+        response, data = call(async_views.equipment_list, 'get', url, token, {'equipment_type': router.id})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert data['count'] == 7
+        assert data == authenticated_client.get(url, {'equipment_type': router.id}).json()
+
+    def test_invalid_filter(self, token, equipment_list):
+        """Тест ошибки валидации фильтра."""
+        response, data = call(async_views.equipment_list, 'get', '/api/equipment/', token, {'equipment_type': 999})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'equipment_type' in data
+
+    def test_invalid_page(self, token, equipment_list):
+        """Тест несуществующей страницы."""
+        response, data = call(async_views.equipment_list, 'get', '/api/equipment/', token, {'page': 10})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert 'detail' in data
+
+    def test_without_token(self):
+        """Тест запроса без токена."""
+        response, data = call(async_views.equipment_list, 'get', '/api/equipment/')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert 'WWW-Authenticate' in response
+
+    def test_post_uses_sync_view(self, token):
+        """Тест что создание передается синхронному view."""
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+
+        response, data = call(async_views.equipment_list, 'post', '/api/equipment/', token, {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['1234']
+        })
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert data['count'] == 1
+        assert Equipment.objects.filter(serial_number='1234').exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestAsyncEquipmentDetailAndStats:
+    """Тесты асинхронной карточки оборудования и статистики."""
+
+    def test_detail(self, authenticated_client, token):
+        """Тест получения оборудования по ID."""
+        equipment = EquipmentFactory()
+        url = reverse('equipment:equipment-detail', kwargs={'pk': equipment.pk})
+
+        response, data = call(async_views.equipment_detail, 'get', url, token, pk=equipment.pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert data == authenticated_client.get(url).json()
+
+    def test_detail_deleted(self, token):
+        """Тест что удаленное оборудование не находится."""
+        equipment = DeletedEquipmentFactory()
+
+        response, data = call(async_views.equipment_detail, 'get', '/', token, pk=equipment.pk)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert 'detail' in data
+
+    def test_detail_delete_uses_sync_view(self, token):
+        """Тест что удаление передается синхронному view."""
+        equipment = EquipmentFactory()
+
+        response, data = call(async_views.equipment_detail, 'delete', '/', token, pk=equipment.pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Equipment.objects.filter(pk=equipment.pk).count() == 0
+
+    def test_stats(self, authenticated_client, token, equipment_list):
+        """Тест совпадения статистики с синхронным view."""
+        url = reverse('equipment:equipment-stats')
+
+        response, data = call(async_views.equipment_stats, 'get', url, token)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert data == authenticated_client.get(url).json()
+        assert data['total_deleted'] == 1
+        assert sorted(item['equipment_count'] for item in data['type_statistics']) == [5, 7]
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestAsyncRestore:
+    """Тесты асинхронного восстановления оборудования."""
+
+    def test_restore(self, token):
+        """Тест восстановления удаленного оборудования."""
+        equipment = DeletedEquipmentFactory()
+
+        response, data = call(async_views.restore_equipment, 'post', '/', token, pk=equipment.pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert data['data']['id'] == equipment.pk
+        assert data['data']['equipment_type_name'] == equipment.equipment_type.name
+        assert Equipment.objects.filter(pk=equipment.pk).exists()
+
+    def test_restore_from_archive(self, token):
+        """Тест восстановления записи из архива."""
+        equipment = EquipmentFactory()
+        Equipment.all_objects.filter(pk=equipment.pk).update(deleted_at=timezone.now() - timedelta(days=100))
+        call_command('archive_deleted_equipment', days=30, sleep=0, stdout=StringIO())
+
+        response, data = call(async_views.restore_equipment, 'post', '/', token, pk=equipment.pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert data['data']['serial_number'] == equipment.serial_number
+        assert Equipment.objects.filter(pk=equipment.pk).exists()
+
+    @pytest.mark.parametrize('deleted, status_code, error', [
+        (False, status.HTTP_400_BAD_REQUEST, 'Оборудование не удалено'),
+        (None, status.HTTP_404_NOT_FOUND, 'Оборудование не найдено'),
+    ])
+    def test_restore_errors(self, token, deleted, status_code, error):
+        """Тест ошибок восстановления."""
+        pk = EquipmentFactory().pk if deleted is False else 999
+
+        response, data = call(async_views.restore_equipment, 'post', '/', token, pk=pk)
+
+        assert response.status_code == status_code
+        assert data['error'] == error
+
+    def test_restore_get_not_allowed(self, token):
+        """Тест что GET обрабатывается синхронным view с ответом 405."""
+        response, _ = call(async_views.restore_equipment, 'get', '/', token, pk=1)
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
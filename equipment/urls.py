@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views
@@ -7,12 +8,27 @@ app_name = 'equipment'
 router = DefaultRouter()
 router.register(r'types', views.EquipmentTypeViewSet, basename='equipment-type')
 
+if getattr(settings, 'EQUIPMENT_ASYNC_VIEWS', False):
+    # Асинхронные версии для развертывания через ASGI (telecom_backend.asgi)
+    from . import async_views
+    
+    list_view = async_views.equipment_list
+    detail_view = async_views.equipment_detail
+    restore_view = async_views.restore_equipment
+    stats_view = async_views.equipment_stats
+else:
+    list_view = views.EquipmentListCreateView.as_view()
+    detail_view = views.EquipmentDetailView.as_view()
+    restore_view = views.restore_equipment
+    stats_view = views.equipment_stats
+
 urlpatterns = [
-    path('', views.EquipmentListCreateView.as_view(), name='equipment-list-create'),
-    path('<int:pk>/', views.EquipmentDetailView.as_view(), name='equipment-detail'),
-    path('<int:pk>/restore/', views.restore_equipment, name='equipment-restore'),
+    path('', list_view, name='equipment-list-create'),
+    path('<int:pk>/', detail_view, name='equipment-detail'),
+    path('<int:pk>/restore/', restore_view, name='equipment-restore'),
+    path('bulk/', views.equipment_bulk_update, name='equipment-bulk-update'),
     
     path('', include(router.urls)),
     
-    path('stats/', views.equipment_stats, name='equipment-stats'),
-] 
\ No newline at end of file
+    path('stats/', stats_view, name='equipment-stats'),
+] 
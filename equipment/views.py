@@ -1,22 +1,27 @@
 from django.shortcuts import render
 from rest_framework import generics, status, filters, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
-from .models import Equipment, EquipmentType
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from .models import Equipment, EquipmentType, ArchivedEquipment
 from .serializers import (
     EquipmentSerializer,
     EquipmentCreateSerializer,
     EquipmentUpdateSerializer,
-    EquipmentTypeSerializer
+    EquipmentTypeSerializer,
+    EquipmentBulkUpdateSerializer
 )
 from .filters import EquipmentFilter
 from .pagination import CustomPageNumberPagination
+from telecom_backend.db.sqlite import retry_on_locked
+from telecom_backend.throttling import BulkWriteThrottle, ReadThrottle, SearchThrottle
+from telecom_backend.timing import TimedViewMixin
 
 
-class EquipmentListCreateView(generics.ListCreateAPIView):
+class EquipmentListCreateView(TimedViewMixin, generics.ListCreateAPIView):
     """
     API endpoint для получения списка оборудования и создания нового.
     
@@ -32,6 +37,7 @@ class EquipmentListCreateView(generics.ListCreateAPIView):
     ordering_fields = ['created_at', 'updated_at', 'serial_number']
     ordering = ['-created_at']
     pagination_class = CustomPageNumberPagination
+    throttle_classes = [ReadThrottle, SearchThrottle, BulkWriteThrottle]
     
     def get_serializer_class(self):
         """
@@ -46,11 +52,22 @@ class EquipmentListCreateView(generics.ListCreateAPIView):
         Создает новое оборудование.
         
         Поддерживает создание множественных записей через массив серийных номеров.
+        С параметром upsert существующие записи обновляются вместо ошибки.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
         try:
+            if serializer.validated_data.get('upsert'):
+                counts = serializer.save()
+                return Response({
+                    'message': (
+                        f'Создано {counts["created"]}, обновлено {counts["updated"]}, '
+                        f'без изменений {counts["unchanged"]} единиц оборудования'
+                    ),
+                    **counts
+                }, status=status.HTTP_200_OK)
+            
             created_equipment = serializer.save()
             
             response_serializer = EquipmentSerializer(created_equipment, many=True)
@@ -68,7 +85,7 @@ class EquipmentListCreateView(generics.ListCreateAPIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class EquipmentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class EquipmentDetailView(TimedViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     API endpoint для работы с отдельной единицей оборудования.
     
@@ -107,7 +124,7 @@ class EquipmentDetailView(generics.RetrieveUpdateDestroyAPIView):
         }, status=status.HTTP_200_OK)
 
 
-class EquipmentTypeViewSet(viewsets.ModelViewSet):
+class EquipmentTypeViewSet(TimedViewMixin, viewsets.ModelViewSet):
     """
     ViewSet для полноценного REST API работы с типами оборудования.
     
@@ -120,7 +137,10 @@ class EquipmentTypeViewSet(viewsets.ModelViewSet):
     DELETE /api/equipment/types/{id}/ - удаление типа
     """
     
-    queryset = EquipmentType.objects.prefetch_related('equipment').all()
+    # Количество оборудования считается в том же запросе, что и типы
+    queryset = EquipmentType.objects.annotate(
+        _equipment_count=Count('equipment', filter=Q(equipment__deleted_at__isnull=True))
+    )
     serializer_class = EquipmentTypeSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -156,15 +176,21 @@ def equipment_stats(request):
     """
     
     total_equipment = Equipment.objects.count()
-    total_deleted = Equipment.all_objects.filter(deleted_at__isnull=False).count()
+    total_deleted = (
+        Equipment.all_objects.filter(deleted_at__isnull=False).count()
+        + ArchivedEquipment.objects.count()
+    )
     total_types = EquipmentType.objects.count()
     
     type_stats = []
-    for equipment_type in EquipmentType.objects.prefetch_related('equipment'):
+    equipment_types = EquipmentType.objects.annotate(
+        _equipment_count=Count('equipment', filter=Q(equipment__deleted_at__isnull=True))
+    ).order_by(*EquipmentType._meta.ordering)
+    for equipment_type in equipment_types:
         type_stats.append({
             'id': equipment_type.id,
             'name': equipment_type.name,
-            'equipment_count': equipment_type.equipment.count(),
+            'equipment_count': equipment_type._equipment_count,
             'serial_mask': equipment_type.serial_mask
         })
     
@@ -185,7 +211,7 @@ def restore_equipment(request, pk):
     """
     
     try:
-        equipment = Equipment.all_objects.get(pk=pk)
+        equipment = Equipment.all_objects.get_including_archived(pk=pk)
     except Equipment.DoesNotExist:
         return Response({
             'error': 'Оборудование не найдено'
@@ -196,10 +222,48 @@ def restore_equipment(request, pk):
             'error': 'Оборудование не удалено'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    equipment.restore()
+    try:
+        equipment.restore()
+    except IntegrityError:
+        return Response({
+            'error': 'Оборудование с таким серийным номером уже существует'
+        }, status=status.HTTP_400_BAD_REQUEST)
     
     serializer = EquipmentSerializer(equipment)
     return Response({
         'message': 'Оборудование успешно восстановлено',
         'data': serializer.data
     }, status=status.HTTP_200_OK)
+
+
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+@throttle_classes([BulkWriteThrottle])
+def equipment_bulk_update(request):
+    """
+    API endpoint для массового обновления оборудования.
+    
+    Принимает ids или filter и новые значения note и/или equipment_type.
+    Все изменения применяются одним UPDATE после пакетной проверки.
+    """
+    
+    @retry_on_locked
+    @transaction.atomic
+    def apply():
+        # Сериализатор создается заново на каждую попытку: DRF кэширует
+        # validated_data, а повтор должен проверять состояние после блокировки
+        serializer = EquipmentBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+    
+    try:
+        updated = apply()
+    except IntegrityError:
+        return Response({
+            'error': 'Конфликт серийных номеров при обновлении, повторите запрос'
+        }, status=status.HTTP_409_CONFLICT)
+    
+    return Response({
+        'message': f'Успешно обновлено {updated} единиц оборудования',
+        'count': updated
+    }, status=status.HTTP_200_OK)
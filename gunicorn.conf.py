@@ -0,0 +1,75 @@
+"""
+Конфигурация production запуска backend через gunicorn.
+
+    gunicorn -c gunicorn.conf.py
+
+SERVER_MODE=wsgi (по умолчанию) запускает telecom_backend.wsgi на sync/gthread
+воркерах, SERVER_MODE=asgi — telecom_backend.asgi на uvicorn воркерах.
+Приложение загружается в мастере до fork (preload_app), после fork каждый
+воркер прогревается (см. telecom_backend/warmup.py) и только затем
+отвечает 200 на /health/ready/. Для gthread и ASGI соединения с базой
+прогреваются только через пул (MYSQL_POOL_SIZE): соединения Django
+привязаны к потоку.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+SERVER_MODE = os.getenv('SERVER_MODE', 'wsgi').lower()
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'telecom_backend.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'telecom_backend.wsgi:application'
+    threads = int(os.getenv('GUNICORN_THREADS', 1))
+    worker_class = 'gthread' if threads > 1 else 'sync'
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+backlog = int(os.getenv('GUNICORN_BACKLOG', 2048))
+
+# Перезапуск воркеров ограничивает рост памяти; jitter разводит их по времени
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 0))
+
+preload_app = True
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+# Воркеры пишут метрики в общий каталог, /metrics суммирует их по процессам.
+# Каталог очищается и создается до загрузки приложения (preload_app):
+# prometheus_client открывает файлы метрик уже при импорте
+METRICS_DIR = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'telecom-metrics'))
+shutil.rmtree(METRICS_DIR, ignore_errors=True)
+os.makedirs(METRICS_DIR, exist_ok=True)
+
+
+def when_ready(server):
+    from telecom_backend.warmup import warm_up_master
+    
+    warm_up_master()
+    server.log.info('Мастер прогрет, запуск воркеров: %s', server.num_workers)
+
+
+def post_fork(server, worker):
+    from telecom_backend.warmup import warm_up
+    
+    state = warm_up()
+    if state['ready']:
+        worker.log.info('Воркер %s прогрет за %.3f с', worker.pid, state['duration'])
+    else:
+        worker.log.error('Прогрев воркера %s не выполнен: %s', worker.pid, state['error'])
+
+
+def child_exit(server, worker):
+    from telecom_backend.metrics import mark_process_dead
+    
+    mark_process_dead(worker.pid)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class TelecomBackendConfig(AppConfig):
+    name = 'telecom_backend'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from .db.sqlite import apply_pragmas
+
+        connection_created.connect(apply_pragmas, dispatch_uid='telecom_backend.sqlite_pragmas')
@@ -0,0 +1,332 @@
+"""
+Кэш файлов frontend приложения.
+
+Файлы читаются с диска один раз и перечитываются только при изменении mtime
+или размера. Для текстовых файлов заранее готовятся gzip и brotli варианты,
+ETag строится по sha256 содержимого, а первые символы хеша используются как
+отпечаток в URL вида /frontend/app.<hash>.js, который можно кэшировать навсегда.
+Крупные файлы не держатся в памяти и отдаются через FileResponse.
+
+По URL /frontend/ отдаются только собранные файлы из FRONTEND_PUBLIC_FILES
+(и их варианты с отпечатком); остальное содержимое каталога (nginx.conf,
+Dockerfile, package.json, тесты) не публикуется.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from .metrics import CACHE_REQUESTS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+FINGERPRINT_LENGTH = 12
+FINGERPRINT_RE = re.compile(r'^(?P<name>.+)\.(?P<fingerprint>[0-9a-f]{%d})(?P<ext>\.[^./]+)$' % FINGERPRINT_LENGTH)
+
+COMPRESSIBLE_TYPES = ('application/javascript', 'application/json', 'image/svg+xml', 'text/javascript')
+MIN_COMPRESS_SIZE = 256
+
+DEFAULT_PUBLIC_FILES = ('index.html', 'app.js', 'style.css')
+
+# Расширение файла с заранее сжатой копией на диске
+ENCODING_SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+
+def get_frontend_dir() -> str:
+    return str(getattr(settings, 'FRONTEND_DIR', settings.BASE_DIR / 'frontend'))
+
+
+def get_public_files() -> tuple:
+    return tuple(getattr(settings, 'FRONTEND_PUBLIC_FILES', DEFAULT_PUBLIC_FILES))
+
+
+def get_inline_max_size() -> int:
+    return getattr(settings, 'FRONTEND_INLINE_MAX_SIZE', 512 * 1024)
+
+
+def guess_content_type(path: str) -> str:
+    """
+    Определяет MIME тип файла.
+    """
+    mime_type, _ = mimetypes.guess_type(path)
+    if mime_type is None:
+        if path.endswith('.js'):
+            mime_type = 'application/javascript'
+        elif path.endswith('.css'):
+            mime_type = 'text/css'
+        else:
+            mime_type = 'application/octet-stream'
+    if mime_type.startswith('text/') or mime_type in ('application/javascript', 'application/json'):
+        mime_type += '; charset=utf-8'
+    return mime_type
+
+
+def is_compressible(content_type: str) -> bool:
+    mime_type = content_type.split(';')[0]
+    return mime_type.startswith('text/') or mime_type in COMPRESSIBLE_TYPES
+
+
+def compress(content: bytes) -> dict:
+    """
+    Готовит сжатые варианты содержимого.
+
+    Вариант сохраняется только если он заметно меньше исходника.
+
+    Returns:
+        dict: {кодировка: сжатые байты}
+    """
+    variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=11)
+    return {
+        encoding: data
+        for encoding, data in variants.items()
+        if len(data) < len(content) * 0.95
+    }
+
+
+def accepted_encodings(request) -> set:
+    """
+    Возвращает кодировки из Accept-Encoding, исключая помеченные q=0.
+    """
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        params = params.replace(' ', '')
+        if coding and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class Asset:
+    """
+    Загруженный файл frontend со сжатыми вариантами.
+
+    content и variants заполнены только для файлов не крупнее
+    FRONTEND_INLINE_MAX_SIZE; для крупных в variant_paths лежат
+    актуальные сжатые копии с диска (app.js.gz, app.js.br).
+    """
+
+    def __init__(self, path, content_type, digest, mtime_ns=None, size=None,
+                 content=None, variants=None, variant_paths=None):
+        self.path = path
+        self.content_type = content_type
+        self.digest = digest
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.content = content
+        self.variants = variants or {}
+        self.variant_paths = variant_paths or {}
+
+    @classmethod
+    def from_bytes(cls, path, content, content_type=None, **kwargs):
+        content_type = content_type or guess_content_type(path)
+        return cls(
+            path,
+            content_type,
+            hashlib.sha256(content).hexdigest(),
+            content=content,
+            variants=compress(content) if is_compressible(content_type) and len(content) >= MIN_COMPRESS_SIZE else {},
+            **kwargs
+        )
+
+    @classmethod
+    def from_file(cls, path, stat):
+        kwargs = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+        if stat.st_size <= get_inline_max_size():
+            with open(path, 'rb') as f:
+                return cls.from_bytes(path, f.read(), **kwargs)
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+
+        variant_paths = {}
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            try:
+                if os.stat(path + suffix).st_mtime_ns >= stat.st_mtime_ns:
+                    variant_paths[encoding] = path + suffix
+            except FileNotFoundError:
+                continue
+
+        return cls(path, guess_content_type(path), digest.hexdigest(), variant_paths=variant_paths, **kwargs)
+
+    @property
+    def fingerprint(self) -> str:
+        return self.digest[:FINGERPRINT_LENGTH]
+
+    @property
+    def encodings(self) -> set:
+        return set(self.variants) | set(self.variant_paths)
+
+    def etag(self, encoding=None) -> str:
+        # Сжатый вариант — другое представление, ему нужен свой сильный ETag
+        suffix = {'br': '-br', 'gzip': '-gz'}.get(encoding, '')
+        return f'"{self.digest}{suffix}"'
+
+    def choose_encoding(self, request):
+        accepted = accepted_encodings(request)
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and encoding in accepted:
+                return encoding
+        return None
+
+    def response(self, request, cache_control=REVALIDATE_CACHE_CONTROL):
+        """
+        Формирует ответ с учетом Accept-Encoding и If-None-Match.
+        """
+        encoding = self.choose_encoding(request)
+        etag = self.etag(encoding)
+
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+        elif self.content is not None:
+            response = HttpResponse(
+                self.variants[encoding] if encoding else self.content,
+                content_type=self.content_type
+            )
+        else:
+            response = FileResponse(
+                open(self.variant_paths[encoding] if encoding else self.path, 'rb'),
+                content_type=self.content_type
+            )
+            # Иначе браузер увидит имя сжатой копии (app.js.gz)
+            del response['Content-Disposition']
+
+        if encoding and response.status_code == 200:
+            response['Content-Encoding'] = encoding
+        if self.encodings:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        response['ETag'] = etag
+        response['Cache-Control'] = cache_control
+        return response
+
+
+class AssetStore:
+    """
+    Потокобезопасный кэш файлов frontend, проверяемый по mtime.
+    """
+
+    # Путь к app.js в inline скрипте index.html
+    SHELL_SCRIPT_PATH = "'/frontend/app.js'"
+
+    def __init__(self):
+        self._assets = {}
+        self._shell = None
+        self._lock = threading.Lock()
+
+    def resolve(self, path: str) -> str:
+        try:
+            return safe_join(get_frontend_dir(), path)
+        except Exception:
+            raise Http404(f"Файл {path} не найден")
+
+    def get(self, path: str) -> Asset:
+        """
+        Возвращает файл из кэша, перечитывая его при изменении на диске.
+
+        Raises:
+            Http404: если файл не существует
+        """
+        full_path = self.resolve(path)
+        try:
+            stat = os.stat(full_path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise Http404(f"Файл {path} не найден")
+        if not os.path.isfile(full_path):
+            raise Http404(f"Файл {path} не найден")
+
+        asset = self._assets.get(full_path)
+        if asset is not None and asset.mtime_ns == stat.st_mtime_ns and asset.size == stat.st_size:
+            CACHE_REQUESTS.labels('frontend_asset', 'hit').inc()
+            return asset
+        CACHE_REQUESTS.labels('frontend_asset', 'miss').inc()
+
+        with self._lock:
+            asset = self._assets.get(full_path)
+            if asset is None or asset.mtime_ns != stat.st_mtime_ns or asset.size != stat.st_size:
+                asset = Asset.from_file(full_path, stat)
+                self._assets[full_path] = asset
+        return asset
+
+    def url(self, path: str) -> str:
+        """
+        Возвращает URL файла с отпечатком содержимого.
+        """
+        name, ext = os.path.splitext(path)
+        return f'/frontend/{name}.{self.get(path).fingerprint}{ext}'
+
+    def shell(self) -> Asset:
+        """
+        Возвращает index.html со ссылкой на app.js по URL с отпечатком.
+        """
+        index = self.get('index.html')
+        try:
+            app_url = self.url('app.js')
+        except Http404:
+            app_url = None
+
+        key = (index.digest, app_url)
+        shell = self._shell
+        if shell is None or shell[0] != key:
+            # Крупный index.html не держится в памяти, но шаблон собирается один раз
+            # на версию файлов, поэтому его можно прочитать с диска
+            content = index.content
+            if content is None:
+                with open(index.path, 'rb') as f:
+                    content = f.read()
+            if app_url:
+                content = content.replace(self.SHELL_SCRIPT_PATH.encode(), f"'{app_url}'".encode())
+            shell = (key, Asset.from_bytes(index.path, content, 'text/html; charset=utf-8'))
+            self._shell = shell
+        return shell[1]
+
+    def lookup(self, path: str):
+        """
+        Находит публичный файл по пути, в том числе по пути с отпечатком.
+
+        Returns:
+            tuple: (asset, совпал ли отпечаток с текущим содержимым)
+
+        Raises:
+            Http404: если файл не существует или не входит в FRONTEND_PUBLIC_FILES
+        """
+        public_files = get_public_files()
+        match = FINGERPRINT_RE.match(path)
+        if match and match.group('name') + match.group('ext') in public_files:
+            original = match.group('name') + match.group('ext')
+            try:
+                asset = self.get(original)
+            except Http404:
+                pass
+            else:
+                return asset, asset.fingerprint == match.group('fingerprint')
+        if path not in public_files:
+            raise Http404(f"Файл {path} не найден")
+        return self.get(path), False
+
+    def clear(self):
+        with self._lock:
+            self._assets.clear()
+            self._shell = None
+
+
+asset_store = AssetStore()
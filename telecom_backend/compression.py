@@ -0,0 +1,149 @@
+"""
+Сжатие ответов API по Accept-Encoding.
+
+CompressionMiddleware сжимает ответы на пути из COMPRESSION_PATH_PREFIXES
+(по умолчанию /api/) в brotli, если он установлен и принимается клиентом,
+иначе в gzip. Не сжимаются ответы:
+- уже имеющие Content-Encoding или Cache-Control: no-transform;
+- несжимаемых типов (см. assets.is_compressible);
+- обычные ответы меньше COMPRESSION_MIN_SIZE байт;
+- ответы, которые после сжатия не стали меньше.
+
+Потоковые ответы сжимаются по частям: после каждой части компрессор
+сбрасывает буфер (Z_SYNC_FLUSH / brotli flush), так что клиент получает
+данные по мере генерации, а не после окончания потока.
+
+Уровень сжатия задается COMPRESSION_GZIP_LEVEL (1-9) и
+COMPRESSION_BROTLI_QUALITY (0-11): для динамических ответов низкие уровни
+дают почти тот же размер при многократно меньших затратах CPU.
+"""
+
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .assets import accepted_encodings, brotli, is_compressible
+
+DEFAULT_PATH_PREFIXES = ('/api/',)
+
+
+def get_path_prefixes() -> tuple:
+    return tuple(getattr(settings, 'COMPRESSION_PATH_PREFIXES', DEFAULT_PATH_PREFIXES))
+
+
+def get_min_size() -> int:
+    return getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+
+def get_gzip_level() -> int:
+    return getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+
+
+def get_brotli_quality() -> int:
+    return getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+
+
+def choose_encoding(request):
+    accepted = accepted_encodings(request)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(content, quality=get_brotli_quality())
+    return gzip.compress(content, compresslevel=get_gzip_level(), mtime=0)
+
+
+class StreamCompressor:
+    """
+    Сжатие потока частями со сбросом буфера после каждой части.
+    """
+
+    def __init__(self, encoding: str):
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=get_brotli_quality())
+            self._compress = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            # wbits 16 + MAX_WBITS — формат gzip с заголовком и контрольной суммой
+            self._compressor = zlib.compressobj(get_gzip_level(), zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compress(data) + self._flush() if data else b''
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+    def wrap(self, iterator):
+        for data in iterator:
+            if data := self.chunk(data):
+                yield data
+        yield self.finish()
+
+    async def awrap(self, iterator):
+        async for data in iterator:
+            if data := self.chunk(data):
+                yield data
+        yield self.finish()
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы API в brotli или gzip.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not request.path_info.startswith(get_path_prefixes()):
+            return response
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+        if not is_compressible(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < get_min_size():
+            return response
+
+        # Ответ зависит от Accept-Encoding, даже если этот клиент сжатие не принимает
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            compressor = StreamCompressor(encoding)
+            if response.is_async:
+                response.streaming_content = compressor.awrap(response.streaming_content)
+            else:
+                response.streaming_content = compressor.wrap(response.streaming_content)
+            del response['Content-Length']
+        else:
+            compressed = compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # Сжатое представление не совпадает побайтно с исходным
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
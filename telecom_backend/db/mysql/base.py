@@ -0,0 +1,69 @@
+"""
+MySQL backend с пулом соединений внутри процесса.
+
+Включается через ENGINE 'telecom_backend.db.mysql' и OPTIONS['pool']:
+
+    'OPTIONS': {
+        'pool': {'size': 5, 'overflow': 10, 'timeout': 30, 'recycle': 3600},
+    }
+
+Без OPTIONS['pool'] ведет себя как стандартный django.db.backends.mysql.
+"""
+
+from functools import partial
+
+from django.db.backends.mysql import base as mysql_base
+
+from telecom_backend.db.pool import get_pool
+
+
+class DatabaseWrapper(mysql_base.DatabaseWrapper):
+    """
+    DatabaseWrapper, берущий соединения из пула и возвращающий их при close().
+    """
+    
+    _pool_reused = False
+    
+    def get_pool(self, conn_params=None):
+        """
+        Возвращает пул соединений или None, если пул не настроен.
+        """
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options:
+            return None
+        options = {} if options is True else dict(options)
+        connect = partial(mysql_base.DatabaseWrapper.get_new_connection, self, conn_params)
+        return get_pool(self.alias, connect, **options)
+    
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+    
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool(conn_params)
+        if pool is None:
+            self._pool_reused = False
+            return super().get_new_connection(conn_params)
+        connection, self._pool_reused = pool.acquire()
+        return connection
+    
+    def init_connection_state(self):
+        # Сессионные переменные переживают возврат в пул, повторно их не задаем
+        if self._pool_reused:
+            super(mysql_base.DatabaseWrapper, self).init_connection_state()
+        else:
+            super().init_connection_state()
+    
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None:
+            return super()._close()
+        
+        discard = False
+        if self.in_atomic_block or not self.autocommit:
+            try:
+                self.connection.rollback()
+            except mysql_base.Database.Error:
+                discard = True
+        pool.release(self.connection, discard=discard)
@@ -0,0 +1,197 @@
+"""
+Пул соединений с базой данных внутри процесса.
+
+Django держит одно соединение на поток и при CONN_MAX_AGE=0 закрывает его в
+конце каждого запроса. Пул сохраняет закрытые соединения и отдает их
+следующему запросу, избегая TCP рукопожатия и аутентификации. Размер пула
+ограничен: до size соединений хранятся между запросами, еще до overflow
+открываются при пиковой нагрузке и закрываются при возврате.
+"""
+
+import os
+import threading
+import time
+
+from django.db.utils import OperationalError
+
+
+class ConnectionPool:
+    """
+    Ограниченный пул соединений DB-API.
+
+    Args:
+        connect: Функция, открывающая новое соединение
+        size: Сколько соединений хранить между запросами
+        overflow: Сколько соединений можно открыть сверх size
+        timeout: Сколько секунд ждать свободного соединения
+        recycle: Через сколько секунд соединение пересоздается (0 — никогда)
+        pre_ping: Проверять ли соединение перед выдачей
+    """
+
+    def __init__(self, connect, size=5, overflow=10, timeout=30, recycle=3600, pre_ping=True):
+        self._connect = connect
+        self.size = size
+        self.overflow = overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self._idle = []
+        self._created_at = {}
+        self._checked_out = 0
+        self._condition = threading.Condition()
+        self._pid = os.getpid()
+        self.counters = {'created': 0, 'reused': 0, 'discarded': 0, 'timeouts': 0}
+
+    def acquire(self):
+        """
+        Выдает соединение из пула или открывает новое.
+
+        Returns:
+            tuple: (соединение, было ли оно взято из пула)
+
+        Raises:
+            OperationalError: если свободное соединение не появилось за timeout
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            self._check_pid()
+            while not self._idle and self._checked_out >= self.size + self.overflow:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    if self._idle or self._checked_out < self.size + self.overflow:
+                        break
+                    self.counters['timeouts'] += 1
+                    raise OperationalError(
+                        f'Пул соединений исчерпан: {self._checked_out} из {self.size + self.overflow} заняты'
+                    )
+            self._checked_out += 1
+            conn = self._idle.pop() if self._idle else None
+
+        try:
+            if conn is not None and self._is_stale(conn):
+                self._discard(conn)
+                conn = None
+            if conn is not None:
+                self.counters['reused'] += 1
+                return conn, True
+            conn = self._connect()
+        except BaseException:
+            with self._condition:
+                self._checked_out -= 1
+                self._condition.notify()
+            raise
+
+        self._created_at[id(conn)] = time.monotonic()
+        self.counters['created'] += 1
+        return conn, False
+
+    def release(self, conn, discard=False):
+        """
+        Возвращает соединение в пул.
+
+        Соединения сверх size и помеченные discard закрываются.
+        """
+        with self._condition:
+            if os.getpid() != self._pid:
+                return
+            self._checked_out -= 1
+            keep = not discard and len(self._idle) < self.size
+            if keep:
+                self._idle.append(conn)
+            self._condition.notify()
+        if not keep:
+            self._discard(conn)
+
+    def fill(self) -> int:
+        """
+        Открывает соединения до size, чтобы первые запросы не ждали подключения.
+
+        Returns:
+            int: Количество свободных соединений в пуле
+        """
+        acquired = []
+        try:
+            for _ in range(self.size):
+                acquired.append(self.acquire()[0])
+        finally:
+            for conn in acquired:
+                self.release(conn)
+        with self._condition:
+            return len(self._idle)
+
+    def dispose(self):
+        """
+        Закрывает все свободные соединения.
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'size': self.size,
+                'overflow': self.overflow,
+                'idle': len(self._idle),
+                'checked_out': self._checked_out,
+                **self.counters,
+            }
+
+    def _is_stale(self, conn) -> bool:
+        if self.recycle and time.monotonic() - self._created_at.get(id(conn), 0) > self.recycle:
+            return True
+        if self.pre_ping:
+            try:
+                conn.ping()
+            except Exception:
+                return True
+        return False
+
+    def _discard(self, conn):
+        self._created_at.pop(id(conn), None)
+        self.counters['discarded'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _check_pid(self):
+        # После fork сокеты принадлежат родителю: забываем их, не закрывая
+        if os.getpid() != self._pid:
+            self._idle = []
+            self._created_at = {}
+            self._checked_out = 0
+            self._pid = os.getpid()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias: str, connect, **options) -> ConnectionPool:
+    """
+    Возвращает пул для алиаса базы данных, создавая его при первом обращении.
+    """
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                pool = _pools[alias] = ConnectionPool(connect, **options)
+    return pool
+
+
+def dispose_all() -> None:
+    """
+    Закрывает свободные соединения во всех пулах (например, перед fork).
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.dispose()
+
+
+def get_all_stats() -> dict:
+    with _pools_lock:
+        return {alias: pool.stats() for alias, pool in _pools.items()}
@@ -0,0 +1,147 @@
+"""
+Маршрутизация чтения на реплики с гарантией read-your-writes.
+
+ReplicaRoutingMiddleware помечает безопасные (GET/HEAD/OPTIONS) запросы к
+REPLICA_READ_PATHS, и на время такого запроса PrimaryReplicaRouter отправляет
+чтение на одну из REPLICA_DATABASES. Запись всегда идет в default.
+
+После успешной записи клиент на REPLICA_STICKY_SECONDS закрепляется за
+основной базой, чтобы не прочитать устаревшие данные с отстающей реплики:
+браузеру ставится подписанная cookie, а для клиентов с JWT отметка хранится
+в общем кэше по user_id из токена.
+"""
+
+import contextvars
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt import settings as jwt_settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+STICKY_COOKIE = 'db_primary_until'
+STICKY_COOKIE_SALT = 'telecom_backend.db.routers'
+STICKY_CACHE_KEY = 'db:primary-until:user:{}'
+
+_use_replica = contextvars.ContextVar('use_replica', default=False)
+
+
+def get_replica_aliases() -> list:
+    return list(getattr(settings, 'REPLICA_DATABASES', []))
+
+
+def get_sticky_seconds() -> int:
+    return getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+
+
+class use_primary:
+    """
+    Контекстный менеджер, принудительно читающий из основной базы.
+    """
+
+    def __enter__(self):
+        self._token = _use_replica.set(False)
+        return self
+
+    def __exit__(self, *exc_info):
+        _use_replica.reset(self._token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Роутер: запись и миграции — default, чтение в помеченных запросах — реплики.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replica_aliases()
+        if replicas and _use_replica.get():
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Без явного ответа Django пишет в базу, из которой объект был прочитан
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replica_aliases():
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Включает чтение с реплик для безопасных запросов и закрепляет
+    клиента за основной базой после записи.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_replica_aliases():
+            return self.get_response(request)
+
+        token = _use_replica.set(self.can_use_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replica.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.pin_to_primary(request, response)
+        return response
+
+    def can_use_replica(self, request) -> bool:
+        if request.method not in SAFE_METHODS:
+            return False
+        if not request.path.startswith(tuple(getattr(settings, 'REPLICA_READ_PATHS', ()))):
+            return False
+        return not self.is_pinned(request)
+
+    def is_pinned(self, request) -> bool:
+        now = time.time()
+        until = request.get_signed_cookie(STICKY_COOKIE, default=None, salt=STICKY_COOKIE_SALT)
+        if until is not None and float(until) > now:
+            return True
+
+        user_id = self.get_token_user_id(request)
+        if user_id is not None:
+            until = cache.get(STICKY_CACHE_KEY.format(user_id))
+            return until is not None and until > now
+        return False
+
+    def pin_to_primary(self, request, response) -> None:
+        seconds = get_sticky_seconds()
+        until = time.time() + seconds
+        response.set_signed_cookie(
+            STICKY_COOKIE, str(until), salt=STICKY_COOKIE_SALT,
+            max_age=seconds, httponly=True, samesite='Lax'
+        )
+
+        user = getattr(request, 'user', None)
+        user_id = user.pk if user is not None and user.is_authenticated else self.get_token_user_id(request)
+        if user_id is not None:
+            cache.set(STICKY_CACHE_KEY.format(user_id), until, seconds)
+
+    def get_token_user_id(self, request):
+        """
+        Возвращает user_id из access токена запроса или None.
+        """
+        header = request.META.get('HTTP_AUTHORIZATION', '').split()
+        if len(header) != 2 or header[0] not in jwt_settings.api_settings.AUTH_HEADER_TYPES:
+            return None
+        try:
+            token = AccessToken(header[1])
+        except TokenError:
+            return None
+        return token.get(jwt_settings.api_settings.USER_ID_CLAIM)
@@ -0,0 +1,67 @@
+"""
+Настройка SQLite для однонодового production.
+
+apply_pragmas подключается к сигналу connection_created и применяет
+SQLITE_PRAGMAS (WAL, synchronous=NORMAL, mmap и т.д.) к каждому новому
+соединению с файловой базой. При WAL читатели не блокируют писателя, но
+писатель по-прежнему один: транзакции открываются через BEGIN IMMEDIATE
+(OPTIONS['transaction_mode']), а retry_on_locked повторяет транзакцию с
+экспоненциальной задержкой, если блокировку не удалось получить за busy_timeout.
+"""
+
+import functools
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+
+LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """
+    Применяет SQLITE_PRAGMAS к новому соединению с SQLite.
+    """
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas or connection.is_in_memory_db():
+        return
+    
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def is_locked_error(error: Exception) -> bool:
+    return isinstance(error, OperationalError) and any(
+        message in str(error) for message in LOCKED_MESSAGES
+    )
+
+
+def retry_on_locked(func=None, *, using=DEFAULT_DB_ALIAS):
+    """
+    Повторяет функцию с транзакцией, если база заблокирована другим писателем.
+    
+    Повтор возможен только для внешней транзакции: внутри чужого atomic
+    ошибка пробрасывается сразу. Число попыток и начальная задержка задаются
+    SQLITE_WRITE_RETRIES и SQLITE_WRITE_RETRY_DELAY.
+    """
+    if func is None:
+        return functools.partial(retry_on_locked, using=using)
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        retries = getattr(settings, 'SQLITE_WRITE_RETRIES', 5)
+        delay = getattr(settings, 'SQLITE_WRITE_RETRY_DELAY', 0.05)
+        nested = transaction.get_connection(using).in_atomic_block
+        
+        for attempt in range(retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                if nested or attempt == retries or not is_locked_error(e):
+                    raise
+            # Полный jitter разводит повторы конкурирующих писателей
+            time.sleep(random.uniform(0, delay * 2 ** attempt))
+    
+    return wrapper
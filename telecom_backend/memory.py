@@ -0,0 +1,151 @@
+"""
+Учет выделения памяти запросами через tracemalloc.
+
+MemoryTrackingMiddleware для доли запросов MEMORY_TRACKING_SAMPLE_RATE
+включает tracemalloc на время запроса и фиксирует пик выделенной памяти
+и места выделения (файл:строка) памяти, еще занятой к концу запроса:
+результаты сериализаторов, загруженные queryset, тело ответа.
+
+Пик попадает в гистограмму http_request_peak_memory_bytes на /metrics,
+а сводка по view (число замеров, средний и максимальный пик, крупнейшие
+места выделения) хранится в общем кэше и показывается в админке на
+/admin/memory/.
+
+tracemalloc общий для процесса, поэтому одновременно замеряется не больше
+одного запроса на процесс; в многопоточном воркере в замер попадают и
+выделения соседних потоков. По умолчанию учет выключен.
+"""
+
+import linecache
+import os
+import random
+import threading
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .metrics import REQUEST_PEAK_MEMORY, get_view_name
+
+CACHE_KEY = 'memory:view:{}'
+VIEWS_CACHE_KEY = 'memory:views'
+CACHE_TIMEOUT = 7 * 24 * 3600
+
+_lock = threading.Lock()
+
+
+def get_sample_rate() -> float:
+    return getattr(settings, 'MEMORY_TRACKING_SAMPLE_RATE', 0.0)
+
+
+def get_frames() -> int:
+    return getattr(settings, 'MEMORY_TRACKING_FRAMES', 1)
+
+
+def get_top_sites() -> int:
+    return getattr(settings, 'MEMORY_TRACKING_TOP_SITES', 10)
+
+
+def site_label(frame) -> str:
+    filename = frame.filename
+    base_dir = str(settings.BASE_DIR)
+    if filename.startswith(base_dir):
+        filename = os.path.relpath(filename, base_dir)
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[1]
+    return f'{filename}:{frame.lineno}'
+
+
+def top_sites(snapshot, limit) -> list:
+    """
+    Возвращает крупнейшие места выделения памяти.
+
+    Returns:
+        list: [(файл:строка, байт, число блоков)]
+    """
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, linecache.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, '<frozen *>'),
+    ])
+    return [
+        (site_label(stat.traceback[0]), stat.size, stat.count)
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+def record(view: str, peak: int, sites: list) -> None:
+    """
+    Добавляет замер в сводку view в кэше.
+
+    Обновление не атомарно: при редкой выборке потеря отдельного
+    замера из-за гонки воркеров допустима.
+    """
+    key = CACHE_KEY.format(view)
+    summary = cache.get(key) or {'view': view, 'samples': 0, 'peak_total': 0, 'peak_max': 0, 'sites': {}}
+    summary['samples'] += 1
+    summary['peak_total'] += peak
+    summary['peak_max'] = max(summary['peak_max'], peak)
+    summary['updated_at'] = time.time()
+
+    site_sizes = summary['sites']
+    for site, size, _ in sites:
+        site_sizes[site] = max(site_sizes.get(site, 0), size)
+    summary['sites'] = dict(sorted(site_sizes.items(), key=lambda item: -item[1])[:get_top_sites() * 2])
+    cache.set(key, summary, CACHE_TIMEOUT)
+
+    views = cache.get(VIEWS_CACHE_KEY) or []
+    if view not in views:
+        cache.set(VIEWS_CACHE_KEY, [*views, view], CACHE_TIMEOUT)
+
+
+def get_summaries() -> list:
+    """
+    Возвращает сводки по view, начиная с наибольшего пика.
+    """
+    views = cache.get(VIEWS_CACHE_KEY) or []
+    summaries = [summary for summary in cache.get_many([CACHE_KEY.format(view) for view in views]).values()]
+    for summary in summaries:
+        summary['peak_avg'] = summary['peak_total'] // summary['samples']
+        summary['top_sites'] = list(summary['sites'].items())[:get_top_sites()]
+    return sorted(summaries, key=lambda summary: -summary['peak_max'])
+
+
+def clear() -> None:
+    views = cache.get(VIEWS_CACHE_KEY) or []
+    cache.delete_many([VIEWS_CACHE_KEY, *(CACHE_KEY.format(view) for view in views)])
+
+
+class MemoryTrackingMiddleware:
+    """
+    Замеряет выделение памяти для выборки запросов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = get_sample_rate()
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+        # tracemalloc уже используется (другой запрос или внешний запуск)
+        if tracemalloc.is_tracing() or not _lock.acquire(blocking=False):
+            return self.get_response(request)
+
+        try:
+            tracemalloc.start(get_frames())
+            try:
+                response = self.get_response(request)
+                _, peak = tracemalloc.get_traced_memory()
+                sites = top_sites(tracemalloc.take_snapshot(), get_top_sites())
+            finally:
+                tracemalloc.stop()
+        finally:
+            _lock.release()
+
+        view = get_view_name(request)
+        REQUEST_PEAK_MEMORY.labels(view).observe(peak)
+        record(view, peak, sites)
+        return response
@@ -0,0 +1,172 @@
+"""
+Метрики приложения в формате Prometheus.
+
+Метрики объявляются здесь и обновляются в местах измерения; /metrics
+отдает их через prometheus_client. Под gunicorn каждый воркер пишет значения
+в mmap файлы каталога PROMETHEUS_MULTIPROC_DIR (его готовит gunicorn.conf.py),
+а /metrics в любом воркере собирает сумму по всем процессам. Без этой
+переменной окружения метрики хранятся в памяти процесса.
+"""
+
+import contextlib
+import hmac
+import os
+import time
+
+from django.conf import settings
+from django.db import connections
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Длительность обработки запроса',
+    ['view', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS = Counter(
+    'http_requests',
+    'Обработанные запросы',
+    ['view', 'method', 'status'],
+)
+DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Количество SQL запросов на запрос',
+    ['view'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests',
+    'Обращения к кэшу по результату',
+    ['cache', 'result'],
+)
+BULK_CREATE_BATCH_SIZE = Histogram(
+    'equipment_bulk_create_batch_size',
+    'Количество записей в одном bulk_create оборудования',
+    ['mode'],
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+SERIAL_VALIDATIONS = Counter(
+    'serial_mask_validations',
+    'Проверенные по маске серийные номера',
+    ['result'],
+)
+SERIAL_VALIDATION_SECONDS = Counter(
+    'serial_mask_validation_seconds',
+    'Время проверки серийных номеров по маске',
+)
+
+REQUEST_PEAK_MEMORY = Histogram(
+    'http_request_peak_memory_bytes',
+    'Пик выделенной памяти за запрос (tracemalloc, выборка)',
+    ['view'],
+    buckets=(2 ** 16, 2 ** 18, 2 ** 20, 4 * 2 ** 20, 16 * 2 ** 20, 64 * 2 ** 20, 256 * 2 ** 20, 2 ** 30),
+)
+
+# Состояние пула проверки паролей (authentication.hashing); livesum суммирует
+# живые воркеры и не учитывает завершившиеся
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    'password_hash_queue_depth',
+    'Проверки паролей в пуле: ожидающие и выполняющиеся',
+    multiprocess_mode='livesum',
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    'password_hash_in_flight',
+    'Выполняющиеся проверки паролей',
+    multiprocess_mode='livesum',
+)
+
+UNMATCHED_VIEW = 'unmatched'
+
+
+def get_view_name(request) -> str:
+    """
+    Возвращает имя URL запроса для меток метрик.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.url_name:
+        return UNMATCHED_VIEW
+    return match.url_name
+
+
+def get_multiproc_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+def generate(multiproc_dir=None) -> bytes:
+    """
+    Формирует метрики в текстовом формате Prometheus.
+
+    Args:
+        multiproc_dir: Каталог файлов метрик воркеров; по умолчанию
+            берется из PROMETHEUS_MULTIPROC_DIR
+
+    Returns:
+        bytes: Текст метрик
+    """
+    path = multiproc_dir or get_multiproc_dir()
+    if not path:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return generate_latest(registry)
+
+
+def is_authorized(request, token) -> bool:
+    """
+    Проверяет токен METRICS_TOKEN в заголовке Authorization.
+
+    Без токена доступ закрыт всегда: имена view, задержки и память процессов
+    не должны быть публичными, а DEBUG в настройках не отличает production.
+    """
+    if not token:
+        return False
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
+
+
+def mark_process_dead(pid, multiproc_dir=None) -> None:
+    """
+    Удаляет файлы live-gauge метрик завершившегося воркера.
+    """
+    path = multiproc_dir or get_multiproc_dir()
+    if path:
+        multiprocess.mark_process_dead(pid, path)
+
+
+class QueryCounter:
+    """
+    execute_wrapper, считающий SQL запросы.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """
+    Собирает длительность, статус и количество SQL запросов по имени URL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        # Имя URL известно только после разрешения маршрута
+        view = get_view_name(request)
+        REQUEST_LATENCY.labels(view, request.method).observe(duration)
+        REQUESTS.labels(view, request.method, str(response.status_code)).inc()
+        DB_QUERIES.labels(view).observe(counter.count)
+        return response
@@ -0,0 +1,65 @@
+"""
+Middleware браузерных страниц, пропускаемые для stateless маршрутов.
+
+API аутентифицируется только JWT в заголовке Authorization, поэтому сессия,
+CSRF, пользователь из сессии и flash-сообщения ему не нужны, а каждый из этих
+слоев тратит время на запрос (разбор cookie, загрузка сессии, проверка
+CSRF cookie, сохранение сообщений). Подклассы стандартных middleware ниже
+ничего не делают для путей из STATELESS_PATH_PREFIXES (по умолчанию /api/,
+/health/ и /metrics), а для админки и frontend работают как обычно.
+
+Для stateless запросов request.session и request._messages не создаются,
+а request.user появляется только после аутентификации DRF. DRF view и так
+освобождены от CSRF (csrf_exempt в APIView.as_view).
+"""
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth_middleware
+from django.contrib.messages import middleware as messages_middleware
+from django.contrib.sessions import middleware as sessions_middleware
+from django.middleware import csrf
+
+DEFAULT_STATELESS_PATH_PREFIXES = ('/api/', '/health/', '/metrics')
+
+
+def get_stateless_prefixes() -> tuple:
+    return tuple(getattr(settings, 'STATELESS_PATH_PREFIXES', DEFAULT_STATELESS_PATH_PREFIXES))
+
+
+def is_stateless(request) -> bool:
+    """
+    Проверяет, что запрос идет на маршрут без сессии и CSRF.
+    """
+    return request.path_info.startswith(get_stateless_prefixes())
+
+
+class BrowserOnlyMixin:
+    """
+    Пропускает middleware для stateless маршрутов.
+    """
+
+    def __call__(self, request):
+        if is_stateless(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(BrowserOnlyMixin, sessions_middleware.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(BrowserOnlyMixin, csrf.CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # process_view вызывается обработчиком Django отдельно от __call__
+        if is_stateless(request):
+            return None
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+class AuthenticationMiddleware(BrowserOnlyMixin, auth_middleware.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(BrowserOnlyMixin, messages_middleware.MessageMiddleware):
+    pass
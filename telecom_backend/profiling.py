@@ -0,0 +1,283 @@
+"""
+Профилирование отдельных запросов по требованию.
+
+Запрос сотрудника (is_staff) с заголовком X-Profile: 1 выполняется под
+семплирующим профайлером: отдельный поток каждые PROFILE_INTERVAL секунд
+снимает стек потока запроса. Результат сохраняется в формате свернутых
+стеков (folded, понятен flamegraph.pl и speedscope) вместе с журналом SQL
+запросов в каталог PROFILE_DIR, где хранятся последние PROFILE_MAX_ENTRIES
+профилей. Профили просматриваются и скачиваются в админке (/admin/profiles/).
+
+Пользователь определяется по сессии или по JWT токену запроса; для
+остальных запросов middleware ничего не делает.
+
+Значения SQL параметров, литералы и параметры строки запроса заменяются
+на "?" (как в журнале медленных запросов): среди них бывают имена
+пользователей и хеши паролей. Каталог профилей создается с правами 0o700.
+"""
+
+import collections
+import contextlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.exceptions import AuthenticationFailed
+
+from .slow_queries import normalize_params, normalize_sql
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_ID_RE = re.compile(r'^[0-9]{19}-[0-9a-f]{8}$')
+
+
+def get_profile_dir() -> str:
+    return str(getattr(settings, 'PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'telecom-profiles')))
+
+
+def get_max_entries() -> int:
+    return getattr(settings, 'PROFILE_MAX_ENTRIES', 50)
+
+
+def get_interval() -> float:
+    return getattr(settings, 'PROFILE_INTERVAL', 0.002)
+
+
+def redact_params(params, many) -> str:
+    """
+    Возвращает форму параметров SQL без значений: "(?, ?)" или "(name=?)".
+    """
+    if params is None:
+        return ''
+    if many:
+        return '[...]'
+    if isinstance(params, dict):
+        return '(' + ', '.join(f'{name}=?' for name in params) + ')'
+    return '(' + ', '.join('?' for _ in params) + ')'
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class SamplingProfiler:
+    """
+    Семплирующий профайлер одного потока.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self) -> str:
+        """
+        Возвращает стеки в формате folded: "кадр;кадр;кадр количество".
+        """
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+
+class SQLRecorder:
+    """
+    execute_wrapper, записывающий SQL запросы и их длительность.
+    """
+
+    def __init__(self, alias, queries):
+        self.alias = alias
+        self.queries = queries
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': self.alias,
+                'sql': normalize_sql(sql),
+                'params': redact_params(params, many),
+                'many': many,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+
+class ProfileStore:
+    """
+    Кольцевой буфер профилей на диске.
+
+    Каждый профиль — отдельный JSON файл; имя начинается с времени в
+    наносекундах, поэтому сортировка по имени совпадает с порядком записи.
+    """
+
+    def __init__(self, path=None, max_entries=None):
+        self._path = path
+        self._max_entries = max_entries
+
+    @property
+    def path(self) -> str:
+        return self._path or get_profile_dir()
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries or get_max_entries()
+
+    def new_id(self) -> str:
+        return f'{time.time_ns()}-{uuid.uuid4().hex[:8]}'
+
+    def save(self, profile_id: str, data: dict) -> None:
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        # Каталог мог быть создан раньше с правами по умолчанию
+        os.chmod(self.path, 0o700)
+        target = os.path.join(self.path, f'{profile_id}.json')
+        temp = f'{target}.{os.getpid()}.tmp'
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp, target)
+        self.trim()
+
+    def trim(self) -> None:
+        for profile_id in self.ids()[self.max_entries:]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(self.path, f'{profile_id}.json'))
+
+    def ids(self) -> list:
+        """
+        Возвращает id профилей, начиная с последнего.
+        """
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        ids = [name[:-5] for name in names if name.endswith('.json') and PROFILE_ID_RE.match(name[:-5])]
+        return sorted(ids, reverse=True)
+
+    def get(self, profile_id: str):
+        """
+        Возвращает профиль или None.
+        """
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.path, f'{profile_id}.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def list(self) -> list:
+        """
+        Возвращает профили без стеков и SQL, начиная с последнего.
+        """
+        profiles = []
+        for profile_id in self.ids():
+            profile = self.get(profile_id)
+            if profile is not None:
+                profile.pop('folded', None)
+                profile['sql_count'] = len(profile.pop('sql', []))
+                profiles.append(profile)
+        return profiles
+
+
+profile_store = ProfileStore()
+
+
+def get_token_user(request):
+    """
+    Возвращает пользователя из базы по JWT токену запроса или None.
+
+    Проверка не полагается на claims токена: is_staff берется из записи
+    пользователя и в режиме JWT_CLAIMS_ONLY_SAFE_METHODS.
+    """
+    from authentication.backends import CachedJWTAuthentication
+
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except AuthenticationFailed:
+        return None
+
+
+def get_staff_user(request):
+    """
+    Возвращает сотрудника из сессии или JWT токена запроса, иначе None.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        user = get_token_user(request)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return user
+    return None
+
+
+class RequestProfilingMiddleware:
+    """
+    Профилирует запросы сотрудников с заголовком X-Profile.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.META.get(PROFILE_HEADER, '') not in ('1', 'true'):
+            return self.get_response(request)
+        user = get_staff_user(request)
+        if user is None:
+            return self.get_response(request)
+
+        queries = []
+        started = time.perf_counter()
+        with contextlib.ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(SQLRecorder(alias, queries)))
+            profiler = stack.enter_context(SamplingProfiler(threading.get_ident(), get_interval()))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        profile_id = profile_store.new_id()
+        profile_store.save(profile_id, {
+            'id': profile_id,
+            'created_at': time.time(),
+            'method': request.method,
+            'path': request.path,
+            'filters': normalize_params(request.GET),
+            'user': user.get_username(),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'samples': profiler.samples,
+            'interval_ms': get_interval() * 1000,
+            'folded': profiler.folded(),
+            'sql': queries,
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
@@ -12,7 +12,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 from datetime import timedelta
+import copy
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -47,21 +49,41 @@ INSTALLED_APPS = [
     'django_filters',
     
     # Local apps
+    'telecom_backend',
     'equipment',
     'authentication',
 ]
 
 MIDDLEWARE = [
+    'telecom_backend.metrics.MetricsMiddleware',
+    'telecom_backend.compression.CompressionMiddleware',
+    'telecom_backend.timing.ServerTimingMiddleware',
+    'telecom_backend.memory.MemoryTrackingMiddleware',
+    'telecom_backend.slow_queries.SlowQueryMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'telecom_backend.db.routers.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # Сессия, CSRF, пользователь из сессии и сообщения пропускаются для
+    # STATELESS_PATH_PREFIXES (JWT API), см. telecom_backend/middleware.py
+    'telecom_backend.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'telecom_backend.middleware.CsrfViewMiddleware',
+    'telecom_backend.middleware.AuthenticationMiddleware',
+    'telecom_backend.profiling.RequestProfilingMiddleware',
+    'telecom_backend.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Маршруты без сессии и CSRF: аутентификация только по JWT
+STATELESS_PATH_PREFIXES = ('/api/', '/health/', '/metrics')
+
+# Сжатие ответов API (telecom_backend/compression.py): brotli или gzip по Accept-Encoding
+# для ответов от COMPRESSION_MIN_SIZE байт; уровни балансируют CPU и трафик
+COMPRESSION_PATH_PREFIXES = ('/api/',)
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+
 ROOT_URLCONF = 'telecom_backend.urls'
 
 TEMPLATES = [
@@ -85,36 +107,93 @@ WSGI_APPLICATION = 'telecom_backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-# Используем SQLite для разработки и тестирования
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-        'OPTIONS': {
-            'timeout': 20,
+# MySQL включается переменной USE_MYSQL (см. docker-compose.yml), иначе SQLite
+USE_MYSQL = os.getenv('USE_MYSQL', 'False').lower() in ('true', '1', 'yes')
+
+# Пул соединений внутри процесса (telecom_backend/db/pool.py); 0 — без пула
+MYSQL_POOL_SIZE = int(os.getenv('MYSQL_POOL_SIZE', 0))
+
+if USE_MYSQL:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'telecom_backend.db.mysql',
+            'NAME': os.getenv('MYSQL_DATABASE', 'telecom_db'),
+            'USER': os.getenv('MYSQL_USER', 'telecom_user'),
+            'PASSWORD': os.getenv('MYSQL_PASSWORD', 'telecom_password123'),
+            'HOST': os.getenv('MYSQL_HOST', 'localhost'),
+            'PORT': os.getenv('MYSQL_PORT', '3306'),
+            'OPTIONS': {
+                'charset': 'utf8mb4',
+                'init_command': "SET sql_mode='STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'",
+                'isolation_level': 'read committed',
+            },
+            # С пулом соединение возвращается в него в конце запроса,
+            # без пула — переиспользуется потоком до CONN_MAX_AGE секунд
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 0 if MYSQL_POOL_SIZE else 60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if MYSQL_POOL_SIZE:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'size': MYSQL_POOL_SIZE,
+            'overflow': int(os.getenv('MYSQL_POOL_OVERFLOW', 10)),
+            'timeout': float(os.getenv('MYSQL_POOL_TIMEOUT', 30)),
+            'recycle': int(os.getenv('MYSQL_POOL_RECYCLE', 3600)),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 20,
+            }
         }
     }
-}
 
-# MySQL настройки (раскомментируйте для продакшена)
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.mysql',
-#         'NAME': os.getenv('MYSQL_DATABASE', 'telecom_db'),
-#         'USER': os.getenv('MYSQL_USER', 'telecom_user'),
-#         'PASSWORD': os.getenv('MYSQL_PASSWORD', 'telecom_password123'),
-#         'HOST': os.getenv('MYSQL_HOST', 'localhost'),
-#         'PORT': os.getenv('MYSQL_PORT', '3306'),
-#         'OPTIONS': {
-#             'charset': 'utf8mb4',
-#             'use_unicode': True,
-#             'init_command': "SET sql_mode='STRICT_TRANS_TABLES,NO_ZERO_DATE,NO_ZERO_IN_DATE,ERROR_FOR_DIVISION_BY_ZERO'",
-#             'isolation_level': 'read committed',
-#         },
-#         'CONN_MAX_AGE': 300,  # Connection pooling
-#         'ATOMIC_REQUESTS': True,  # Atomic transactions
-#     }
-# }
+# Режим SQLite для однонодового production (telecom_backend/db/sqlite.py):
+# WAL и прагмы на каждом соединении, запись через BEGIN IMMEDIATE с повторами
+SQLITE_TUNED = os.getenv('SQLITE_TUNED', 'False').lower() in ('true', '1', 'yes')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', 64 * 1024)),
+    'temp_store': 'MEMORY',
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+} if SQLITE_TUNED else {}
+
+SQLITE_WRITE_RETRIES = int(os.getenv('SQLITE_WRITE_RETRIES', 5))
+SQLITE_WRITE_RETRY_DELAY = float(os.getenv('SQLITE_WRITE_RETRY_DELAY', 0.05))
+
+if SQLITE_TUNED and not USE_MYSQL:
+    DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# Реплики для чтения (telecom_backend/db/routers.py): MYSQL_REPLICA_HOSTS для MySQL
+# или SQLITE_REPLICA_PATHS для локальной проверки на копиях файла SQLite
+REPLICA_SOURCES = [
+    value.strip()
+    for value in os.getenv('MYSQL_REPLICA_HOSTS' if USE_MYSQL else 'SQLITE_REPLICA_PATHS', '').split(',')
+    if value.strip()
+]
+
+REPLICA_DATABASES = []
+for number, source in enumerate(REPLICA_SOURCES, start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES['default']),
+        'HOST' if USE_MYSQL else 'NAME': source,
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['telecom_backend.db.routers.PrimaryReplicaRouter']
+
+# Чтение с реплик только для этих путей; после записи клиент читает
+# из основной базы REPLICA_STICKY_SECONDS секунд
+REPLICA_READ_PATHS = ('/api/equipment/',)
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
 
 try:
     import MySQLdb
@@ -126,6 +205,26 @@ except ImportError:
         pass  # mysqlclient or PyMySQL not installed
 
 
+# Cache
+# Общий кэш (Redis) нужен, чтобы кэш пользователей и журнал отозванных токенов
+# разделялись между процессами; без REDIS_URL используется локальный кэш процесса.
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -167,6 +266,13 @@ STATICFILES_DIRS = [
     BASE_DIR / 'frontend',
 ]
 
+# SPA отдается из памяти с gzip/brotli вариантами; файлы крупнее
+# FRONTEND_INLINE_MAX_SIZE байт отдаются с диска через FileResponse.
+# По /frontend/ публикуются только файлы из FRONTEND_PUBLIC_FILES
+FRONTEND_DIR = BASE_DIR / 'frontend'
+FRONTEND_PUBLIC_FILES = ('index.html', 'app.js', 'style.css')
+FRONTEND_INLINE_MAX_SIZE = int(os.getenv('FRONTEND_INLINE_MAX_SIZE', 512 * 1024))
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -178,7 +284,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.backends.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -189,7 +295,20 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
-    ]
+    ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'telecom_backend.throttling.ReadThrottle',
+        'telecom_backend.throttling.SearchThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.getenv('THROTTLE_RATE_LOGIN', '10/min'),
+        'bulk_write': os.getenv('THROTTLE_RATE_BULK_WRITE', '30/min'),
+        'search': os.getenv('THROTTLE_RATE_SEARCH', '60/min'),
+        'read': os.getenv('THROTTLE_RATE_READ', '600/min'),
+    },
+    # Число прокси перед приложением: IP клиента для ограничений берется из
+    # X-Forwarded-For на этой глубине, 0 — только REMOTE_ADDR
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
 # JWT Settings
@@ -208,6 +327,26 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Кэширование пользователей для JWT-аутентификации (секунды)
+AUTH_USER_CACHE_TIMEOUT = int(os.getenv('AUTH_USER_CACHE_TIMEOUT', '300'))
+
+# Аутентификация GET/HEAD/OPTIONS только по claims токена, без загрузки пользователя
+JWT_CLAIMS_ONLY_SAFE_METHODS = os.getenv('JWT_CLAIMS_ONLY_SAFE_METHODS', 'False').lower() == 'true'
+
+# Асинхронные view аутентификации (для ASGI) и пул проверки паролей
+AUTH_ASYNC_VIEWS = os.getenv('AUTH_ASYNC_VIEWS', 'False').lower() == 'true'
+AUTH_HASHING_EXECUTOR = os.getenv('AUTH_HASHING_EXECUTOR', 'thread')
+AUTH_HASHING_WORKERS = int(os.getenv('AUTH_HASHING_WORKERS', '4'))
+AUTH_HASHING_MAX_QUEUE = int(os.getenv('AUTH_HASHING_MAX_QUEUE', '64'))
+
+# Асинхронные view списка, карточки, статистики и восстановления оборудования (для ASGI)
+EQUIPMENT_ASYNC_VIEWS = os.getenv('EQUIPMENT_ASYNC_VIEWS', 'False').lower() == 'true'
+
+# Хранилище отозванных refresh токенов: фильтр Блума в памяти процесса
+JWT_REVOCATION_BLOOM_CAPACITY = int(os.getenv('JWT_REVOCATION_BLOOM_CAPACITY', '100000'))
+JWT_REVOCATION_REBUILD_INTERVAL = 3600
+JWT_REVOCATION_JOURNAL_TIMEOUT = 86400
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -219,3 +358,51 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_ALL_ORIGINS = DEBUG
 
 CORS_ALLOW_CREDENTIALS = True
+
+# Режим административной панели для больших объемов оборудования:
+# оценка количества строк, поиск по префиксу серийного номера, фильтры по индексам
+EQUIPMENT_ADMIN_HIGH_VOLUME = os.getenv('EQUIPMENT_ADMIN_HIGH_VOLUME', 'True').lower() == 'true'
+
+# Доля запросов с замером этапов (заголовок Server-Timing и лог telecom_backend.timing)
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv('SERVER_TIMING_SAMPLE_RATE', '0.01'))
+
+# Профили запросов сотрудников с заголовком X-Profile (см. /admin/profiles/)
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'telecom-profiles'))
+PROFILE_MAX_ENTRIES = int(os.getenv('PROFILE_MAX_ENTRIES', 50))
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', '0.002'))
+
+# Доля запросов с замером памяти через tracemalloc (см. /admin/memory/), по умолчанию выключено
+MEMORY_TRACKING_SAMPLE_RATE = float(os.getenv('MEMORY_TRACKING_SAMPLE_RATE', '0'))
+MEMORY_TRACKING_FRAMES = int(os.getenv('MEMORY_TRACKING_FRAMES', 1))
+MEMORY_TRACKING_TOP_SITES = 10
+
+# Журнал SQL запросов дольше порога с EXPLAIN для новых форм запросов (см. /admin/slow-queries/);
+# 0 отключает журнал
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200'))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv('SLOW_QUERY_SAMPLE_RATE', '1'))
+# Каталог журнала создается с правами 0o700, файлы — с 0o600
+SLOW_QUERY_LOG_FILE = os.getenv(
+    'SLOW_QUERY_LOG_FILE', os.path.join(tempfile.gettempdir(), 'telecom-slow-queries', 'slow-queries.log')
+)
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', 5))
+
+# Токен доступа к /metrics; без него endpoint отключен
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'telecom_backend.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -21,6 +21,14 @@ DATABASES = {
     }
 }
 
+# Зеркало основной базы для тестов маршрутизации чтения на реплики;
+# включается в тестах через REPLICA_DATABASES
+DATABASES['replica1'] = {
+    **DATABASES['default'],
+    'TEST': {'MIRROR': 'default'},
+}
+REPLICA_DATABASES = []
+
 # Отключаем миграции для ускорения тестов
 class DisableMigrations:
     def __contains__(self, item):
@@ -46,6 +54,12 @@ CACHES = {
 # Временная директория для медиа файлов
 MEDIA_ROOT = tempfile.mkdtemp()
 
+# Замер этапов запросов включается в тестах явно
+SERVER_TIMING_SAMPLE_RATE = 0
+
+# Журнал медленных запросов включается в тестах явно
+SLOW_QUERY_THRESHOLD_MS = 0
+
 # Отключаем логирование
 LOGGING = {
     'version': 1,
@@ -0,0 +1,278 @@
+"""
+Журнал медленных SQL запросов.
+
+SlowQueryMiddleware для доли запросов SLOW_QUERY_SAMPLE_RATE оборачивает
+выполнение SQL (execute_wrapper) и записывает запросы дольше
+SLOW_QUERY_THRESHOLD_MS вместе с именем URL и нормализованными параметрами
+фильтрации: имена параметров с подставленными вместо значений "?", кроме
+ordering, от которого зависит план.
+
+Отпечаток запроса — хеш SQL с замененными литералами, поэтому запросы одной
+формы с разными значениями попадают в одну группу. При первой встрече
+отпечатка (отмечается в общем кэше) для SELECT выполняется EXPLAIN с теми же
+параметрами, и план сохраняется вместе с записью.
+
+Записи пишутся строками JSON в ротируемый файл SLOW_QUERY_LOG_FILE
+(SLOW_QUERY_LOG_MAX_BYTES, SLOW_QUERY_LOG_BACKUPS) и показываются в админке
+на /admin/slow-queries/ с группировкой по отпечатку. Каждый процесс ротирует
+файл сам, поэтому при нескольких воркерах отдельные записи у границы
+ротации могут потеряться. SQL и планы раскрывают схему и данные, поэтому
+каталог журнала доступен только владельцу (0o700), а файлы создаются с 0o600.
+
+Запросы async view, выполняемые через sync_to_async в других потоках,
+в журнал не попадают.
+"""
+
+import collections
+import contextlib
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections
+
+from .metrics import get_view_name
+
+EXPLAINED_CACHE_KEY = 'slowquery:explained:{}'
+EXPLAINED_CACHE_TIMEOUT = 30 * 24 * 3600
+# Значения этих параметров влияют на план запроса и сохраняются как есть
+KEPT_PARAMS = {'ordering'}
+SQL_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\bIN \((?:[^()]|\([^()]*\))*\)'), 'IN (...)'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+]
+
+
+def get_threshold() -> float:
+    """Порог в миллисекундах; 0 отключает журнал."""
+    return getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 0)
+
+
+def get_sample_rate() -> float:
+    return getattr(settings, 'SLOW_QUERY_SAMPLE_RATE', 1.0)
+
+
+def get_log_file() -> str:
+    return str(getattr(
+        settings, 'SLOW_QUERY_LOG_FILE', os.path.join(tempfile.gettempdir(), 'telecom-slow-queries', 'slow-queries.log')
+    ))
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Заменяет строковые и числовые литералы на "?", списки IN — на "IN (...)".
+    """
+    for pattern, replacement in SQL_LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def fingerprint(sql: str) -> str:
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:16]
+
+
+def normalize_params(query_params) -> str:
+    """
+    Возвращает параметры фильтрации без значений: "equipment_type=?&search=?".
+    """
+    return '&'.join(
+        f'{name}={query_params.get(name) if name in KEPT_PARAMS else "?"}'
+        for name in sorted(query_params)
+        if query_params.get(name) != ''
+    )
+
+
+def explain(connection, sql, params) -> str:
+    """
+    Выполняет EXPLAIN для SELECT запроса на том же соединении.
+    """
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return '\n'.join(' | '.join(str(value) for value in row) for row in cursor.fetchall())
+    except DatabaseError as e:
+        return f'EXPLAIN не выполнен: {e}'
+
+
+class PrivateRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler, создающий файлы журнала только для владельца.
+    """
+
+    def _open(self):
+        stream = super()._open()
+        os.chmod(self.baseFilename, 0o600)
+        return stream
+
+
+class SlowQueryLog:
+    """
+    Ротируемый файл журнала и чтение его для админки.
+    """
+
+    def __init__(self, path=None):
+        self._path = path
+        self._handler = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path or get_log_file()
+
+    def get_handler(self):
+        path = self.path
+        with self._lock:
+            if self._handler is None or self._handler.baseFilename != os.path.abspath(path):
+                if self._handler is not None:
+                    self._handler.close()
+                directory = os.path.dirname(os.path.abspath(path))
+                os.makedirs(directory, mode=0o700, exist_ok=True)
+                # Каталог мог быть создан раньше с правами по умолчанию
+                os.chmod(directory, 0o700)
+                self._handler = PrivateRotatingFileHandler(
+                    path,
+                    maxBytes=getattr(settings, 'SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024),
+                    backupCount=getattr(settings, 'SLOW_QUERY_LOG_BACKUPS', 5),
+                    encoding='utf-8',
+                    delay=True,
+                )
+            return self._handler
+
+    def write(self, entry: dict) -> None:
+        self.get_handler().handle(logging.makeLogRecord({'msg': json.dumps(entry, ensure_ascii=False)}))
+
+    def files(self) -> list:
+        """
+        Файлы журнала от старого к новому.
+        """
+        backups = getattr(settings, 'SLOW_QUERY_LOG_BACKUPS', 5)
+        paths = [f'{self.path}.{number}' for number in range(backups, 0, -1)] + [self.path]
+        return [path for path in paths if os.path.exists(path)]
+
+    def entries(self) -> list:
+        entries = []
+        for path in self.files():
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    with contextlib.suppress(ValueError):
+                        entries.append(json.loads(line))
+        return entries
+
+    def groups(self) -> list:
+        """
+        Группирует записи по отпечатку, начиная с наибольшего суммарного времени.
+        """
+        groups = {}
+        for entry in self.entries():
+            group = groups.setdefault(entry['fingerprint'], {
+                'fingerprint': entry['fingerprint'],
+                'sql': entry['sql'],
+                'alias': entry['alias'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': collections.Counter(),
+                'filters': collections.Counter(),
+                'explain': None,
+            })
+            group['count'] += 1
+            group['total_ms'] += entry['duration_ms']
+            group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+            group['last_seen'] = entry['time']
+            group['views'][entry['view']] += 1
+            group['filters'][entry['filters']] += 1
+            group['explain'] = entry.get('explain') or group['explain']
+
+        for group in groups.values():
+            group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+            group['total_ms'] = round(group['total_ms'], 2)
+            group['views'] = group['views'].most_common()
+            group['filters'] = group['filters'].most_common(5)
+        return sorted(groups.values(), key=lambda group: -group['total_ms'])
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._handler is not None:
+                self._handler.close()
+                self._handler = None
+        for path in self.files():
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+
+slow_query_log = SlowQueryLog()
+
+
+class SlowQueryRecorder:
+    """
+    execute_wrapper, записывающий запросы дольше порога.
+    """
+
+    def __init__(self, alias, request, threshold):
+        self.alias = alias
+        self.request = request
+        self.threshold = threshold
+        self._explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= self.threshold:
+            self.record(sql, params, many, duration)
+        return result
+
+    def record(self, sql, params, many, duration):
+        query_fingerprint = fingerprint(sql)
+        entry = {
+            'time': time.time(),
+            'duration_ms': round(duration, 2),
+            'alias': self.alias,
+            'fingerprint': query_fingerprint,
+            'sql': normalize_sql(sql),
+            'view': get_view_name(self.request),
+            'method': self.request.method,
+            'filters': normalize_params(self.request.GET),
+        }
+        is_select = not many and sql.lstrip()[:6].upper() in ('SELECT', 'WITH')
+        if is_select and cache.add(EXPLAINED_CACHE_KEY.format(query_fingerprint), True, EXPLAINED_CACHE_TIMEOUT):
+            self._explaining = True
+            try:
+                entry['explain'] = explain(connections[self.alias], sql, params)
+            finally:
+                self._explaining = False
+        slow_query_log.write(entry)
+
+
+class SlowQueryMiddleware:
+    """
+    Записывает медленные SQL запросы для выборки запросов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = get_threshold()
+        rate = get_sample_rate()
+        if threshold <= 0 or rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        with contextlib.ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(SlowQueryRecorder(alias, request, threshold)))
+            return self.get_response(request)
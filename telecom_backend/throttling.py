@@ -0,0 +1,178 @@
+"""
+Ограничение частоты запросов по алгоритму token bucket.
+
+Состояние корзины хранится в общем кэше: момент отсчета и счетчик
+израсходованных токенов, который изменяется атомарным incr. Доступные токены
+вычисляются как burst + rate * (now - start) - consumed; при простое корзина
+не накапливает больше burst токенов. Авторизованные пользователи ограничиваются
+по id, анонимные — по IP. Если кэш недоступен, запросы пропускаются.
+
+IP берется из REMOTE_ADDR, а за прокси — из X-Forwarded-For с учетом
+REST_FRAMEWORK['NUM_PROXIES'] (число доверенных прокси перед приложением).
+Без NUM_PROXIES DRF доверяет заголовку целиком, и клиент мог бы обойти
+ограничение, меняя его, поэтому NUM_PROXIES задается всегда.
+
+Лимиты задаются в REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] в формате DRF
+('10/min'): число — емкость корзины, период — время ее полного наполнения.
+"""
+
+import logging
+import math
+import time
+
+from django.core.cache import cache as default_cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Базовый throttle с корзиной токенов в кэше.
+    """
+    
+    cache = default_cache
+    cache_format = 'throttle:{scope}:{ident}'
+    scope = None
+    timer = time.time
+    
+    def __init__(self):
+        self.burst, self.rate = self.get_rate()
+        self.wait_seconds = None
+    
+    def get_rate(self):
+        """
+        Возвращает емкость корзины и скорость пополнения (токенов в секунду).
+        """
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return None, None
+        num_requests, duration = SimpleRateThrottle.parse_rate(None, rate)
+        return num_requests, num_requests / duration
+    
+    def applies(self, request, view) -> bool:
+        """
+        Применяется ли ограничение к запросу.
+        """
+        return True
+    
+    def get_ident_key(self, request) -> str:
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return f'user:{user.pk}'
+        return f'ip:{self.get_ident(request)}'
+    
+    def allow_request(self, request, view):
+        if self.burst is None or not self.applies(request, view):
+            return True
+        
+        key = self.cache_format.format(scope=self.scope, ident=self.get_ident_key(request))
+        return self.consume(key)
+    
+    def consume(self, key: str) -> bool:
+        """
+        Забирает токен из корзины; при ошибке кэша пропускает запрос.
+        
+        Returns:
+            bool: True если токен был доступен
+        """
+        try:
+            return self._consume(key)
+        except Exception:
+            logger.warning('Кэш ограничения частоты недоступен, запрос пропущен', exc_info=True)
+            return True
+    
+    def _consume(self, key: str) -> bool:
+        start_key, count_key = f'{key}:start', f'{key}:count'
+        timeout = max(3600, math.ceil(2 * self.burst / self.rate))
+        now = self.timer()
+        
+        # Счетчик только создается, но не сбрасывается: другой воркер мог уже
+        # списать токены новой корзины между add и этой строкой
+        if self.cache.add(start_key, now, timeout):
+            self.cache.add(count_key, 0, timeout)
+        start = self.cache.get(start_key)
+        
+        try:
+            consumed = self.cache.incr(count_key)
+        except ValueError:
+            self.cache.add(count_key, 0, timeout)
+            try:
+                consumed = self.cache.incr(count_key)
+            except ValueError:
+                return True
+        
+        if start is None:
+            return True
+        
+        # Корзина заполнена до краев: сдвигаем момент отсчета, чтобы
+        # простой не копил больше burst токенов
+        if self.rate * (now - start) - (consumed - 1) > 0:
+            start = now - (consumed - 1) / self.rate
+            self.cache.set(start_key, start, timeout)
+        
+        allowance = self.burst + self.rate * (now - start)
+        if consumed <= allowance:
+            return True
+        
+        # Отклоненный запрос токен не расходует
+        self.cache.decr(count_key)
+        self.wait_seconds = (consumed - allowance) / self.rate
+        return False
+    
+    def wait(self):
+        return self.wait_seconds
+
+
+class ReadThrottle(TokenBucketThrottle):
+    """
+    Ограничение для чтения (GET, HEAD, OPTIONS).
+    """
+    
+    scope = 'read'
+    
+    def applies(self, request, view):
+        return request.method in SAFE_METHODS
+
+
+class SearchThrottle(TokenBucketThrottle):
+    """
+    Ограничение для поисковых запросов (search и фильтры *_contains).
+    """
+    
+    scope = 'search'
+    
+    def applies(self, request, view):
+        if request.method not in SAFE_METHODS:
+            return False
+        return any(
+            value and (name == api_settings.SEARCH_PARAM or name.endswith('_contains'))
+            for name, value in request.GET.items()
+        )
+
+
+class BulkWriteThrottle(TokenBucketThrottle):
+    """
+    Ограничение для массовой записи (создание и массовое обновление оборудования).
+    """
+    
+    scope = 'bulk_write'
+    
+    def applies(self, request, view):
+        return request.method not in SAFE_METHODS
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """
+    Ограничение попыток входа по IP.
+    
+    Каждая попытка стоит проверки пароля, поэтому ограничение
+    действует независимо от аутентификации.
+    """
+    
+    scope = 'login'
+    
+    def get_ident_key(self, request):
+        return f'ip:{self.get_ident(request)}'
@@ -0,0 +1,184 @@
+"""
+Замер времени этапов обработки запроса.
+
+ServerTimingMiddleware для доли запросов SERVER_TIMING_SAMPLE_RATE создает
+RequestTimer, считает SQL запросы через execute_wrapper и по завершении
+отдает этапы в заголовке Server-Timing и одной строкой JSON в логе
+telecom_backend.timing. Этапы размечают TimedViewMixin (аутентификация,
+фильтры, пагинация, сериализация, рендеринг) и TimedPaginator (count).
+
+Время этапов исключающее: вложенный этап не учитывается во внешнем.
+Для запросов вне выборки phase() возвращает пустой контекстный менеджер,
+так что разметка почти ничего не стоит.
+"""
+
+import contextlib
+import contextvars
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+logger = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('request_timer', default=None)
+_null = contextlib.nullcontext()
+
+
+def get_sample_rate() -> float:
+    return getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0.0)
+
+
+def phase(name: str):
+    """
+    Размечает этап запроса; вне выборки ничего не делает.
+    """
+    timer = _current.get()
+    return timer.phase(name) if timer is not None else _null
+
+
+class RequestTimer:
+    """
+    Время этапов и SQL запросов одного запроса.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.queries = 0
+        self.sql_time = 0.0
+        self._children = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        self._children.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.record(name, elapsed - self._children.pop())
+            if self._children:
+                self._children[-1] += elapsed
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper соединения
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self, total: float) -> str:
+        """
+        Формирует значение заголовка Server-Timing.
+        """
+        metrics = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.phases.items()]
+        metrics.append(f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries"')
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(metrics)
+
+
+class TimedPaginator(Paginator):
+    """
+    Paginator, отмечающий запрос количества записей этапом count.
+    """
+
+    @cached_property
+    def count(self):
+        with phase('count'):
+            return super().count
+
+
+class TimedViewMixin:
+    """
+    Разметка этапов DRF view: auth, filter, page, serialize, render.
+    """
+
+    def perform_authentication(self, request):
+        with phase('auth'):
+            super().perform_authentication(request)
+
+    def filter_queryset(self, queryset):
+        with phase('filter'):
+            return super().filter_queryset(queryset)
+
+    def paginate_queryset(self, queryset):
+        with phase('page'):
+            return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if _current.get() is not None and 'data' not in kwargs:
+            # Сериализация выполняется при первом обращении к data
+            with phase('serialize'):
+                serializer.data
+        return serializer
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        timer = _current.get()
+        if timer is not None and hasattr(response, 'add_post_render_callback') and not response.is_rendered:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timer.record('render', time.perf_counter() - started)
+            )
+        return response
+
+
+class ServerTimingMiddleware:
+    """
+    Замеряет выборку запросов и отдает результат в Server-Timing и в лог.
+
+    Запросы считаются только на соединениях потока middleware: под ASGI
+    запросы асинхронных view выполняются в других потоках и не попадают в db.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        rate = get_sample_rate()
+        if rate <= 0 or (rate < 1 and random.random() >= rate):
+            return self.get_response(request)
+
+        timer = RequestTimer()
+        token = _current.set(timer)
+        try:
+            with contextlib.ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = timer.total
+        response['Server-Timing'] = timer.header(total)
+        self.log(request, response, timer, total)
+        return response
+
+    def log(self, request, response, timer, total) -> None:
+        match = getattr(request, 'resolver_match', None)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 2),
+            'db_queries': timer.queries,
+            'db_ms': round(timer.sql_time * 1000, 2),
+            'phases_ms': {name: round(seconds * 1000, 2) for name, seconds in timer.phases.items()},
+        }, ensure_ascii=False))
@@ -2,25 +2,31 @@ from django.contrib import admin
 from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
-from django.views.static import serve
 from . import views
 
 urlpatterns = [
+    path('admin/profiles/', views.request_profiles, name='request-profiles'),
+    path(
+        'admin/profiles/<str:profile_id>.<str:kind>',
+        views.request_profile_download,
+        name='request-profile-download'
+    ),
+    path('admin/memory/', views.memory_usage, name='memory-usage'),
+    path('admin/slow-queries/', views.slow_queries, name='slow-queries'),
     path('admin/', admin.site.urls),
     
     path('api/equipment/', include('equipment.urls')),
     path('api/user/', include('authentication.urls')),
     
+    path('health/live/', views.liveness, name='liveness'),
+    path('health/ready/', views.readiness, name='readiness'),
+    path('metrics', views.metrics, name='metrics'),
+    
     path('', views.index, name='index'),
+    re_path(r'^frontend/(?P<path>.+)$', views.frontend_static, name='frontend-static'),
 ]
 
 if settings.DEBUG:
-    urlpatterns += [
-        re_path(r'^frontend/(?P<path>.*)$', serve, {
-            'document_root': settings.BASE_DIR / 'frontend',
-        }),
-    ]
-    
     urlpatterns += [
         path('app.js', views.frontend_static, {'path': 'app.js'}, name='app-js'),
         path('style.css', views.frontend_static, {'path': 'style.css'}, name='style-css'),
@@ -1,58 +1,147 @@
-from django.shortcuts import render
-from django.http import FileResponse, Http404, HttpResponse
+from django.contrib import admin
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.response import TemplateResponse
 from django.conf import settings
 from django.views.generic import TemplateView
-from django.views.static import serve
 import os
-import mimetypes
+
+from . import memory, metrics as app_metrics, warmup
+from .assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, asset_store
+from .profiling import profile_store
+from .slow_queries import get_threshold, slow_query_log
 
 
 def index(request):
     """
     Отдает главную страницу frontend приложения.
+    
+    Страница берется из кэша и ссылается на app.js по URL с отпечатком,
+    поэтому браузер перепроверяет только сам index.html по ETag.
     """
     try:
-        frontend_path = os.path.join(settings.BASE_DIR, 'frontend', 'index.html')
-        if os.path.exists(frontend_path):
-            with open(frontend_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            response = HttpResponse(content, content_type='text/html; charset=utf-8')
-            response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-            response['Pragma'] = 'no-cache'
-            response['Expires'] = '0'
-            return response
-        else:
-            raise Http404("Frontend файл не найден")
-    except Exception as e:
-        raise Http404(f"Ошибка загрузки frontend: {str(e)}")
+        shell = asset_store.shell()
+    except Http404:
+        raise Http404("Frontend файл не найден")
+    return shell.response(request)
 
 
 def frontend_static(request, path):
     """
     Обслуживает статические файлы frontend с правильными MIME типами.
+    
+    Файл по URL с актуальным отпечатком кэшируется браузером навсегда,
+    остальные перепроверяются по ETag.
     """
-    try:
-        file_path = os.path.join(settings.BASE_DIR, 'frontend', path)
-        if os.path.exists(file_path):
-            mime_type, _ = mimetypes.guess_type(file_path)
-            if mime_type is None:
-                if path.endswith('.js'):
-                    mime_type = 'application/javascript'
-                elif path.endswith('.css'):
-                    mime_type = 'text/css'
-                else:
-                    mime_type = 'application/octet-stream'
-            
-            with open(file_path, 'rb') as f:
-                response = HttpResponse(f.read(), content_type=mime_type)
-                response['Access-Control-Allow-Origin'] = '*'
-                response['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
-                response['Access-Control-Allow-Headers'] = 'Content-Type'
-                return response
-        else:
-            raise Http404(f"Файл {path} не найден")
-    except Exception as e:
-        raise Http404(f"Ошибка загрузки файла {path}: {str(e)}")
+    asset, fingerprinted = asset_store.lookup(path)
+    response = asset.response(
+        request,
+        IMMUTABLE_CACHE_CONTROL if fingerprinted else REVALIDATE_CACHE_CONTROL
+    )
+    response['Access-Control-Allow-Origin'] = '*'
+    response['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
+    response['Access-Control-Allow-Headers'] = 'Content-Type'
+    return response
+
+
+def liveness(request):
+    """
+    Процесс запущен и обрабатывает запросы.
+    """
+    return JsonResponse({'status': 'alive'})
+
+
+def readiness(request):
+    """
+    Процесс прогрет и готов принимать трафик.
+    
+    До завершения прогрева (см. warmup.py) возвращает 503, чтобы
+    балансировщик не направлял запросы на холодный воркер. Endpoint открыт
+    без аутентификации, поэтому подробности ошибки прогрева только в логах.
+    """
+    state = warmup.get_state()
+    if state['ready']:
+        return JsonResponse({'status': 'ready'})
+    return JsonResponse({'status': 'failed' if state['error'] else 'warming_up'}, status=503)
+
+
+def metrics(request):
+    """
+    Метрики в текстовом формате Prometheus, суммированные по воркерам.
+    
+    Требуется заголовок Authorization: Bearer <METRICS_TOKEN>; без токена
+    в настройках endpoint отключен и отвечает 404.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        raise Http404('Метрики отключены: METRICS_TOKEN не задан')
+    if not app_metrics.is_authorized(request, token):
+        return JsonResponse({'detail': 'Недействительный токен метрик'}, status=401)
+    return HttpResponse(app_metrics.generate(), content_type=app_metrics.CONTENT_TYPE_LATEST)
+
+
+@staff_member_required
+def request_profiles(request):
+    """
+    Список сохраненных профилей запросов в админке.
+    """
+    return TemplateResponse(request, 'admin/request_profiles.html', {
+        **admin.site.each_context(request),
+        'title': 'Профили запросов',
+        'profiles': profile_store.list(),
+        'max_entries': profile_store.max_entries,
+    })
+
+
+@staff_member_required
+def request_profile_download(request, profile_id, kind):
+    """
+    Скачивание профиля: свернутые стеки (folded) или JSON с журналом SQL.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise Http404('Профиль не найден')
+    
+    if kind not in ('folded', 'json'):
+        raise Http404('Профиль не найден')
+    
+    if kind == 'folded':
+        response = HttpResponse(profile['folded'], content_type='text/plain; charset=utf-8')
+    else:
+        response = JsonResponse(profile, json_dumps_params={'ensure_ascii': False, 'indent': 2})
+    response['Content-Disposition'] = f'attachment; filename="profile-{profile_id}.{kind}"'
+    return response
+
+
+@staff_member_required
+def memory_usage(request):
+    """
+    Сводка выделения памяти по view в админке.
+    """
+    if request.method == 'POST':
+        memory.clear()
+    return TemplateResponse(request, 'admin/memory_usage.html', {
+        **admin.site.each_context(request),
+        'title': 'Выделение памяти по view',
+        'summaries': memory.get_summaries(),
+        'sample_rate': memory.get_sample_rate(),
+    })
+
+
+@staff_member_required
+def slow_queries(request):
+    """
+    Медленные SQL запросы в админке, сгруппированные по отпечатку.
+    """
+    if request.method == 'POST':
+        slow_query_log.clear()
+    return TemplateResponse(request, 'admin/slow_queries.html', {
+        **admin.site.each_context(request),
+        'title': 'Медленные SQL запросы',
+        'groups': slow_query_log.groups(),
+        'threshold': get_threshold(),
+        'log_file': slow_query_log.path,
+    })
 
 
 class FrontendView(TemplateView):
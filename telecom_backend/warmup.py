@@ -0,0 +1,134 @@
+"""
+Прогрев процесса перед приемом запросов.
+
+При запуске через gunicorn.conf.py мастер-процесс загружает приложение и
+прогревает общие кэши (маски серийных номеров, URL resolver, типы контента)
+до fork, так что воркеры получают их готовыми. Каждый воркер после fork
+проверяет соединения с базой, прогревает кэши процесса и только после этого
+отмечается готовым — это состояние отдает readiness endpoint.
+
+Соединения Django привязаны к потоку, а post_fork выполняется в главном потоке
+воркера. Готовое соединение достается запросам только там, где они
+обрабатываются в этом же потоке (sync воркер). Потоки gthread и ASGI получают
+прогретые соединения только из пула (MYSQL_POOL_SIZE): прогрев открывает
+в нем size соединений, и они доступны любому потоку.
+"""
+
+import logging
+import threading
+import time
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import connections
+from django.urls import get_resolver
+
+from .db.pool import dispose_all
+
+logger = logging.getLogger(__name__)
+
+_state = {
+    'ready': False,
+    'started_at': None,
+    'duration': None,
+    'serial_masks': 0,
+    'pooled_connections': 0,
+    'error': None,
+}
+_lock = threading.Lock()
+
+
+def open_connections() -> int:
+    """
+    Открывает соединения со всеми базами данных и заполняет пулы.
+
+    Соединение базы с пулом возвращается в пул, остальные остаются открытыми
+    в текущем потоке.
+
+    Returns:
+        int: Количество свободных соединений в пулах
+    """
+    pooled = 0
+    for alias in connections:
+        connection = connections[alias]
+        connection.ensure_connection()
+        pool = connection.get_pool() if hasattr(connection, 'get_pool') else None
+        if pool is not None:
+            connection.close()
+            pooled += pool.fill()
+    return pooled
+
+
+def prime_caches() -> int:
+    """
+    Прогревает кэши, не привязанные к соединению с базой.
+
+    Returns:
+        int: Количество скомпилированных масок серийных номеров
+    """
+    from authentication.revocation import revocation_store
+    from equipment.models import EquipmentType, compile_serial_mask
+
+    get_resolver().url_patterns
+    ContentType.objects.get_for_models(*apps.get_models())
+
+    masks = set(EquipmentType.objects.values_list('serial_mask', flat=True))
+    for mask in masks:
+        compile_serial_mask(mask)
+
+    revocation_store.warm_up()
+    return len(masks)
+
+
+def warm_up_master() -> None:
+    """
+    Прогрев мастер-процесса перед fork.
+
+    Соединения с базой закрываются, а пулы очищаются: воркеры не должны
+    делить сокеты мастера.
+    """
+    try:
+        prime_caches()
+    except Exception:
+        logger.exception('Прогрев мастер-процесса не выполнен')
+    finally:
+        connections.close_all()
+        dispose_all()
+
+
+def warm_up() -> dict:
+    """
+    Прогревает процесс воркера и отмечает его готовым.
+
+    Returns:
+        dict: Состояние прогрева
+    """
+    with _lock:
+        _state.update(ready=False, started_at=time.time(), error=None)
+        started = time.perf_counter()
+        try:
+            _state['pooled_connections'] = open_connections()
+            _state['serial_masks'] = prime_caches()
+        except Exception as e:
+            # Текст ошибки (хост, пользователь базы) остается в логах и не отдается readiness
+            _state['error'] = str(e)
+            logger.exception('Прогрев воркера не выполнен')
+        else:
+            _state['ready'] = True
+        _state['duration'] = round(time.perf_counter() - started, 3)
+        if _state['ready']:
+            logger.info('Прогрев завершен за %.3f с, масок: %d', _state['duration'], _state['serial_masks'])
+        return dict(_state)
+
+
+def is_ready() -> bool:
+    return _state['ready']
+
+
+def get_state() -> dict:
+    return dict(_state)
+
+
+def reset() -> None:
+    with _lock:
+        _state.update(ready=False, started_at=None, duration=None, serial_masks=0, pooled_connections=0, error=None)
@@ -0,0 +1,301 @@
+#!/usr/bin/env python
+"""
+Бенчмарк API оборудования на больших наборах данных с контролем регрессий.
+
+Для каждой базы (--backend sqlite mysql) и каждого объема (--rows) база
+заполняется набором из tests/benchmarks/datasets.py, после чего сценарии
+выполняются через тестовый клиент Django в том же процессе: в замер входят
+middleware, DRF, сериализация и запросы к базе, но не сеть. Для каждого
+сценария выводятся p50/p95/p99 задержки и пропускная способность.
+
+Результаты сохраняются в JSON (--output) и сравниваются с зафиксированным
+baseline (по умолчанию tests/benchmarks/baseline.json): регрессией считается
+рост p50 или падение req/s больше чем на --tolerance. При регрессии скрипт
+завершается с кодом 1. --update-baseline записывает результаты в baseline.
+
+SQLite база создается в --data-dir (отдельный файл на объем, переиспользуется
+между запусками). Для MySQL используются MYSQL_HOST, MYSQL_PORT, MYSQL_USER
+и MYSQL_PASSWORD, а база берется из MYSQL_BENCH_DATABASE (по умолчанию
+telecom_bench), а не из MYSQL_DATABASE: таблицы оборудования в ней очищаются.
+База с данными, но без таблицы bench_dataset, не очищается. Базу нужно
+создать и выдать на нее права пользователю, например:
+
+    docker-compose up -d mysql
+    python tests/benchmarks/bench_api.py \\
+        --backend sqlite mysql --rows 100000 1000000
+
+Сравнение имеет смысл только на той же машине, где снят baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+BACKENDS = {
+    'sqlite': {'USE_MYSQL': 'False'},
+    # Отдельная база: набор очищает таблицы оборудования, а MYSQL_DATABASE
+    # по умолчанию указывает на рабочую базу приложения
+    'mysql': {'USE_MYSQL': 'True', 'MYSQL_DATABASE': os.getenv('MYSQL_BENCH_DATABASE', 'telecom_bench')},
+}
+
+# Окружение, исключающее из замера ограничения частоты и выборочные замеры
+BENCH_ENV = {
+    'DJANGO_SETTINGS_MODULE': 'telecom_backend.settings',
+    'THROTTLE_RATE_READ': '1000000/s',
+    'THROTTLE_RATE_SEARCH': '1000000/s',
+    'THROTTLE_RATE_BULK_WRITE': '1000000/s',
+    'SERVER_TIMING_SAMPLE_RATE': '0',
+    'MEMORY_TRACKING_SAMPLE_RATE': '0',
+}
+
+BULK_CREATE_SIZE = 100
+COMPARED = {'p50_ms': 'up', 'rps': 'down'}
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))] * 1000
+
+
+def scenarios(rows, type_ids, rng):
+    """
+    Возвращает сценарии: имя -> функция, выполняющая один запрос клиентом.
+    """
+    from tests.benchmarks.datasets import is_active
+
+    pages = max(1, min(rows // 20, 50))
+
+    def active_id():
+        while True:
+            number = rng.randrange(rows)
+            if is_active(number):
+                return number + 1
+
+    def serial_part():
+        return f'{rng.randrange(rows):010d}'[-6:]
+
+    def bulk_create(client):
+        start = rng.randrange(9 * 10 ** 9, 10 ** 10 - BULK_CREATE_SIZE)
+        return client.post('/api/equipment/', {
+            'equipment_type': rng.choice(type_ids),
+            'serial_numbers': [str(start + number) for number in range(BULK_CREATE_SIZE)],
+        }, content_type='application/json')
+
+    return {
+        'list': lambda client: client.get('/api/equipment/', {'page': rng.randint(1, pages)}),
+        'search': lambda client: client.get('/api/equipment/', {'search': serial_part()}),
+        'filter': lambda client: client.get('/api/equipment/', {
+            'equipment_type': rng.choice(type_ids),
+            'serial_number_contains': serial_part()[-3:],
+        }),
+        'ordering': lambda client: client.get('/api/equipment/', {
+            'ordering': rng.choice(['serial_number', '-serial_number', 'updated_at', '-updated_at']),
+            'page': rng.randint(1, pages),
+        }),
+        'detail': lambda client: client.get(f'/api/equipment/{active_id()}/'),
+        'bulk_create': bulk_create,
+        'stats': lambda client: client.get('/api/equipment/stats/'),
+        'types': lambda client: client.get('/api/equipment/types/'),
+    }
+
+
+def measure(client, request, count, warmup, write):
+    """
+    Выполняет сценарий count раз. Записи откатываются после каждого запроса,
+    чтобы набор данных не менялся между запусками.
+    """
+    from django.db import transaction
+
+    def call():
+        if not write:
+            return request(client)
+        with transaction.atomic():
+            response = request(client)
+            transaction.set_rollback(True)
+        return response
+
+    for _ in range(warmup):
+        call()
+
+    timings = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(count):
+        request_started = time.perf_counter()
+        response = call()
+        timings.append(time.perf_counter() - request_started)
+        errors += response.status_code >= 400
+    elapsed = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        'requests': count,
+        'errors': errors,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'rps': round(count / elapsed, 1),
+    }
+
+
+def worker(rows, count, warmup, only, rebuild):
+    """Выполняется в дочернем процессе с уже выставленным окружением."""
+    sys.path.insert(0, str(ROOT))
+
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from equipment.models import EquipmentType
+    from tests.benchmarks.datasets import ensure_dataset
+
+    # DEBUG включен в базовых настройках; журнал SQL искажает замер
+    settings.DEBUG = False
+    call_command('migrate', verbosity=0)
+    ensure_dataset(rows, rebuild=rebuild, log=lambda message: print(message, file=sys.stderr))
+
+    user, _ = get_user_model().objects.get_or_create(username='bench')
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    type_ids = list(EquipmentType.objects.values_list('id', flat=True))
+
+    results = {}
+    for name, request in scenarios(rows, type_ids, random.Random(42)).items():
+        if only and name not in only:
+            continue
+        results[name] = measure(client, request, count, warmup, write=name == 'bulk_create')
+        print(f'  {connection.vendor} {rows:,}: {name} готов', file=sys.stderr)
+    print(json.dumps(results))
+
+
+def run_worker(backend, rows, args):
+    env = {**os.environ, **BENCH_ENV, **BACKENDS[backend]}
+    if backend == 'sqlite':
+        env['SQLITE_PATH'] = str(Path(args.data_dir) / f'bench-{rows}.sqlite3')
+    command = [
+        sys.executable, __file__, '--worker', '--rows', str(rows),
+        '--requests', str(args.requests), '--warmup', str(args.warmup),
+    ]
+    if args.scenario:
+        command += ['--scenario', *args.scenario]
+    if args.rebuild:
+        command.append('--rebuild')
+
+    result = subprocess.run(command, env=env, stdout=subprocess.PIPE, text=True)
+    if result.returncode:
+        sys.exit(f'{backend} {rows}: воркер завершился с кодом {result.returncode}')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    """
+    Сравнивает результаты с baseline.
+
+    Returns:
+        list: строки с описанием регрессий
+    """
+    regressions = []
+    for backend, sizes in results.items():
+        for rows, measured in sizes.items():
+            expected = baseline.get(backend, {}).get(rows, {})
+            for name, stats in measured.items():
+                if name not in expected:
+                    continue
+                for metric, direction in COMPARED.items():
+                    before, after = expected[name][metric], stats[metric]
+                    change = (after - before) / before if before else 0.0
+                    if (change > tolerance if direction == 'up' else change < -tolerance):
+                        regressions.append(
+                            f'{backend} {rows} {name}: {metric} {before} -> {after} ({change:+.0%})'
+                        )
+    return regressions
+
+
+def print_table(results, baseline):
+    header = f'{"сценарий":<14}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}{"req/s":>10}{"ошибки":>8}{"p50 к baseline":>16}'
+    for backend, sizes in results.items():
+        for rows, measured in sizes.items():
+            print(f'\n{backend}, {int(rows):,} строк')
+            print(header)
+            expected = baseline.get(backend, {}).get(rows, {})
+            for name, stats in measured.items():
+                delta = ''
+                if name in expected and expected[name]['p50_ms']:
+                    delta = f'{stats["p50_ms"] / expected[name]["p50_ms"] - 1:+.0%}'
+                print(f'{name:<14}{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}{stats["p99_ms"]:>10.2f}'
+                      f'{stats["rps"]:>10.0f}{stats["errors"]:>8}{delta:>16}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', nargs='+', choices=BACKENDS, default=['sqlite'])
+    parser.add_argument('--rows', nargs='+', type=int, default=[100000])
+    parser.add_argument('--requests', type=int, default=200, help='запросов на сценарий')
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--scenario', nargs='+', help='выполнить только указанные сценарии')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'telecom-bench'))
+    parser.add_argument('--rebuild', action='store_true', help='заново заполнить базу')
+    parser.add_argument('--output', help='файл для результатов JSON')
+    parser.add_argument('--baseline', default=str(BASELINE))
+    parser.add_argument('--tolerance', type=float, default=0.25, help='допустимое отклонение, доля')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.rows[0], args.requests, args.warmup, args.scenario, args.rebuild)
+        return
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {
+        backend: {str(rows): run_worker(backend, rows, args) for rows in args.rows}
+        for backend in args.backend
+    }
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    print_table(results, baseline.get('results', {}))
+
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'machine': {'platform': platform.platform(), 'python': platform.python_version(), 'cpus': os.cpu_count()},
+        'requests': args.requests,
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + '\n')
+
+    if args.update_baseline:
+        merged = baseline.get('results', {})
+        for backend, sizes in results.items():
+            merged.setdefault(backend, {}).update(sizes)
+        baseline_path.write_text(json.dumps({**report, 'results': merged}, indent=2, ensure_ascii=False) + '\n')
+        print(f'\nbaseline обновлен: {baseline_path}')
+        return
+
+    regressions = compare(results, baseline.get('results', {}), args.tolerance)
+    if regressions:
+        print(f'\nРегрессии больше {args.tolerance:.0%}:')
+        for line in regressions:
+            print(f'  {line}')
+        sys.exit(1)
+    print(f'\nРегрессий больше {args.tolerance:.0%} нет')
+
+
+if __name__ == '__main__':
+    main()
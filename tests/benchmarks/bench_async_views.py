@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+"""
+Бенчмарк синхронных и асинхронных view оборудования под ASGI.
+
+Поднимает gunicorn с uvicorn воркером (SERVER_MODE=asgi) на временной
+SQLite базе и открывает N одновременных keep-alive соединений, каждое из
+которых по кругу запрашивает список, карточку и статистику оборудования.
+Режимы отличаются только EQUIPMENT_ASYNC_VIEWS. Django под ASGI выполняет
+синхронный код каждого запроса в отдельном потоке (ThreadSensitiveContext),
+поэтому, пока в стеке есть синхронные middleware, число потоков растет с
+числом соединений в обоих режимах; разница видна в задержках и хвостах.
+
+Выводит пропускную способность, p50/p95/p99 задержки, ошибки и число
+потоков воркера по /proc.
+
+Запуск:
+    python tests/benchmarks/bench_async_views.py --connections 1000 --requests 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+MODES = {
+    'sync view': 'False',
+    'async view': 'True',
+}
+
+SETUP = """
+import django
+django.setup()
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.tokens import RefreshToken
+from tests.factories import EquipmentFactory, EquipmentTypeFactory
+
+call_command('migrate', verbosity=0)
+user = get_user_model().objects.create_user(username='bench', password='bench-pass-1')
+for equipment_type in EquipmentTypeFactory.create_batch(5):
+    EquipmentFactory.create_batch({rows} // 5, equipment_type=equipment_type)
+print(RefreshToken.for_user(user).access_token)
+"""
+
+
+def percentile(timings, fraction):
+    if not timings:
+        return 0.0
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))] * 1000
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_threads(master_pid: int) -> int:
+    """Максимум потоков среди дочерних процессов мастера gunicorn."""
+    threads = 0
+    for status in Path('/proc').glob('[0-9]*/status'):
+        try:
+            text = status.read_text()
+        except OSError:
+            continue
+        if re.search(rf'^PPid:\s+{master_pid}$', text, re.M):
+            threads = max(threads, int(re.search(r'^Threads:\s+(\d+)$', text, re.M).group(1)))
+    return threads
+
+
+async def fetch(reader, writer, path, host, token):
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\n\r\n'.encode()
+    )
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = int(re.search(rb'content-length:\s*(\d+)', head, re.I).group(1))
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, paths, token, requests, start, results):
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        results['errors'] += requests
+        return
+    await start.wait()
+    try:
+        for number in range(requests):
+            begin = time.perf_counter()
+            status = await fetch(reader, writer, paths[number % len(paths)], f'{host}:{port}', token)
+            if status == 200:
+                results['timings'].append(time.perf_counter() - begin)
+            else:
+                results['errors'] += 1
+    except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        results['errors'] += requests - number
+    finally:
+        writer.close()
+
+
+async def load(host, port, paths, token, connections, requests, pid):
+    results = {'timings': [], 'errors': 0, 'threads': 0}
+    start = asyncio.Event()
+    tasks = [
+        asyncio.create_task(client(host, port, paths, token, requests, start, results))
+        for _ in range(connections)
+    ]
+    await asyncio.sleep(1)
+
+    async def sample_threads():
+        while True:
+            results['threads'] = max(results['threads'], worker_threads(pid))
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.create_task(sample_threads())
+    began = time.perf_counter()
+    start.set()
+    await asyncio.gather(*tasks)
+    results['elapsed'] = time.perf_counter() - began
+    sampler.cancel()
+    return results
+
+
+def wait_ready(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f'gunicorn завершился с кодом {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1) as sock:
+                sock.sendall(b'GET /health/ready/ HTTP/1.1\r\nHost: bench\r\nConnection: close\r\n\r\n')
+                if b' 200 ' in sock.recv(64):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    sys.exit('gunicorn не стал готов')
+
+
+def run_mode(async_views, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'telecom_backend.settings',
+            'USE_MYSQL': 'False',
+            'SQLITE_TUNED': 'True',
+            'SQLITE_PATH': os.path.join(tmp, 'bench.sqlite3'),
+            'EQUIPMENT_ASYNC_VIEWS': async_views,
+            'THROTTLE_RATE_READ': '1000000/min',
+            'THROTTLE_RATE_SEARCH': '1000000/min',
+        }
+        token = subprocess.run(
+            [sys.executable, '-c', SETUP.format(rows=args.rows)],
+            env=env, cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+            env={
+                **env,
+                'SERVER_MODE': 'asgi',
+                'GUNICORN_BIND': f'127.0.0.1:{port}',
+                'GUNICORN_WORKERS': str(args.workers),
+                'GUNICORN_BACKLOG': str(max(2048, args.connections)),
+                'GUNICORN_TIMEOUT': '120',
+                'GUNICORN_KEEPALIVE': '120',
+                'GUNICORN_ACCESS_LOG': '/dev/null',
+                'GUNICORN_LOG_LEVEL': 'warning',
+            },
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_ready(port, server)
+            paths = ['/api/equipment/?page_size=20', '/api/equipment/1/', '/api/equipment/stats/']
+            return asyncio.run(load(
+                '127.0.0.1', port, paths, token, args.connections, args.requests, server.pid
+            ))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=5, help='запросов на одно соединение')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--rows', type=int, default=1000, help='записей оборудования в базе')
+    parser.add_argument('--json', action='store_true', help='вывести результаты в JSON')
+    args = parser.parse_args()
+
+    report = {}
+    for name, async_views in MODES.items():
+        results = run_mode(async_views, args)
+        timings = results['timings']
+        report[name] = {
+            'rps': round(len(timings) / results['elapsed'], 1),
+            'p50': round(percentile(timings, 0.50), 2),
+            'p95': round(percentile(timings, 0.95), 2),
+            'p99': round(percentile(timings, 0.99), 2),
+            'errors': results['errors'],
+            'threads': results['threads'],
+        }
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f'{args.connections} соединений x {args.requests} запросов, воркеров: {args.workers}, записей: {args.rows}')
+    print(f'{"режим":<12}{"запр/с":>9}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}{"ошибки":>8}{"потоки":>8}')
+    for name, stats in report.items():
+        print(f'{name:<12}{stats["rps"]:>9.1f}{stats["p50"]:>10.1f}{stats["p95"]:>10.1f}'
+              f'{stats["p99"]:>10.1f}{stats["errors"]:>8}{stats["threads"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
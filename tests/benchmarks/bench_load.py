@@ -0,0 +1,436 @@
+#!/usr/bin/env python
+"""
+Нагрузочный тест API по HTTP на localhost со смешанным трафиком.
+
+Поднимает gunicorn (SERVER_MODE=wsgi или asgi) на временной SQLite базе с
+набором из tests/benchmarks/datasets.py либо подключается к уже запущенному
+локальному серверу (--url, только loopback адреса). Каждый виртуальный
+пользователь входит через POST /api/user/login/, а затем до истечения
+--duration выполняет действия в пропорциях --mix:
+
+    list     обход --walk страниц списка по ссылкам next
+    search   поиск по части серийного номера
+    detail   карточка записи с последней просмотренной страницы списка
+    create   создание пачки из --burst серийных номеров
+    delete   удаление одной из созданных пользователем записей
+    restore  восстановление одной из удаленных им записей
+
+delete и restore работают только с записями, созданными этим пользователем;
+пока таких нет, вместо них выполняется create (для detail — list). При ответе 401 пользователь
+входит заново. Выводит p50/p95/p99 задержки, число ошибок и пропускную
+способность по каждому endpoint, с --output сохраняет их в JSON.
+
+Запуск:
+    python tests/benchmarks/bench_load.py --users 20 --duration 30
+    python tests/benchmarks/bench_load.py --url http://127.0.0.1:8000 \\
+        --username admin --password secret --mix list=50,detail=50
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_MIX = 'list=30,search=15,detail=30,create=10,delete=10,restore=5'
+
+SETUP = """
+import django
+django.setup()
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from equipment.models import EquipmentType
+from tests.benchmarks.datasets import ensure_dataset
+
+settings.DEBUG = False
+call_command('migrate', verbosity=0)
+ensure_dataset({rows}, log=lambda message: None)
+get_user_model().objects.create_user(username={username!r}, password={password!r})
+print(list(EquipmentType.objects.values_list('id', flat=True)))
+"""
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))] * 1000
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ACTIONS:
+            raise argparse.ArgumentTypeError(f'неизвестное действие: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def check_local(host):
+    """Нагрузка подается только на локальный сервер."""
+    try:
+        address = ipaddress.ip_address(socket.gethostbyname(host))
+    except (OSError, ValueError):
+        sys.exit(f'не удалось разрешить адрес {host}')
+    if not address.is_loopback:
+        sys.exit(f'{host} ({address}) не loopback адрес: нагрузочный тест запускается только на localhost')
+
+
+class Connection:
+    """
+    HTTP/1.1 соединение с переподключением, когда сервер его закрывает
+    (sync воркер gunicorn отвечает с Connection: close).
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, token=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = [
+            f'{method} {path} HTTP/1.1',
+            f'Host: {self.host}:{self.port}',
+            'Accept: application/json',
+            f'Content-Length: {len(payload)}',
+        ]
+        if payload:
+            head.append('Content-Type: application/json')
+        if token:
+            head.append(f'Authorization: Bearer {token}')
+        raw = ('\r\n'.join(head) + '\r\n\r\n').encode() + payload
+
+        for attempt in range(2):
+            reused = self.writer is not None
+            if not reused:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self.writer.write(raw)
+                await self.writer.drain()
+                return await self.read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                # Сервер мог закрыть простаивающее keep-alive соединение
+                if not reused or attempt:
+                    raise
+
+    async def read_response(self):
+        lines = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(lines[0].split(' ', 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while size := int((await self.reader.readuntil(b'\r\n')).split(b';')[0], 16):
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readuntil(b'\r\n')
+            await self.reader.readuntil(b'\r\n')
+            content = b''.join(chunks)
+        else:
+            content = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, content
+
+
+class Stats:
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint, elapsed, ok):
+        if ok:
+            self.timings[endpoint].append(elapsed)
+        else:
+            self.errors[endpoint] += 1
+
+    def report(self, elapsed):
+        report = {}
+        for endpoint in sorted(set(self.timings) | set(self.errors)):
+            timings = sorted(self.timings[endpoint])
+            report[endpoint] = {
+                'requests': len(timings) + self.errors[endpoint],
+                'errors': self.errors[endpoint],
+                'p50_ms': round(percentile(timings, 0.5), 2) if timings else None,
+                'p95_ms': round(percentile(timings, 0.95), 2) if timings else None,
+                'p99_ms': round(percentile(timings, 0.99), 2) if timings else None,
+                'rps': round(len(timings) / elapsed, 1),
+            }
+        return report
+
+
+class VirtualUser:
+    """
+    Пользователь API: входит по логину и паролю и выполняет действия.
+    """
+
+    def __init__(self, number, connection, args, type_ids, stats):
+        self.number = number
+        self.connection = connection
+        self.args = args
+        self.type_ids = type_ids
+        self.stats = stats
+        self.rng = random.Random(number)
+        self.token = None
+        self.created = []
+        self.deleted = []
+        self.seen = []
+        self.serial = 0
+
+    async def call(self, endpoint, method, path, body=None, expected=(200,), authorize=True):
+        """Выполняет запрос и записывает задержку; возвращает (статус, JSON)."""
+        started = time.perf_counter()
+        try:
+            status, content = await self.connection.request(
+                method, path, body, self.token if authorize else None
+            )
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            self.stats.record(endpoint, time.perf_counter() - started, False)
+            return None, None
+        elapsed = time.perf_counter() - started
+
+        if status == 401 and authorize:
+            self.stats.record(endpoint, elapsed, False)
+            await self.login()
+            return await self.call(endpoint, method, path, body, expected, authorize)
+        self.stats.record(endpoint, elapsed, status in expected)
+        try:
+            return status, json.loads(content) if content else None
+        except ValueError:
+            return status, None
+
+    async def login(self):
+        status, data = await self.call('login', 'POST', '/api/user/login/', {
+            'username': self.args.username,
+            'password': self.args.password,
+        }, authorize=False)
+        if status != 200:
+            raise RuntimeError(f'вход не выполнен: {status} {data}')
+        self.token = data['tokens']['access']
+
+    def serial_number(self):
+        # Уникален между пользователями и не пересекается с набором данных
+        self.serial += 1
+        return f'9{self.number:03d}{self.serial:06d}'
+
+    async def list(self):
+        path = '/api/equipment/'
+        for _ in range(self.args.walk):
+            _, data = await self.call('list', 'GET', path)
+            if not data:
+                break
+            self.seen = [item['id'] for item in data.get('results', [])] or self.seen
+            if not data.get('next'):
+                break
+            url = urlsplit(data['next'])
+            path = f'{url.path}?{url.query}'
+
+    async def search(self):
+        query = urlencode({'search': f'{self.rng.randrange(self.args.rows):010d}'[-5:]})
+        await self.call('search', 'GET', f'/api/equipment/?{query}')
+
+    async def detail(self):
+        if not self.seen:
+            return await self.list()
+        # Запись со страницы мог удалить другой пользователь
+        await self.call('detail', 'GET', f'/api/equipment/{self.rng.choice(self.seen)}/', expected=(200, 404))
+
+    async def create(self):
+        status, data = await self.call('create', 'POST', '/api/equipment/', {
+            'equipment_type': self.rng.choice(self.type_ids),
+            'serial_numbers': [self.serial_number() for _ in range(self.args.burst)],
+        }, expected=(201,))
+        if status == 201:
+            self.created.extend(item['id'] for item in data['data'])
+
+    async def delete(self):
+        if not self.created:
+            return await self.create()
+        pk = self.created.pop(self.rng.randrange(len(self.created)))
+        status, _ = await self.call('delete', 'DELETE', f'/api/equipment/{pk}/', expected=(200, 204))
+        if status in (200, 204):
+            self.deleted.append(pk)
+
+    async def restore(self):
+        if not self.deleted:
+            return await self.delete()
+        pk = self.deleted.pop()
+        status, _ = await self.call('restore', 'POST', f'/api/equipment/{pk}/restore/')
+        if status == 200:
+            self.created.append(pk)
+
+    async def run(self, mix, deadline, start):
+        await start.wait()
+        await self.login()
+        actions, weights = list(mix), list(mix.values())
+        while time.monotonic() < deadline:
+            await getattr(self, self.rng.choices(actions, weights)[0])()
+        await self.connection.close()
+
+
+ACTIONS = ('list', 'search', 'detail', 'create', 'delete', 'restore')
+# Действия, которым нужны id типов: delete и restore начинают с create
+WRITE_ACTIONS = {'create', 'delete', 'restore'}
+
+
+async def load(host, port, args, type_ids):
+    stats = Stats()
+    start = asyncio.Event()
+    deadline = time.monotonic() + args.duration + 1
+    users = [
+        VirtualUser(number, Connection(host, port), args, type_ids, stats)
+        for number in range(args.users)
+    ]
+    tasks = [asyncio.create_task(user.run(args.mix, deadline, start)) for user in users]
+    await asyncio.sleep(1)
+    began = time.perf_counter()
+    start.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - began
+    for result in results:
+        if isinstance(result, Exception):
+            print(f'виртуальный пользователь остановлен: {result}', file=sys.stderr)
+    return stats.report(elapsed), elapsed
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port, process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f'gunicorn завершился с кодом {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1) as sock:
+                sock.sendall(b'GET /health/ready/ HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n')
+                if b' 200 ' in sock.recv(64):
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    sys.exit('gunicorn не стал готов')
+
+
+def run_local_server(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            'DJANGO_SETTINGS_MODULE': 'telecom_backend.settings',
+            'USE_MYSQL': 'False',
+            'SQLITE_TUNED': 'True',
+            'SQLITE_PATH': os.path.join(tmp, 'load.sqlite3'),
+            'PROMETHEUS_MULTIPROC_DIR': os.path.join(tmp, 'metrics'),
+            'THROTTLE_RATE_LOGIN': '1000000/min',
+            'THROTTLE_RATE_READ': '1000000/min',
+            'THROTTLE_RATE_SEARCH': '1000000/min',
+            'THROTTLE_RATE_BULK_WRITE': '1000000/min',
+        }
+        os.makedirs(env['PROMETHEUS_MULTIPROC_DIR'])
+        setup = SETUP.format(rows=args.rows, username=args.username, password=args.password)
+        output = subprocess.run(
+            [sys.executable, '-c', setup], env=env, cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        type_ids = json.loads(output.strip().splitlines()[-1])
+
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'],
+            env={
+                **env,
+                'SERVER_MODE': args.server_mode,
+                'GUNICORN_BIND': f'127.0.0.1:{port}',
+                'GUNICORN_WORKERS': str(args.workers),
+                'GUNICORN_THREADS': str(args.threads),
+                'GUNICORN_ACCESS_LOG': '/dev/null',
+                'GUNICORN_LOG_LEVEL': 'warning',
+            },
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_ready(port, server)
+            return asyncio.run(load('127.0.0.1', port, args, type_ids))
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+
+def print_report(report, elapsed):
+    print(f'{"endpoint":<10}{"запросов":>10}{"ошибки":>8}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}{"req/s":>9}')
+    for endpoint, stats in report.items():
+        timings = ''.join(
+            f'{stats[key]:>10.2f}' if stats[key] is not None else f'{"-":>10}'
+            for key in ('p50_ms', 'p95_ms', 'p99_ms')
+        )
+        print(f'{endpoint:<10}{stats["requests"]:>10}{stats["errors"]:>8}{timings}{stats["rps"]:>9.1f}')
+    total = sum(stats['requests'] - stats['errors'] for stats in report.values())
+    print(f'\nвсего {total} успешных запросов за {elapsed:.1f} с: {total / elapsed:.1f} req/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', help='уже запущенный локальный сервер, например http://127.0.0.1:8000')
+    parser.add_argument('--username', default='load')
+    parser.add_argument('--password', default='load-pass-1')
+    parser.add_argument('--equipment-type', type=int, nargs='+', help='id типов для create, delete и restore с --url')
+    parser.add_argument('--users', type=int, default=20, help='виртуальных пользователей')
+    parser.add_argument('--duration', type=float, default=30, help='секунд нагрузки')
+    parser.add_argument('--mix', type=parse_mix, default=DEFAULT_MIX, help=f'по умолчанию {DEFAULT_MIX}')
+    parser.add_argument('--walk', type=int, default=3, help='страниц за один обход списка')
+    parser.add_argument('--burst', type=int, default=10, help='серийных номеров за один create')
+    parser.add_argument('--rows', type=int, default=100000, help='записей в наборе данных')
+    parser.add_argument('--server-mode', choices=['wsgi', 'asgi'], default='wsgi')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--output', help='файл для результатов JSON')
+    args = parser.parse_args()
+    sys.path.insert(0, str(ROOT))
+
+    if args.url:
+        url = urlsplit(args.url)
+        check_local(url.hostname)
+        type_ids = args.equipment_type or []
+        if not type_ids and WRITE_ACTIONS & set(args.mix):
+            parser.error('для create, delete и restore на внешнем сервере нужен --equipment-type')
+        report, elapsed = asyncio.run(load(url.hostname, url.port or 80, args, type_ids))
+    else:
+        report, elapsed = run_local_server(args)
+
+    print_report(report, elapsed)
+    if args.output:
+        Path(args.output).write_text(json.dumps({
+            'users': args.users,
+            'duration': elapsed,
+            'mix': args.mix,
+            'server_mode': None if args.url else args.server_mode,
+            'results': report,
+        }, indent=2, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
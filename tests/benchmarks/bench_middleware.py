@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+"""
+Бенчмарк накладных расходов middleware на запрос к API.
+
+Сравнивает полный стек стандартных Django middleware (сессия, CSRF,
+пользователь из сессии, сообщения) со стеком из telecom_backend/middleware.py,
+который пропускает эти слои для /api/. Запросы выполняются тестовым
+клиентом в одном процессе на in-memory SQLite, запросы разных стеков
+чередуются. Для каждого endpoint выводится медианное время запроса с cookie
+сессии и CSRF, как их присылает браузер с открытой админкой, и без них.
+
+Запуск:
+    python tests/benchmarks/bench_middleware.py --requests 5000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'telecom_backend.settings_test')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.runner import DiscoverRunner  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from tests.factories import EquipmentFactory, UserFactory  # noqa: E402
+
+STANDARD = {
+    'telecom_backend.middleware.SessionMiddleware': 'django.contrib.sessions.middleware.SessionMiddleware',
+    'telecom_backend.middleware.CsrfViewMiddleware': 'django.middleware.csrf.CsrfViewMiddleware',
+    'telecom_backend.middleware.AuthenticationMiddleware': 'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'telecom_backend.middleware.MessageMiddleware': 'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+STACKS = {
+    'полный стек': [STANDARD.get(path, path) for path in settings.MIDDLEWARE],
+    'без сессии для /api/': list(settings.MIDDLEWARE),
+}
+
+
+def make_client(middleware, token, user, with_session):
+    """
+    Клиент со своим стеком middleware: обработчик тестового клиента
+    загружает MIDDLEWARE при первом запросе и дальше его не перечитывает.
+    """
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+    if with_session:
+        client.force_login(user)
+        client.cookies['csrftoken'] = 'x' * 32
+    with override_settings(MIDDLEWARE=middleware):
+        client.get('/health/live/')
+    return client
+
+
+def measure(clients, path, count, warmup=50):
+    """
+    Чередует запросы клиентов, чтобы дрейф машины одинаково влиял на все стеки.
+    """
+    timings = {stack: [] for stack in clients}
+    for number in range(warmup + count):
+        for stack, client in clients.items():
+            started = time.perf_counter()
+            response = client.get(path)
+            elapsed = time.perf_counter() - started
+            assert response.status_code == 200, response.content
+            if number >= warmup:
+                timings[stack].append(elapsed)
+    return {stack: statistics.median(values) * 10 ** 6 for stack, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        user = UserFactory(username='bench', is_staff=True)
+        token = RefreshToken.for_user(user).access_token
+        equipment = EquipmentFactory()
+        paths = {
+            'профиль': '/api/user/profile/',
+            'карточка': f'/api/equipment/{equipment.id}/',
+            'health': '/health/live/',
+        }
+
+        results = {}
+        for with_session in (False, True):
+            clients = {
+                stack: make_client(middleware, token, user, with_session)
+                for stack, middleware in STACKS.items()
+            }
+            for name, path in paths.items():
+                for stack, median in measure(clients, path, args.requests).items():
+                    results[stack, with_session, name] = median
+
+        print(f'{"endpoint":<12}{"cookie":>8}{"полный, мкс":>14}{"slim, мкс":>12}{"экономия, мкс":>16}{"%":>7}')
+        for with_session in (False, True):
+            for name in paths:
+                full = results['полный стек', with_session, name]
+                slim = results['без сессии для /api/', with_session, name]
+                print(f'{name:<12}{"да" if with_session else "нет":>8}{full:>14.1f}{slim:>12.1f}'
+                      f'{full - slim:>16.1f}{(full - slim) / full:>7.1%}')
+        print('\nмедиана по', args.requests, 'запросам')
+    finally:
+        runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Бенчмарк переиспользования соединений с MySQL.
+
+Имитирует цикл запроса Django (request_started -> запрос к базе ->
+request_finished) и сравнивает задержку на запрос в трех режимах:
+новое соединение на каждый запрос, постоянные соединения (CONN_MAX_AGE)
+и пул соединений внутри процесса. Каждый режим запускается в отдельном
+процессе, так как настройки базы читаются при старте Django.
+
+Нужен доступный MySQL с параметрами из MYSQL_HOST, MYSQL_PORT,
+MYSQL_DATABASE, MYSQL_USER и MYSQL_PASSWORD, например из docker-compose:
+
+    docker-compose up -d mysql
+    python tests/benchmarks/bench_mysql_pool.py --requests 2000 --threads 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+MODES = {
+    'новое соединение': {'DB_CONN_MAX_AGE': '0', 'MYSQL_POOL_SIZE': '0'},
+    'CONN_MAX_AGE=60': {'DB_CONN_MAX_AGE': '60', 'MYSQL_POOL_SIZE': '0'},
+    'пул': {'DB_CONN_MAX_AGE': '0'},
+}
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))] * 1000
+
+
+def worker(requests, threads):
+    """Выполняется в дочернем процессе с уже выставленным окружением."""
+    sys.path.insert(0, str(ROOT))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'telecom_backend.settings'
+
+    import django
+
+    django.setup()
+
+    from django.core.signals import request_finished, request_started
+    from django.db import connection, connections
+
+    from telecom_backend.db.pool import get_all_stats
+
+    timings = []
+    errors = []
+    lock = threading.Lock()
+
+    def handle(count):
+        try:
+            run_requests(count)
+        except Exception as e:
+            errors.append(e)
+
+    def run_requests(count):
+        local = []
+        for _ in range(count):
+            start = time.perf_counter()
+            request_started.send(sender=None)
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            request_finished.send(sender=None)
+            local.append(time.perf_counter() - start)
+        connections.close_all()
+        with lock:
+            timings.extend(local)
+
+    pool = [threading.Thread(target=handle, args=(requests // threads,)) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+
+    timings.sort()
+    print(json.dumps({
+        'p50': percentile(timings, 0.5),
+        'p95': percentile(timings, 0.95),
+        'p99': percentile(timings, 0.99),
+        'rps': len(timings) / elapsed,
+        'pool': get_all_stats().get('default'),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.requests, args.threads)
+        return
+
+    print(f'{"режим":<20}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}{"req/s":>10}')
+    for name, env in MODES.items():
+        env = {**os.environ, 'USE_MYSQL': 'True', 'MYSQL_POOL_SIZE': str(args.threads), **env}
+        result = subprocess.run(
+            [sys.executable, __file__, '--worker', '--requests', str(args.requests), '--threads', str(args.threads)],
+            env=env, capture_output=True, text=True
+        )
+        if result.returncode:
+            sys.exit(f'{name}: {result.stderr.strip().splitlines()[-1]}')
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f'{name:<20}{stats["p50"]:>10.3f}{stats["p95"]:>10.3f}{stats["p99"]:>10.3f}{stats["rps"]:>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""
+Бенчмарк частичных индексов по активному оборудованию.
+
+Создает таблицу с заданной долей мягко удаленных записей (по умолчанию 30%)
+и сравнивает время основных запросов EquipmentManager с частичными индексами
+и без них. Полные индексы по тем же колонкам есть в обоих прогонах: прогон
+"полные" показывает, что было до миграции 0005_active_equipment_indexes.
+
+Запуск:
+    python tests/benchmarks/bench_partial_indexes.py --rows 200000 --deleted-ratio 0.3
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'telecom_backend.settings_test')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from equipment.models import Equipment, EquipmentType  # noqa: E402
+
+PARTIAL_INDEXES = [
+    index for index in Equipment._meta.indexes if index.condition is not None
+]
+FULL_INDEXES = [
+    index for index in Equipment._meta.indexes if index.condition is None
+]
+
+
+def populate(rows, deleted_ratio, types_count=10, batch_size=5000):
+    """Заполняет таблицу оборудования без factory_boy, порциями bulk_create."""
+    types = EquipmentType.objects.bulk_create([
+        EquipmentType(name=f'Type {i}', serial_mask='NNNNNNNNNN')
+        for i in range(types_count)
+    ])
+    now = timezone.now()
+    batch = []
+    for i in range(rows):
+        batch.append(Equipment(
+            equipment_type=types[i % types_count],
+            serial_number=f'{i:010d}',
+            note='bench',
+            deleted_at=now if random.random() < deleted_ratio else None,
+        ))
+        if len(batch) >= batch_size:
+            Equipment.all_objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Equipment.all_objects.bulk_create(batch)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return types
+
+
+def queries(types):
+    """Основные пути доступа через менеджер по умолчанию."""
+    type_id = types[0].id
+    serials = [f'{random.randrange(len(types) * 1000):010d}' for _ in range(50)]
+    return {
+        'list (-created_at)': lambda: list(Equipment.objects.order_by('-created_at')[:20]),
+        'type + -created_at': lambda: list(
+            Equipment.objects.filter(equipment_type_id=type_id).order_by('-created_at')[:20]
+        ),
+        'serial_number =': lambda: [
+            Equipment.objects.filter(serial_number=serial).first() for serial in serials
+        ],
+        'list (-updated_at)': lambda: list(Equipment.objects.order_by('-updated_at')[:20]),
+        'count()': lambda: Equipment.objects.count(),
+    }
+
+
+def measure(query, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        query()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def ensure_full_indexes():
+    """Создает отсутствующие полные индексы, чтобы сравнение шло с ними, а не с отсутствием индекса."""
+    with connection.cursor() as cursor:
+        existing = connection.introspection.get_constraints(cursor, Equipment._meta.db_table)
+    with connection.schema_editor() as editor:
+        for index in FULL_INDEXES:
+            if index.name not in existing:
+                editor.add_index(Equipment, index)
+
+
+def run(repeat, types):
+    return {name: measure(query, repeat) for name, query in queries(types).items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--deleted-ratio', type=float, default=0.3)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+    try:
+        random.seed(42)
+        started = time.perf_counter()
+        types = populate(args.rows, args.deleted_ratio)
+        print(f'{connection.vendor}: {args.rows} строк, доля удаленных {args.deleted_ratio:.0%}, '
+              f'заполнение {time.perf_counter() - started:.1f} c')
+
+        with_partial = run(args.repeat, types)
+
+        with connection.schema_editor() as editor:
+            for index in PARTIAL_INDEXES:
+                editor.remove_index(Equipment, index)
+        ensure_full_indexes()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        without_partial = run(args.repeat, types)
+
+        print(f'{"запрос":<22}{"полные, мс":>12}{"частичные, мс":>15}{"ускорение":>11}')
+        for name in with_partial:
+            before, after = without_partial[name], with_partial[name]
+            print(f'{name:<22}{before:>12.2f}{after:>15.2f}{before / after:>10.2f}x')
+    finally:
+        runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
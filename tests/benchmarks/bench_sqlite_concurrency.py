@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Бенчмарк конкурентного доступа к файловой SQLite.
+
+Запускает N читателей (список оборудования и count) и M писателей
+(массовое создание через EquipmentCreateSerializer) на временной базе и
+сравнивает настройки по умолчанию с режимом SQLITE_TUNED (WAL, прагмы,
+BEGIN IMMEDIATE с повторами). Каждый режим работает в отдельном процессе
+со своей базой; читатели и писатели — отдельные процессы, как воркеры gunicorn.
+
+Запуск:
+    python tests/benchmarks/bench_sqlite_concurrency.py --readers 8 --writers 4 --duration 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import multiprocessing
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+MODES = {
+    'по умолчанию': 'False',
+    'SQLITE_TUNED': 'True',
+}
+
+
+def percentile(timings, fraction):
+    if not timings:
+        return 0.0
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))] * 1000
+
+
+def worker(readers, writers, duration, batch):
+    """Выполняется в дочернем процессе с уже выставленным окружением."""
+    sys.path.insert(0, str(ROOT))
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'telecom_backend.settings'
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import OperationalError, connections
+
+    from equipment.models import Equipment, EquipmentType
+    from equipment.serializers import EquipmentCreateSerializer
+
+    call_command('migrate', verbosity=0)
+    equipment_type = EquipmentType.objects.create(name='Bench', serial_mask='NNNNNNNNNN')
+
+    connections.close_all()
+    deadline = time.monotonic() + duration
+
+    def read_loop(queue):
+        local = []
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            list(Equipment.objects.select_related('equipment_type').order_by('-created_at')[:20])
+            Equipment.objects.count()
+            local.append(time.perf_counter() - start)
+        queue.put(('read', local, 0))
+
+    def write_loop(queue, number):
+        local, errors, counter = [], 0, 0
+        while time.monotonic() < deadline:
+            serials = [f'{number}{counter + i:09d}' for i in range(batch)]
+            counter += batch
+            start = time.perf_counter()
+            serializer = EquipmentCreateSerializer(data={
+                'equipment_type': equipment_type.id,
+                'serial_numbers': serials,
+            })
+            try:
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+            except OperationalError:
+                errors += 1
+                continue
+            local.append(time.perf_counter() - start)
+        queue.put(('write', local, errors))
+
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    processes = [context.Process(target=read_loop, args=(queue,)) for _ in range(readers)]
+    processes += [context.Process(target=write_loop, args=(queue, number)) for number in range(writers)]
+    for process in processes:
+        process.start()
+
+    results = {'read': [], 'write': [], 'errors': 0}
+    for _ in processes:
+        kind, timings, errors = queue.get()
+        results[kind].extend(timings)
+        results['errors'] += errors
+    for process in processes:
+        process.join()
+
+    print(json.dumps({
+        'reads': len(results['read']) / duration,
+        'read_p95': percentile(results['read'], 0.95),
+        'rows': len(results['write']) * batch / duration,
+        'write_p95': percentile(results['write'], 0.95),
+        'errors': results['errors'],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--batch', type=int, default=200, help='серийных номеров в одном запросе на создание')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.readers, args.writers, args.duration, args.batch)
+        return
+
+    print(f'{args.readers} читателей, {args.writers} писателей по {args.batch} строк, {args.duration:.0f} c')
+    print(f'{"режим":<16}{"чтений/с":>10}{"p95 чт, мс":>12}{"строк/с":>10}{"p95 зап, мс":>13}{"locked":>8}')
+    for name, tuned in MODES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                'USE_MYSQL': 'False',
+                'SQLITE_TUNED': tuned,
+                'SQLITE_PATH': os.path.join(tmp, 'bench.sqlite3'),
+            }
+            result = subprocess.run(
+                [sys.executable, __file__, '--worker', '--readers', str(args.readers),
+                 '--writers', str(args.writers), '--duration', str(args.duration), '--batch', str(args.batch)],
+                env=env, capture_output=True, text=True
+            )
+        if result.returncode:
+            sys.exit(f'{name}: {result.stderr.strip().splitlines()[-1]}')
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        print(f'{name:<16}{stats["reads"]:>10.0f}{stats["read_p95"]:>12.2f}'
+              f'{stats["rows"]:>10.0f}{stats["write_p95"]:>13.2f}{stats["errors"]:>8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+"""
+Быстрое заполнение базы большими наборами оборудования для бенчмарков.
+
+factory_boy сохраняет объекты по одному, что для 100k-10M строк занимает
+часы. Здесь строки вставляются пачками через cursor.executemany без
+создания экземпляров моделей: SQLite выполняет подготовленный INSERT для
+каждой строки внутри одной транзакции, драйверы MySQL переписывают
+executemany в многострочные INSERT.
+
+Набор детерминирован: строка i получает id i + 1, серийный номер
+f'{i:010d}' и тип i % types. Доля deleted_ratio строк мягко удалена,
+каждая archive_every-я строка лежит в архиве, а не в таблице оборудования.
+Описание набора хранится в таблице bench_dataset, поэтому повторный запуск
+на той же базе не заполняет ее заново.
+"""
+
+import contextlib
+import itertools
+import time
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from equipment.models import ArchivedEquipment, Equipment, EquipmentType
+
+SERIAL_MASK = 'NNNNNNNNNN'
+TYPES_COUNT = 20
+DELETED_RATIO = 0.1
+ARCHIVE_EVERY = 20
+BATCH_SIZE = 10000
+DATASET_TABLE = 'bench_dataset'
+
+
+def describe(rows, types_count=TYPES_COUNT, deleted_ratio=DELETED_RATIO, archive_every=ARCHIVE_EVERY) -> str:
+    return f'rows={rows};types={types_count};deleted={deleted_ratio};archive_every={archive_every}'
+
+
+def is_active(number, deleted_ratio=DELETED_RATIO, archive_every=ARCHIVE_EVERY) -> bool:
+    """
+    Проверяет, что строка number набора не удалена и не в архиве.
+    """
+    deleted_every = round(1 / deleted_ratio) if deleted_ratio else 0
+    if archive_every and number % archive_every == archive_every - 1:
+        return False
+    return not (deleted_every and number % deleted_every == 0)
+
+
+@contextlib.contextmanager
+def bulk_load_mode():
+    """
+    Ослабляет гарантии базы на время загрузки.
+
+    Набор всегда можно пересоздать, поэтому SQLite пишет без fsync,
+    а MySQL не проверяет уникальность и внешние ключи построчно. Индексы
+    из Meta.indexes оборудования удаляются и строятся заново после
+    загрузки: построение по готовой таблице быстрее поддержки индекса
+    при каждой вставке.
+
+    Восстановление выполняется и при ошибке загрузки; индексы, потерянные
+    прерванным ранее запуском, тоже создаются заново.
+    """
+    modes = {
+        'sqlite': ('PRAGMA synchronous = OFF', 'PRAGMA synchronous = NORMAL'),
+        'mysql': (
+            'SET unique_checks = 0, foreign_key_checks = 0',
+            'SET unique_checks = 1, foreign_key_checks = 1',
+        ),
+    }
+    relax, restore = modes.get(connection.vendor, (None, None))
+    with connection.schema_editor() as editor:
+        for index in existing_indexes():
+            editor.remove_index(Equipment, index)
+    try:
+        if relax:
+            with connection.cursor() as cursor:
+                cursor.execute(relax)
+        yield
+    finally:
+        if restore:
+            with connection.cursor() as cursor:
+                cursor.execute(restore)
+        present = {index.name for index in existing_indexes()}
+        with connection.schema_editor() as editor:
+            for index in Equipment._meta.indexes:
+                if index.name not in present:
+                    editor.add_index(Equipment, index)
+
+
+def existing_indexes() -> list:
+    """
+    Возвращает индексы из Meta.indexes оборудования, которые есть в базе.
+    """
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Equipment._meta.db_table)
+    return [index for index in Equipment._meta.indexes if index.name in constraints]
+
+
+def insert_many(model, columns, rows, batch_size=BATCH_SIZE) -> None:
+    """
+    Вставляет строки кортежами значений в порядке columns.
+    """
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(column) for column in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while batch := list(itertools.islice(rows, batch_size)):
+            with transaction.atomic():
+                cursor.executemany(sql, batch)
+
+
+def get_loaded() -> str:
+    with connection.cursor() as cursor:
+        if DATASET_TABLE not in connection.introspection.table_names(cursor):
+            return ''
+        cursor.execute(f'SELECT description FROM {DATASET_TABLE}')
+        row = cursor.fetchone()
+    return row[0] if row else ''
+
+
+def set_loaded(description: str) -> None:
+    with connection.cursor() as cursor:
+        if DATASET_TABLE not in connection.introspection.table_names(cursor):
+            cursor.execute(f'CREATE TABLE {DATASET_TABLE} (description VARCHAR(255) NOT NULL)')
+        cursor.execute(f'DELETE FROM {DATASET_TABLE}')
+        cursor.execute(f'INSERT INTO {DATASET_TABLE} (description) VALUES (%s)', [description])
+
+
+def clear() -> None:
+    """
+    Очищает таблицы оборудования перед загрузкой набора.
+
+    База без таблицы bench_dataset, в которой уже есть оборудование, типы
+    или архив, считается рабочей и не очищается.
+    """
+    with connection.cursor() as cursor:
+        marked = DATASET_TABLE in connection.introspection.table_names(cursor)
+    if not marked and (
+        Equipment.all_objects.exists() or EquipmentType.objects.exists() or ArchivedEquipment.objects.exists()
+    ):
+        raise RuntimeError(
+            f'база {connection.settings_dict["NAME"]} содержит данные, но не таблицу {DATASET_TABLE}: '
+            'бенчмарк очищает только базу, созданную им самим'
+        )
+    set_loaded('')
+    ArchivedEquipment.objects.all()._raw_delete(connection.alias)
+    Equipment.all_objects.all()._raw_delete(connection.alias)
+    EquipmentType.objects.all()._raw_delete(connection.alias)
+
+
+def populate(rows, types_count=TYPES_COUNT, deleted_ratio=DELETED_RATIO, archive_every=ARCHIVE_EVERY,
+             batch_size=BATCH_SIZE, progress=None) -> None:
+    """
+    Заполняет пустые таблицы оборудования набором из rows строк.
+    """
+    # Наивное время в UTC адаптируется без пересчета часового пояса на строку
+    now = timezone.make_naive(timezone.now(), dt_timezone.utc) if settings.USE_TZ else timezone.now()
+    adapt = connection.ops.adapt_datetimefield_value
+    types = EquipmentType.objects.bulk_create([
+        EquipmentType(name=f'Тип {number:03d}', serial_mask=SERIAL_MASK)
+        for number in range(types_count)
+    ])
+    type_ids = [equipment_type.id for equipment_type in types]
+    deleted_every = round(1 / deleted_ratio) if deleted_ratio else 0
+
+    def timestamp(number):
+        # Время создания растет с id: сортировка по -created_at не вырождена
+        return adapt(now - timedelta(seconds=rows - number))
+
+    def equipment_rows():
+        deleted_at = adapt(now)
+        for number in range(rows):
+            if archive_every and number % archive_every == archive_every - 1:
+                continue
+            created_at = timestamp(number)
+            yield (
+                number + 1,
+                type_ids[number % types_count],
+                f'{number:010d}',
+                '',
+                created_at,
+                created_at,
+                deleted_at if deleted_every and number % deleted_every == 0 else None,
+            )
+            if progress and number % (batch_size * 10) == 0:
+                progress(number)
+
+    def archive_rows():
+        archived_at = adapt(now)
+        for number in range(archive_every - 1, rows, archive_every) if archive_every else ():
+            created_at = timestamp(number)
+            yield (
+                number + 1,
+                type_ids[number % types_count],
+                f'{number:010d}',
+                '',
+                created_at,
+                created_at,
+                archived_at,
+                archived_at,
+            )
+
+    columns = ['id', 'equipment_type_id', 'serial_number', 'note', 'created_at', 'updated_at', 'deleted_at']
+    with bulk_load_mode():
+        insert_many(Equipment, columns, equipment_rows(), batch_size)
+        insert_many(ArchivedEquipment, [*columns, 'archived_at'], archive_rows(), batch_size)
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute('ANALYZE TABLE equipment, equipment_archive, equipment_types')
+        else:
+            cursor.execute('ANALYZE')
+
+
+def ensure_dataset(rows, rebuild=False, log=print, **options) -> None:
+    """
+    Готовит набор из rows строк, переиспользуя уже загруженный.
+    """
+    description = describe(rows, **options)
+    if not rebuild and get_loaded() == description:
+        log(f'{connection.vendor}: набор {description} уже загружен')
+        return
+
+    clear()
+    started = time.perf_counter()
+    populate(rows, progress=lambda number: log(f'  {number:,} / {rows:,}'), **options)
+    set_loaded(description)
+    elapsed = time.perf_counter() - started
+    log(f'{connection.vendor}: загружено {rows:,} строк за {elapsed:.1f} с ({rows / elapsed:,.0f} строк/с)')
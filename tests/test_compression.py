@@ -0,0 +1,171 @@
+"""
+Тесты сжатия ответов API.
+Покрывают выбор кодировки, порог размера, пропуск уже сжатых ответов
+и потоковое сжатие по частям.
+"""
+
+import asyncio
+import gzip
+import zlib
+
+import brotli
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+
+from telecom_backend.compression import CompressionMiddleware, StreamCompressor
+from tests.factories import EquipmentFactory
+
+
+def middleware_response(rf, response, path='/api/equipment/', encoding='gzip, br'):
+    request = rf.get(path, HTTP_ACCEPT_ENCODING=encoding)
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+@pytest.mark.django_db
+class TestCompressionMiddleware:
+    """Тесты CompressionMiddleware на API."""
+    
+    def test_list_page_compressed_with_brotli(self, authenticated_client):
+        """Тест сжатия крупной страницы списка в brotli."""
+        EquipmentFactory.create_batch(30)
+        url = reverse('equipment:equipment-list-create')
+        
+        plain = authenticated_client.get(url, {'page_size': 30})
+        response = authenticated_client.get(url, {'page_size': 30}, HTTP_ACCEPT_ENCODING='gzip, br')
+        
+        assert response['Content-Encoding'] == 'br'
+        assert 'Accept-Encoding' in response['Vary']
+        assert int(response['Content-Length']) == len(response.content) < len(plain.content)
+        assert brotli.decompress(response.content) == plain.content
+    
+    def test_gzip_when_brotli_not_accepted(self, authenticated_client):
+        """Тест выбора gzip, если brotli не принимается клиентом."""
+        EquipmentFactory.create_batch(30)
+        
+        response = authenticated_client.get(
+            reverse('equipment:equipment-list-create'), {'page_size': 30},
+            HTTP_ACCEPT_ENCODING='gzip, br;q=0'
+        )
+        
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content).startswith(b'{')
+    
+    def test_small_response_not_compressed(self, authenticated_client):
+        """Тест что ответ меньше порога отдается как есть."""
+        response = authenticated_client.get(reverse('authentication:profile'), HTTP_ACCEPT_ENCODING='gzip, br')
+        
+        assert not response.has_header('Content-Encoding')
+        assert response.json()
+    
+    def test_threshold_from_settings(self, authenticated_client, settings):
+        """Тест настройки порога размера."""
+        settings.COMPRESSION_MIN_SIZE = 10
+        
+        response = authenticated_client.get(reverse('authentication:profile'), HTTP_ACCEPT_ENCODING='gzip')
+        
+        assert response['Content-Encoding'] == 'gzip'
+    
+    def test_without_accept_encoding(self, authenticated_client):
+        """Тест что без Accept-Encoding ответ не сжимается, но Vary выставлен."""
+        EquipmentFactory.create_batch(30)
+        
+        response = authenticated_client.get(reverse('equipment:equipment-list-create'), {'page_size': 30})
+        
+        assert not response.has_header('Content-Encoding')
+        assert 'Accept-Encoding' in response['Vary']
+
+
+class TestCompressionRules:
+    """Тесты правил пропуска сжатия."""
+    
+    def test_skips_already_encoded(self, rf):
+        """Тест что уже сжатый ответ не сжимается повторно."""
+        response = HttpResponse(b'x' * 5000, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+        
+        result = middleware_response(rf, response)
+        
+        assert result.content == b'x' * 5000
+    
+    def test_skips_incompressible_type(self, rf):
+        """Тест что бинарные типы не сжимаются."""
+        response = HttpResponse(b'x' * 5000, content_type='image/png')
+        
+        assert not middleware_response(rf, response).has_header('Content-Encoding')
+    
+    def test_skips_non_api_paths(self, rf):
+        """Тест что сжимаются только пути API."""
+        response = HttpResponse(b'x' * 5000, content_type='application/json')
+        
+        assert not middleware_response(rf, response, path='/admin/').has_header('Content-Encoding')
+    
+    def test_strong_etag_becomes_weak(self, rf):
+        """Тест что сильный ETag сжатого ответа становится слабым."""
+        response = HttpResponse(b'{"a": 1}' * 500, content_type='application/json')
+        response['ETag'] = '"abc"'
+        
+        assert middleware_response(rf, response)['ETag'] == 'W/"abc"'
+    
+    def test_level_from_settings(self, rf, settings):
+        """Тест что уровень сжатия влияет на результат."""
+        payload = b''.join(b'{"id": %d, "serial_number": "%010d"},' % (n, n * 7919) for n in range(2000))
+        sizes = []
+        for level in (1, 9):
+            settings.COMPRESSION_GZIP_LEVEL = level
+            response = middleware_response(rf, HttpResponse(payload, content_type='application/json'), encoding='gzip')
+            sizes.append(len(response.content))
+        
+        assert sizes[1] < sizes[0] < len(payload)
+
+
+class TestStreamingCompression:
+    """Тесты потокового сжатия."""
+    
+    def test_streaming_gzip_flushes_each_chunk(self, rf):
+        """Тест что каждая часть потока декодируется до окончания потока."""
+        chunks = [b'[', b'{"id": 1}' * 50, b',', b'{"id": 2}' * 50, b']']
+        response = middleware_response(
+            rf, StreamingHttpResponse(iter(chunks), content_type='application/json'), encoding='gzip'
+        )
+        
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        received = []
+        for part in response.streaming_content:
+            received.append(decompressor.decompress(part))
+            if len(received) <= len(chunks):
+                assert received[-1] == chunks[len(received) - 1]
+        
+        assert response['Content-Encoding'] == 'gzip'
+        assert not response.has_header('Content-Length')
+        assert b''.join(received) == b''.join(chunks)
+    
+    def test_streaming_brotli(self, rf):
+        """Тест потокового brotli независимо от размера частей."""
+        chunks = [b'{"id": %d}' % n for n in range(100)]
+        response = middleware_response(rf, StreamingHttpResponse(iter(chunks), content_type='application/json'))
+        
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(b''.join(response.streaming_content)) == b''.join(chunks)
+    
+    def test_async_streaming(self, rf):
+        """Тест сжатия асинхронного потока."""
+        async def generate():
+            for n in range(10):
+                yield b'{"id": %d}' % n
+        
+        response = middleware_response(
+            rf, StreamingHttpResponse(generate(), content_type='application/json'), encoding='gzip'
+        )
+        
+        async def consume():
+            return b''.join([part async for part in response.streaming_content])
+        
+        assert response.is_async
+        assert gzip.decompress(asyncio.run(consume())) == b''.join(b'{"id": %d}' % n for n in range(10))
+    
+    def test_compressor_skips_empty_chunks(self):
+        """Тест что пустые части не порождают вывода."""
+        compressor = StreamCompressor('gzip')
+        
+        assert compressor.chunk(b'') == b''
@@ -0,0 +1,163 @@
+"""
+Тесты пула соединений с базой данных.
+"""
+
+import threading
+
+import pytest
+from django.db.utils import OperationalError
+
+from telecom_backend.db.pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+    
+    def ping(self):
+        if not self.alive:
+            raise OSError('соединение разорвано')
+    
+    def rollback(self):
+        self.rolled_back = True
+    
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**options):
+    created = []
+    
+    def connect():
+        created.append(FakeConnection())
+        return created[-1]
+    
+    return ConnectionPool(connect, **options), created
+
+
+class TestConnectionPool:
+    """Тесты пула соединений."""
+    
+    def test_reuses_released_connection(self):
+        """Тест что возвращенное соединение выдается повторно без подключения."""
+        pool, created = make_pool(size=2)
+        
+        conn, reused = pool.acquire()
+        assert not reused
+        pool.release(conn)
+        
+        again, reused = pool.acquire()
+        assert again is conn
+        assert reused
+        assert len(created) == 1
+    
+    def test_overflow_connections_closed_on_release(self):
+        """Тест что соединения сверх size закрываются при возврате."""
+        pool, created = make_pool(size=1, overflow=1)
+        
+        first, _ = pool.acquire()
+        second, _ = pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        
+        assert not first.closed
+        assert second.closed
+        assert pool.stats()['idle'] == 1
+    
+    def test_timeout_when_exhausted(self):
+        """Тест ошибки при исчерпании пула."""
+        pool, _ = make_pool(size=1, overflow=0, timeout=0.05)
+        pool.acquire()
+        
+        with pytest.raises(OperationalError):
+            pool.acquire()
+        assert pool.stats()['timeouts'] == 1
+    
+    def test_waiter_gets_released_connection(self):
+        """Тест что ожидающий поток получает освобожденное соединение."""
+        pool, created = make_pool(size=1, overflow=0, timeout=5)
+        conn, _ = pool.acquire()
+        result = []
+        
+        waiter = threading.Thread(target=lambda: result.append(pool.acquire()))
+        waiter.start()
+        pool.release(conn)
+        waiter.join(timeout=5)
+        
+        assert result == [(conn, True)]
+        assert len(created) == 1
+    
+    def test_dead_connection_replaced(self):
+        """Тест что разорванное соединение заменяется новым."""
+        pool, created = make_pool(size=1)
+        conn, _ = pool.acquire()
+        pool.release(conn)
+        conn.alive = False
+        
+        fresh, reused = pool.acquire()
+        
+        assert fresh is not conn
+        assert not reused
+        assert conn.closed
+    
+    def test_failed_connect_frees_slot(self):
+        """Тест что ошибка подключения не занимает место в пуле."""
+        def connect():
+            raise OperationalError('нет подключения')
+        pool = ConnectionPool(connect, size=1, overflow=0, timeout=0.05)
+        
+        for _ in range(3):
+            with pytest.raises(OperationalError, match='нет подключения'):
+                pool.acquire()
+        assert pool.stats()['checked_out'] == 0
+    
+    def test_fill_opens_idle_connections(self):
+        """Тест что прогрев открывает size соединений, доступных любому потоку."""
+        pool, created = make_pool(size=3, overflow=2)
+        
+        assert pool.fill() == 3
+        assert len(created) == 3
+        
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+        thread.start()
+        thread.join()
+        assert acquired[0][1]
+        assert len(created) == 3
+
+
+class TestPooledMySQLBackend:
+    """Тесты MySQL backend с пулом без реального сервера."""
+    
+    @pytest.fixture
+    def wrapper(self, monkeypatch):
+        pytest.importorskip('MySQLdb')
+        from django.db.backends.mysql import base as mysql_base
+        from telecom_backend.db import pool as pool_module
+        from telecom_backend.db.mysql.base import DatabaseWrapper
+        
+        monkeypatch.setattr(pool_module, '_pools', {})
+        monkeypatch.setattr(mysql_base.DatabaseWrapper, 'get_new_connection', lambda self, params: FakeConnection())
+        
+        settings_dict = {
+            'ENGINE': 'telecom_backend.db.mysql', 'NAME': 'db', 'USER': 'u', 'PASSWORD': 'p',
+            'HOST': 'localhost', 'PORT': '3306', 'OPTIONS': {'pool': {'size': 2}},
+            'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'AUTOCOMMIT': True,
+            'ATOMIC_REQUESTS': False, 'TIME_ZONE': None, 'TEST': {},
+        }
+        return DatabaseWrapper(settings_dict, alias='pooled')
+    
+    def test_connection_returned_to_pool(self, wrapper):
+        """Тест что закрытие соединения возвращает его в пул."""
+        params = wrapper.get_connection_params()
+        assert 'pool' not in params
+        
+        conn = wrapper.get_new_connection(params)
+        wrapper.connection = conn
+        wrapper.autocommit = True
+        wrapper._close()
+        
+        assert not conn.closed
+        assert wrapper.get_new_connection(params) is conn
+        assert wrapper._pool_reused
@@ -0,0 +1,130 @@
+"""
+Тесты отдачи frontend приложения.
+Покрывают кэширование по mtime, сжатые варианты, ETag и URL с отпечатком.
+"""
+
+import gzip
+import os
+
+import brotli
+import pytest
+from django.urls import reverse
+
+from telecom_backend.assets import IMMUTABLE_CACHE_CONTROL, asset_store
+
+APP_JS = b'console.log("telecom");\n' * 100
+INDEX_HTML = b"<html><script>const appJsPath = '/frontend/app.js';</script></html>"
+
+
+@pytest.fixture
+def frontend_dir(settings, tmp_path):
+    (tmp_path / 'app.js').write_bytes(APP_JS)
+    (tmp_path / 'index.html').write_bytes(INDEX_HTML)
+    settings.FRONTEND_DIR = tmp_path
+    asset_store.clear()
+    yield tmp_path
+    asset_store.clear()
+
+
+def body(response):
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+class TestFrontendAssets:
+    """Тесты отдачи статических файлов frontend."""
+    
+    def test_precompressed_variants(self, client, frontend_dir):
+        """Тест выбора brotli и gzip по Accept-Encoding."""
+        url = '/frontend/app.js'
+        
+        response = client.get(url, headers={'Accept-Encoding': 'gzip, br'})
+        assert response['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.content) == APP_JS
+        
+        response = client.get(url, headers={'Accept-Encoding': 'gzip, br;q=0'})
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content) == APP_JS
+        
+        response = client.get(url)
+        assert not response.has_header('Content-Encoding')
+        assert response.content == APP_JS
+        assert 'Accept-Encoding' in response['Vary']
+    
+    def test_etag_not_modified(self, client, frontend_dir):
+        """Тест ответа 304 по сильному ETag."""
+        etag = client.get('/frontend/app.js')['ETag']
+        assert not etag.startswith('W/')
+        
+        response = client.get('/frontend/app.js', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.content == b''
+    
+    def test_reloaded_on_mtime_change(self, client, frontend_dir):
+        """Тест что измененный файл перечитывается."""
+        etag = client.get('/frontend/app.js')['ETag']
+        
+        (frontend_dir / 'app.js').write_bytes(b'console.log("v2");')
+        os.utime(frontend_dir / 'app.js', ns=(1, 10 ** 18))
+        
+        response = client.get('/frontend/app.js')
+        assert response['ETag'] != etag
+        assert response.content == b'console.log("v2");'
+    
+    def test_shell_links_fingerprinted_url(self, client, frontend_dir):
+        """Тест что index.html ссылается на app.js с отпечатком и тот кэшируется навсегда."""
+        response = client.get(reverse('index'))
+        assert response['Cache-Control'] == 'no-cache'
+        
+        url = asset_store.url('app.js')
+        assert f"'{url}'".encode() in response.content
+        
+        response = client.get(url)
+        assert response['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+        assert response.content == APP_JS
+    
+    def test_stale_fingerprint_not_immutable(self, client, frontend_dir):
+        """Тест что устаревший отпечаток не кэшируется навсегда."""
+        response = client.get('/frontend/app.0123456789ab.js')
+        
+        assert response.status_code == 200
+        assert response['Cache-Control'] == 'no-cache'
+    
+    def test_large_file_streamed(self, client, frontend_dir, settings):
+        """Тест что крупный файл отдается через FileResponse с копией .gz с диска."""
+        settings.FRONTEND_INLINE_MAX_SIZE = 100
+        (frontend_dir / 'app.js.gz').write_bytes(gzip.compress(APP_JS))
+        
+        response = client.get('/frontend/app.js', headers={'Accept-Encoding': 'gzip'})
+        assert response.streaming
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(body(response)) == APP_JS
+        
+        response = client.get('/frontend/app.js')
+        assert response.streaming
+        assert not response.has_header('Content-Encoding')
+        assert body(response) == APP_JS
+    
+    def test_large_shell_read_from_disk(self, client, frontend_dir, settings):
+        """Тест что index.html крупнее FRONTEND_INLINE_MAX_SIZE тоже отдается со ссылкой на отпечаток."""
+        settings.FRONTEND_INLINE_MAX_SIZE = 10
+        
+        response = client.get(reverse('index'))
+        
+        assert response.status_code == 200
+        assert f"'{asset_store.url('app.js')}'".encode() in body(response)
+    
+    @pytest.mark.parametrize('path', ['missing.js', '../settings.py', 'style.css'])
+    def test_not_found(self, client, frontend_dir, path):
+        """Тест отсутствующих файлов и выхода за пределы каталога."""
+        assert client.get(f'/frontend/{path}').status_code == 404
+    
+    @pytest.mark.parametrize('path', [
+        'nginx.conf', 'Dockerfile', 'package.json', 'tests/app.test.js', 'app.js.gz', 'nginx.0123456789ab.conf',
+    ])
+    def test_only_public_files_served(self, client, frontend_dir, path):
+        """Тест что файлы вне списка FRONTEND_PUBLIC_FILES не отдаются."""
+        (frontend_dir / 'tests').mkdir()
+        for name in ('nginx.conf', 'Dockerfile', 'package.json', 'tests/app.test.js', 'app.js.gz'):
+            (frontend_dir / name).write_bytes(b'secret')
+        
+        assert client.get(f'/frontend/{path}').status_code == 404
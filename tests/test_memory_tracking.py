@@ -0,0 +1,101 @@
+"""
+Тесты учета памяти запросов через tracemalloc.
+Покрывают выборку, сводку по view, метрику пика и страницу админки.
+"""
+
+import tracemalloc
+
+import pytest
+from django.urls import reverse
+
+from telecom_backend import memory
+from tests.factories import EquipmentFactory, EquipmentTypeFactory
+
+
+@pytest.fixture
+def memory_cache(settings):
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'memory-tracking-tests',
+        }
+    }
+    memory.clear()
+    yield
+    memory.clear()
+
+
+def peak_count(view):
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value('http_request_peak_memory_bytes_count', {'view': view}) or 0
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures('memory_cache')
+class TestMemoryTrackingMiddleware:
+    """Тесты MemoryTrackingMiddleware."""
+    
+    def test_records_peak_and_sites_per_view(self, authenticated_client, settings):
+        """Тест сводки по view после замеренных запросов."""
+        settings.MEMORY_TRACKING_SAMPLE_RATE = 1
+        EquipmentFactory.create_batch(30)
+        before = peak_count('equipment-list-create')
+        
+        for _ in range(2):
+            authenticated_client.get(reverse('equipment:equipment-list-create'), {'page_size': 30})
+        
+        summary, = memory.get_summaries()
+        assert summary['view'] == 'equipment-list-create'
+        assert summary['samples'] == 2
+        assert summary['peak_max'] >= summary['peak_avg'] > 0
+        assert 0 < len(summary['top_sites']) <= settings.MEMORY_TRACKING_TOP_SITES
+        assert peak_count('equipment-list-create') == before + 2
+        assert not tracemalloc.is_tracing()
+    
+    def test_bulk_create_is_larger(self, authenticated_client, settings):
+        """Тест что пик массового создания растет с числом номеров."""
+        settings.MEMORY_TRACKING_SAMPLE_RATE = 1
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNNNN')
+        url = reverse('equipment:equipment-list-create')
+        
+        authenticated_client.post(url, {
+            'equipment_type': equipment_type.id, 'serial_numbers': ['000001']
+        }, format='json')
+        small = memory.get_summaries()[0]['peak_max']
+        authenticated_client.post(url, {
+            'equipment_type': equipment_type.id, 'serial_numbers': [f'{n:06d}' for n in range(2, 2002)]
+        }, format='json')
+        
+        assert memory.get_summaries()[0]['peak_max'] > small
+    
+    def test_disabled_by_default(self, authenticated_client):
+        """Тест что без MEMORY_TRACKING_SAMPLE_RATE замеров нет."""
+        authenticated_client.get(reverse('equipment:equipment-list-create'))
+        
+        assert memory.get_summaries() == []
+    
+    def test_skips_when_already_tracing(self, authenticated_client, settings):
+        """Тест что внешний запуск tracemalloc не прерывается."""
+        settings.MEMORY_TRACKING_SAMPLE_RATE = 1
+        tracemalloc.start()
+        try:
+            authenticated_client.get(reverse('equipment:equipment-list-create'))
+            assert tracemalloc.is_tracing()
+        finally:
+            tracemalloc.stop()
+        
+        assert memory.get_summaries() == []
+    
+    def test_admin_page(self, client, admin_user, authenticated_client, settings):
+        """Тест страницы сводки в админке и ее очистки."""
+        settings.MEMORY_TRACKING_SAMPLE_RATE = 1
+        authenticated_client.get(reverse('equipment:equipment-list-create'))
+        settings.MEMORY_TRACKING_SAMPLE_RATE = 0
+        client.force_login(admin_user)
+        
+        page = client.get(reverse('memory-usage'))
+        client.post(reverse('memory-usage'))
+        
+        assert page.status_code == 200
+        assert 'equipment-list-create' in page.content.decode()
+        assert memory.get_summaries() == []
@@ -0,0 +1,159 @@
+"""
+Тесты метрик Prometheus.
+Покрывают endpoint /metrics, метрики запросов и сериализатора и сбор по процессам.
+"""
+
+import asyncio
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from django.urls import reverse
+from prometheus_client.parser import text_string_to_metric_families
+
+from telecom_backend import metrics
+from tests.factories import EquipmentTypeFactory
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def sample(name, **labels):
+    """Текущее значение метрики в реестре процесса."""
+    from prometheus_client import REGISTRY
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def parse(content):
+    return {
+        (family_sample.name, tuple(sorted(family_sample.labels.items()))): family_sample.value
+        for family in text_string_to_metric_families(content.decode())
+        for family_sample in family.samples
+    }
+
+
+@pytest.mark.django_db
+class TestMetricsEndpoint:
+    """Тесты /metrics и метрик запросов."""
+    
+    def test_request_metrics_by_url_name(self, authenticated_client, client, settings):
+        """Тест гистограмм длительности и SQL запросов по имени URL."""
+        labels = {'view': 'equipment-list-create', 'method': 'GET'}
+        before = sample('http_request_duration_seconds_count', **labels)
+        queries_before = sample('http_request_db_queries_sum', view='equipment-list-create')
+        
+        authenticated_client.get(reverse('equipment:equipment-list-create'))
+        settings.METRICS_TOKEN = 'secret'
+        response = client.get('/metrics', headers={'Authorization': 'Bearer secret'})
+        
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        values = parse(response.content)
+        key = ('http_request_duration_seconds_count', tuple(sorted(labels.items())))
+        assert values[key] == before + 1
+        assert sample('http_request_db_queries_sum', view='equipment-list-create') > queries_before
+        assert sample('http_requests_total', status='200', **labels) >= 1
+    
+    def test_token(self, client, settings):
+        """Тест доступа по METRICS_TOKEN."""
+        settings.METRICS_TOKEN = 'secret'
+        
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+    
+    @pytest.mark.parametrize('debug', [False, True])
+    def test_disabled_without_token(self, client, settings, debug):
+        """Тест что без METRICS_TOKEN метрики закрыты независимо от DEBUG."""
+        settings.METRICS_TOKEN = ''
+        settings.DEBUG = debug
+        
+        assert client.get('/metrics').status_code == 404
+    
+    def test_bulk_create_and_mask_validation(self, authenticated_client):
+        """Тест размеров пакетов bulk_create и счетчиков проверки масок."""
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+        batches = sample('equipment_bulk_create_batch_size_sum', mode='create')
+        valid = sample('serial_mask_validations_total', result='valid')
+        invalid = sample('serial_mask_validations_total', result='invalid')
+        
+        authenticated_client.post(reverse('equipment:equipment-list-create'), {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['1111', '2222', '3333']
+        }, format='json')
+        authenticated_client.post(reverse('equipment:equipment-list-create'), {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['abcd']
+        }, format='json')
+        
+        assert sample('equipment_bulk_create_batch_size_sum', mode='create') == batches + 3
+        assert sample('serial_mask_validations_total', result='valid') == valid + 3
+        assert sample('serial_mask_validations_total', result='invalid') == invalid + 1
+    
+    def test_user_cache(self, authenticated_client, settings):
+        """Тест счетчиков попаданий в кэш пользователей."""
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': 'metrics-user-cache',
+            }
+        }
+        hits = sample('cache_requests_total', cache='user', result='hit')
+        misses = sample('cache_requests_total', cache='user', result='miss')
+        
+        for _ in range(3):
+            authenticated_client.get(reverse('equipment:equipment-detail', kwargs={'pk': 1}))
+        
+        assert sample('cache_requests_total', cache='user', result='miss') == misses + 1
+        assert sample('cache_requests_total', cache='user', result='hit') == hits + 2
+
+
+def test_password_hash_pool_gauges(monkeypatch, settings):
+    """Тест метрик глубины очереди и выполняющихся проверок пула паролей."""
+    from authentication import hashing
+
+    settings.AUTH_HASHING_WORKERS = 1
+    hashing.hashing_pool.shutdown()
+    release = threading.Event()
+
+    def blocking_verify(password, encoded):
+        release.wait(5)
+        return False, None
+
+    monkeypatch.setattr(hashing, '_verify', blocking_verify)
+
+    async def run():
+        tasks = [asyncio.create_task(hashing.hashing_pool.verify('x', 'encoded')) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        during = (sample('password_hash_queue_depth'), sample('password_hash_in_flight'))
+        release.set()
+        await asyncio.gather(*tasks)
+        return during
+
+    try:
+        assert asyncio.run(run()) == (3, 1)
+    finally:
+        hashing.hashing_pool.shutdown()
+    assert sample('password_hash_queue_depth') == 0
+    assert sample('password_hash_in_flight') == 0
+
+
+def test_multiprocess_aggregation(tmp_path):
+    """Тест суммирования значений нескольких процессов через каталог метрик."""
+    script = (
+        'from telecom_backend.metrics import BULK_CREATE_BATCH_SIZE, REQUESTS\n'
+        'BULK_CREATE_BATCH_SIZE.labels("create").observe(100)\n'
+        'REQUESTS.labels("equipment-stats", "GET", "200").inc()\n'
+    )
+    for _ in range(3):
+        subprocess.run(
+            [sys.executable, '-c', script],
+            cwd=ROOT, env={'PROMETHEUS_MULTIPROC_DIR': str(tmp_path), 'PATH': ''}, check=True
+        )
+    
+    values = parse(metrics.generate(str(tmp_path)))
+    
+    assert values[('equipment_bulk_create_batch_size_count', (('mode', 'create'),))] == 3
+    assert values[('equipment_bulk_create_batch_size_sum', (('mode', 'create'),))] == 300
+    key = ('http_requests_total', (('method', 'GET'), ('status', '200'), ('view', 'equipment-stats')))
+    assert values[key] == 3
@@ -0,0 +1,130 @@
+"""
+Тесты профилирования запросов по заголовку X-Profile.
+Покрывают доступ только для сотрудников, кольцевой буфер и скачивание в админке.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+from django.urls import reverse
+
+from telecom_backend.profiling import ProfileStore, SamplingProfiler, profile_store
+from tests.factories import EquipmentTypeFactory
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILE_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestRequestProfilingMiddleware:
+    """Тесты RequestProfilingMiddleware."""
+    
+    def test_staff_bulk_create_is_profiled(self, admin_client, profile_dir):
+        """Тест профиля массового создания оборудования сотрудником."""
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+        
+        response = admin_client.post(reverse('equipment:equipment-list-create'), {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['1111', '2222']
+        }, format='json', HTTP_X_PROFILE='1')
+        
+        assert response.status_code == 201
+        profile = profile_store.get(response['X-Profile-Id'])
+        assert profile['method'] == 'POST'
+        assert profile['user'] == 'admin'
+        assert profile['status'] == 201
+        assert any('INSERT INTO "equipment"' in query['sql'] for query in profile['sql'])
+        assert not any('1111' in query['sql'] + query['params'] for query in profile['sql'])
+    
+    def test_sql_params_redacted(self, admin_client, admin_user, profile_dir):
+        """Тест что значения параметров SQL не попадают в профиль."""
+        response = admin_client.get(
+            reverse('equipment:equipment-list-create'), {'search': 'secret-value'}, HTTP_X_PROFILE='1'
+        )
+        
+        profile = json.dumps(profile_store.get(response['X-Profile-Id']), ensure_ascii=False)
+        assert 'secret-value' not in profile
+        assert admin_user.password not in profile
+        assert (profile_dir.stat().st_mode & 0o777) == 0o700
+    
+    def test_regular_user_is_not_profiled(self, authenticated_client, profile_dir):
+        """Тест что заголовок обычного пользователя игнорируется."""
+        response = authenticated_client.get(reverse('equipment:equipment-list-create'), HTTP_X_PROFILE='1')
+        
+        assert response.status_code == 200
+        assert 'X-Profile-Id' not in response
+        assert not list(profile_dir.iterdir())
+    
+    def test_without_header(self, admin_client, profile_dir):
+        """Тест что без заголовка профиль не пишется."""
+        response = admin_client.get(reverse('equipment:equipment-list-create'))
+        
+        assert 'X-Profile-Id' not in response
+        assert not list(profile_dir.iterdir())
+    
+    def test_admin_list_and_download(self, client, admin_user, admin_client, profile_dir):
+        """Тест списка профилей и скачивания в админке."""
+        profile_id = admin_client.get(reverse('equipment:equipment-list-create'), HTTP_X_PROFILE='1')['X-Profile-Id']
+        client.force_login(admin_user)
+        
+        page = client.get(reverse('request-profiles'))
+        folded = client.get(reverse('request-profile-download', args=[profile_id, 'folded']))
+        data = client.get(reverse('request-profile-download', args=[profile_id, 'json']))
+        
+        assert page.status_code == 200
+        assert profile_id in page.content.decode()
+        assert folded.status_code == 200
+        assert folded['Content-Disposition'] == f'attachment; filename="profile-{profile_id}.folded"'
+        assert json.loads(data.content)['id'] == profile_id
+        assert client.get(reverse('request-profile-download', args=[profile_id, 'txt'])).status_code == 404
+    
+    def test_admin_requires_staff(self, client, regular_user, profile_dir):
+        """Тест что список профилей недоступен обычному пользователю."""
+        client.force_login(regular_user)
+        
+        response = client.get(reverse('request-profiles'))
+        
+        assert response.status_code == 302
+
+
+class TestProfileStore:
+    """Тесты кольцевого буфера профилей."""
+    
+    def test_keeps_latest_entries(self, tmp_path):
+        """Тест что хранятся только последние профили."""
+        store = ProfileStore(str(tmp_path), max_entries=3)
+        ids = []
+        for number in range(5):
+            profile_id = store.new_id()
+            store.save(profile_id, {'id': profile_id, 'number': number, 'folded': '', 'sql': []})
+            ids.append(profile_id)
+        
+        assert store.ids() == ids[:1:-1]
+        assert [profile['number'] for profile in store.list()] == [4, 3, 2]
+    
+    def test_rejects_foreign_ids(self, tmp_path):
+        """Тест что id вне формата не читается с диска."""
+        store = ProfileStore(str(tmp_path))
+        
+        assert store.get('../secret') is None
+
+
+def test_sampling_profiler_folded_stacks():
+    """Тест формата свернутых стеков."""
+    def busy_wait():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+    
+    with SamplingProfiler(threading.get_ident(), 0.001) as profiler:
+        busy_wait()
+    
+    assert profiler.samples > 0
+    stack, count = profiler.folded().splitlines()[0].rsplit(' ', 1)
+    assert int(count) > 0
+    assert 'busy_wait' in profiler.folded()
@@ -0,0 +1,229 @@
+"""
+Бюджеты SQL запросов для всех endpoint equipment и authentication.
+
+Каждый endpoint вызывается при 10, 100 и 1000 записях оборудования
+(типов, удаленных и архивных записей — по десятой части). Количество
+запросов не должно зависеть от объема данных и не должно превышать
+бюджет endpoint. При нарушении тест выводит diff нормализованного SQL
+между наименьшим объемом и объемом, на котором бюджет превышен.
+"""
+
+import difflib
+from dataclasses import dataclass
+from typing import Callable
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from equipment.models import ArchivedEquipment, Equipment, EquipmentType
+from telecom_backend.slow_queries import normalize_sql
+from tests.factories import EquipmentFactory, EquipmentTypeFactory, UserFactory
+
+SIZES = (10, 100, 1000)
+SERIAL_MASK = 'NNNNNNNNNN'
+PASSWORD = 'budget-pass-1'
+
+class Dataset:
+    """
+    Набор данных, наращиваемый до заданного числа записей оборудования.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.serial = 0
+        self.types = []
+        self.user = UserFactory(username='budget', password=PASSWORD)
+
+    def next_serial(self) -> str:
+        self.serial += 1
+        return f'{self.serial:010d}'
+
+    def grow(self, size: int) -> None:
+        count = size - self.size
+        new_types = EquipmentType.objects.bulk_create([
+            EquipmentType(name=f'Тип {len(self.types) + number}', serial_mask=SERIAL_MASK)
+            for number in range(max(1, count // 10))
+        ])
+        self.types.extend(new_types)
+
+        Equipment.objects.bulk_create([
+            Equipment(equipment_type=self.types[number % len(self.types)], serial_number=self.next_serial())
+            for number in range(count)
+        ])
+        Equipment.all_objects.bulk_create([
+            Equipment(equipment_type=self.types[0], serial_number=self.next_serial(), deleted_at=timezone.now())
+            for _ in range(count // 10)
+        ])
+        ArchivedEquipment.objects.bulk_create([
+            ArchivedEquipment(
+                id=10 ** 6 + self.serial,
+                equipment_type=self.types[0],
+                serial_number=self.next_serial(),
+                created_at=timezone.now(),
+                updated_at=timezone.now(),
+                deleted_at=timezone.now()
+            )
+            for _ in range(count // 10)
+        ])
+        self.size = size
+
+    def equipment(self, **kwargs) -> Equipment:
+        return EquipmentFactory(equipment_type=self.types[0], serial_number=self.next_serial(), **kwargs)
+
+    def archived(self) -> ArchivedEquipment:
+        return ArchivedEquipment.objects.filter(
+            serial_number__in=ArchivedEquipment.objects.values('serial_number')
+        ).exclude(id__in=Equipment.all_objects.values('id')).first()
+
+
+@dataclass
+class Endpoint:
+    name: str
+    budget: int
+    call: Callable
+    status: int = 200
+    # Подготовка объекта запроса вне замера, например создание удаляемой записи
+    target: Callable = lambda data: None
+
+    def __str__(self):
+        return self.name
+
+
+def equipment_url(name, *args):
+    return reverse(f'equipment:{name}', args=args)
+
+
+ENDPOINTS = [
+    Endpoint('equipment-list', 3, lambda client, data, target: client.get(
+        equipment_url('equipment-list-create'), {'page_size': 100})),
+    Endpoint('equipment-list-search', 3, lambda client, data, target: client.get(
+        equipment_url('equipment-list-create'), {'search': '00', 'ordering': 'serial_number'})),
+    Endpoint('equipment-list-filter', 4, lambda client, data, target: client.get(
+        equipment_url('equipment-list-create'),
+        {'equipment_type': data.types[0].id, 'serial_number_contains': '1', 'page': 'last'})),
+    Endpoint('equipment-create', 7, lambda client, data, target: client.post(
+        equipment_url('equipment-list-create'),
+        {'equipment_type': data.types[0].id, 'serial_numbers': [data.next_serial() for _ in range(5)]},
+        format='json'), status=201),
+    Endpoint('equipment-upsert', 7, lambda client, data, target: client.post(
+        equipment_url('equipment-list-create'),
+        {'equipment_type': data.types[0].id, 'serial_numbers': ['0000000001', data.next_serial()], 'upsert': True},
+        format='json')),
+    Endpoint('equipment-detail', 2, lambda client, data, target: client.get(
+        equipment_url('equipment-detail', target.pk)), target=lambda data: data.equipment()),
+    Endpoint('equipment-update', 6, lambda client, data, target: client.put(
+        equipment_url('equipment-detail', target.pk),
+        {'equipment_type': data.types[0].id, 'serial_number': data.next_serial(), 'note': 'бюджет'},
+        format='json'), target=lambda data: data.equipment()),
+    Endpoint('equipment-partial-update', 4, lambda client, data, target: client.patch(
+        equipment_url('equipment-detail', target.pk), {'note': 'бюджет'}, format='json'),
+        target=lambda data: data.equipment()),
+    Endpoint('equipment-delete', 3, lambda client, data, target: client.delete(
+        equipment_url('equipment-detail', target.pk)), target=lambda data: data.equipment()),
+    Endpoint('equipment-restore', 4, lambda client, data, target: client.post(
+        equipment_url('equipment-restore', target.pk)),
+        target=lambda data: data.equipment(deleted_at=timezone.now())),
+    Endpoint('equipment-restore-archived', 10, lambda client, data, target: client.post(
+        equipment_url('equipment-restore', target.pk)), target=lambda data: data.archived()),
+    Endpoint('equipment-bulk-update', 5, lambda client, data, target: client.patch(
+        equipment_url('equipment-bulk-update'),
+        {'filter': {'equipment_type': data.types[0].id}, 'note': 'бюджет'}, format='json')),
+    Endpoint('equipment-stats', 6, lambda client, data, target: client.get(equipment_url('equipment-stats'))),
+    Endpoint('equipment-type-list', 3, lambda client, data, target: client.get(
+        equipment_url('equipment-type-list'), {'page_size': 100})),
+    Endpoint('equipment-type-detail', 2, lambda client, data, target: client.get(
+        equipment_url('equipment-type-detail', data.types[0].pk))),
+    Endpoint('equipment-type-create', 3, lambda client, data, target: client.post(
+        equipment_url('equipment-type-list'),
+        {'name': f'Новый тип {data.next_serial()}', 'serial_mask': SERIAL_MASK}, format='json'), status=201),
+    Endpoint('equipment-type-update', 3, lambda client, data, target: client.patch(
+        equipment_url('equipment-type-detail', data.types[-1].pk), {'name': f'Тип {data.next_serial()}'},
+        format='json')),
+    Endpoint('equipment-type-delete', 5, lambda client, data, target: client.delete(
+        equipment_url('equipment-type-detail', target.pk)), status=204,
+        target=lambda data: EquipmentTypeFactory()),
+    Endpoint('user-login', 2, lambda client, data, target: client.post(
+        reverse('authentication:login'), {'username': 'budget', 'password': PASSWORD}, format='json')),
+    Endpoint('user-refresh', 3, lambda client, data, target: client.post(
+        reverse('authentication:refresh'), {'refresh': str(RefreshToken.for_user(data.user))}, format='json')),
+    Endpoint('user-profile', 1, lambda client, data, target: client.get(reverse('authentication:profile'))),
+]
+
+
+def budget_report(endpoint: Endpoint, captured: dict) -> str:
+    """
+    Формирует отчет о превышении бюджета с diff запросов.
+    """
+    counts = ', '.join(f'{size} строк: {len(queries)}' for size, queries in captured.items())
+    lines = [f'{endpoint.name}: бюджет {endpoint.budget} запросов, фактически {counts}']
+
+    baseline_size, baseline = next(iter(captured.items()))
+    for size, queries in captured.items():
+        if len(queries) > endpoint.budget or len(queries) != len(baseline):
+            lines.extend(difflib.unified_diff(
+                [normalize_sql(sql) for sql in baseline],
+                [normalize_sql(sql) for sql in queries],
+                fromfile=f'{baseline_size} строк',
+                tofile=f'{size} строк',
+                lineterm='',
+                n=1
+            ))
+            if len(queries) > endpoint.budget and len(queries) == len(baseline):
+                lines.append(f'Запросы при {size} строках:')
+                lines.extend(f'  {normalize_sql(sql)}' for sql in queries)
+            break
+    return '\n'.join(lines)
+
+
+@pytest.fixture
+def dataset(db):
+    return Dataset()
+
+
+@pytest.fixture
+def budget_client(dataset):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(dataset.user).access_token}')
+    return client
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('endpoint', ENDPOINTS, ids=str)
+def test_query_budget(endpoint, dataset, budget_client):
+    """Тест что количество запросов постоянно и укладывается в бюджет."""
+    captured = {}
+    for size in SIZES:
+        dataset.grow(size)
+        target = endpoint.target(dataset)
+        with CaptureQueriesContext(connection) as context:
+            response = endpoint.call(budget_client, dataset, target)
+        assert response.status_code == endpoint.status, response.content
+        captured[size] = [query['sql'] for query in context.captured_queries]
+
+    counts = {len(queries) for queries in captured.values()}
+    if len(counts) > 1 or max(counts) > endpoint.budget:
+        pytest.fail(budget_report(endpoint, captured), pytrace=False)
+
+
+def test_budget_report_shows_query_diff():
+    """Тест отчета: добавленные запросы видны в diff с нормализованными литералами."""
+    endpoint = Endpoint('example', 2, None)
+    captured = {
+        10: ['SELECT * FROM "equipment" WHERE "id" = 1'],
+        100: [
+            'SELECT * FROM "equipment" WHERE "id" = 1',
+            'SELECT COUNT(*) FROM "equipment" WHERE "equipment_type_id" = 7',
+            'SELECT COUNT(*) FROM "equipment" WHERE "equipment_type_id" = 8',
+        ],
+    }
+
+    report = budget_report(endpoint, captured)
+
+    assert 'бюджет 2 запросов, фактически 10 строк: 1, 100 строк: 3' in report
+    assert report.count('+SELECT COUNT(*) FROM "equipment" WHERE "equipment_type_id" = ?') == 2
+    assert normalize_sql("WHERE name = 'D''Link' AND id IN (1, 2, 3)") == 'WHERE name = ? AND id IN (...)'
@@ -0,0 +1,110 @@
+"""
+Тесты маршрутизации чтения на реплики.
+В тестах реплика — зеркало основной базы, поэтому маршрут проверяется
+по тому, через какое соединение прошли запросы.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from equipment.models import Equipment
+from telecom_backend.db.routers import PrimaryReplicaRouter
+from tests.factories import EquipmentFactory, EquipmentTypeFactory, UserFactory
+
+pytestmark = pytest.mark.django_db(transaction=True, databases=['default', 'replica1'])
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ['replica1']
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'replica-routing-tests',
+        }
+    }
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+def equipment_queries(alias, request):
+    with CaptureQueriesContext(connections[alias]) as ctx:
+        response = request()
+    return response, [q['sql'] for q in ctx.captured_queries if 'equipment' in q['sql']]
+
+
+class TestReplicaRouting:
+    """Тесты выбора базы для чтения."""
+    
+    url = reverse('equipment:equipment-list-create')
+    
+    def test_safe_requests_read_from_replica(self, replicas):
+        """Тест что список оборудования читается с реплики."""
+        EquipmentFactory()
+        client = client_for(UserFactory())
+        
+        response, replica_queries = equipment_queries('replica1', lambda: client.get(self.url))
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+        assert replica_queries
+    
+    def test_reads_stick_to_primary_after_write(self, replicas):
+        """Тест что после записи клиент читает из основной базы по cookie и по токену."""
+        user = UserFactory()
+        client = client_for(user)
+        equipment_type = EquipmentTypeFactory(serial_mask='NNNN')
+        
+        response = client.post(self.url, {
+            'equipment_type': equipment_type.id,
+            'serial_numbers': ['1234']
+        }, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        
+        _, replica_queries = equipment_queries('replica1', lambda: client.get(self.url))
+        assert replica_queries == []
+        
+        # Другой клиент того же пользователя без cookie закреплен через user_id токена
+        _, replica_queries = equipment_queries('replica1', lambda: client_for(user).get(self.url))
+        assert replica_queries == []
+        
+        _, replica_queries = equipment_queries('replica1', lambda: client_for(UserFactory()).get(self.url))
+        assert replica_queries
+    
+    def test_pin_expires(self, replicas, settings):
+        """Тест что закрепление снимается после REPLICA_STICKY_SECONDS."""
+        settings.REPLICA_STICKY_SECONDS = 0
+        client = client_for(UserFactory())
+        equipment = EquipmentFactory()
+        
+        client.delete(reverse('equipment:equipment-detail', kwargs={'pk': equipment.pk}))
+        
+        _, replica_queries = equipment_queries('replica1', lambda: client.get(self.url))
+        assert replica_queries
+    
+    def test_without_replicas_everything_on_default(self):
+        """Тест что без реплик маршрутизация не меняется."""
+        EquipmentFactory()
+        client = client_for(UserFactory())
+        
+        _, replica_queries = equipment_queries('replica1', lambda: client.get(self.url))
+        assert replica_queries == []
+    
+    def test_writes_go_to_primary(self, replicas):
+        """Тест что объект, прочитанный с реплики, сохраняется в основную базу."""
+        equipment = Equipment.objects.using('replica1').get(pk=EquipmentFactory().pk)
+        
+        assert PrimaryReplicaRouter().db_for_write(Equipment, instance=equipment) == 'default'
@@ -0,0 +1,71 @@
+"""
+Тесты middleware с пропуском сессии, CSRF и сообщений для stateless маршрутов.
+"""
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+
+from telecom_backend.middleware import is_stateless
+
+
+@pytest.mark.django_db
+class TestStatelessRoutes:
+    """Тесты маршрутизации middleware по префиксу пути."""
+    
+    def test_api_request_skips_session_and_messages(self, authenticated_client):
+        """Тест что API запрос обрабатывается без сессии и сообщений."""
+        response = authenticated_client.get(reverse('equipment:equipment-list-create'))
+        
+        assert response.status_code == 200
+        assert not hasattr(response.wsgi_request, 'session')
+        assert not hasattr(response.wsgi_request, '_messages')
+        assert 'csrftoken' not in response.cookies
+        assert 'Cookie' not in response.get('Vary', '')
+    
+    def test_api_ignores_session_login(self, client, admin_user):
+        """Тест что сессия админки не аутентифицирует запросы к API."""
+        client.force_login(admin_user)
+        
+        response = client.get(reverse('authentication:profile'))
+        
+        assert response.status_code == 401
+    
+    def test_api_post_without_csrf_token(self, admin_user, admin_client):
+        """Тест что JWT запрос с cookie сессии не требует CSRF токена."""
+        admin_client.force_login(admin_user)
+        admin_client.handler.enforce_csrf_checks = True
+        equipment_type_url = reverse('equipment:equipment-type-list')
+        
+        response = admin_client.post(equipment_type_url, {'name': 'CSRF', 'serial_mask': 'NNNN'}, format='json')
+        
+        assert response.status_code == 201
+    
+    def test_admin_keeps_session_and_csrf(self, admin_user):
+        """Тест что админка по-прежнему использует сессию и проверяет CSRF."""
+        client = Client(enforce_csrf_checks=True)
+        
+        page = client.get(reverse('admin:login'))
+        rejected = client.post(reverse('admin:login'), {'username': 'admin', 'password': 'admin123'})
+        
+        assert hasattr(page.wsgi_request, 'session')
+        assert hasattr(page.wsgi_request, '_messages')
+        assert 'csrftoken' in page.cookies
+        assert rejected.status_code == 403
+    
+    def test_admin_login_with_session(self, client, admin_user):
+        """Тест что вход по сессии в админку работает."""
+        client.force_login(admin_user)
+        
+        response = client.get(reverse('admin:index'))
+        
+        assert response.status_code == 200
+        assert response.wsgi_request.user == admin_user
+    
+    def test_prefixes_from_settings(self, rf, settings):
+        """Тест что список stateless префиксов берется из настроек."""
+        settings.STATELESS_PATH_PREFIXES = ['/api/']
+        
+        assert is_stateless(rf.get('/api/equipment/'))
+        assert not is_stateless(rf.get('/health/live/'))
+        assert not is_stateless(rf.get('/admin/'))
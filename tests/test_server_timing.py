@@ -0,0 +1,102 @@
+"""
+Тесты замера этапов запроса.
+Покрывают заголовок Server-Timing, структурный лог, выборку и вложенные этапы.
+"""
+
+import json
+import logging
+
+import pytest
+from django.urls import reverse
+
+from telecom_backend.timing import RequestTimer
+from tests.factories import EquipmentFactory
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for item in header.split(', '):
+        name, *params = item.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db
+class TestServerTimingMiddleware:
+    """Тесты ServerTimingMiddleware."""
+    
+    def test_equipment_list_phases(self, authenticated_client, settings):
+        """Тест этапов списка оборудования в заголовке."""
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        EquipmentFactory.create_batch(3)
+        
+        response = authenticated_client.get(reverse('equipment:equipment-list-create'))
+        
+        metrics = parse_server_timing(response['Server-Timing'])
+        for name in ('auth', 'filter', 'count', 'page', 'serialize', 'render', 'db', 'total'):
+            assert float(metrics[name]['dur']) >= 0
+        # Пользователь, count и страница
+        assert metrics['db']['desc'] == '"3 queries"'
+    
+    def test_structured_log(self, authenticated_client, settings, caplog):
+        """Тест строки JSON в логе."""
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        EquipmentFactory.create_batch(2)
+        
+        with caplog.at_level(logging.INFO, logger='telecom_backend.timing'):
+            authenticated_client.get(reverse('equipment:equipment-list-create'), {'page_size': 5})
+        
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['view'] == 'equipment:equipment-list-create'
+        assert record['status'] == 200
+        assert record['db_queries'] == 3
+        assert set(record['phases_ms']) >= {'auth', 'filter', 'count', 'page', 'serialize', 'render'}
+    
+    def test_not_sampled(self, authenticated_client, settings, caplog):
+        """Тест что вне выборки заголовок и лог не пишутся."""
+        settings.SERVER_TIMING_SAMPLE_RATE = 0
+        
+        with caplog.at_level(logging.INFO, logger='telecom_backend.timing'):
+            response = authenticated_client.get(reverse('equipment:equipment-list-create'))
+        
+        assert 'Server-Timing' not in response
+        assert not caplog.records
+    
+    def test_create_not_broken(self, authenticated_client, settings):
+        """Тест что разметка не мешает созданию через сериализатор с data."""
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        equipment = EquipmentFactory()
+        
+        response = authenticated_client.patch(
+            reverse('equipment:equipment-detail', kwargs={'pk': equipment.pk}),
+            {'note': 'новое'},
+            format='json'
+        )
+        
+        assert response.status_code == 200
+        assert 'auth' in parse_server_timing(response['Server-Timing'])
+
+
+class TestRequestTimer:
+    """Тесты RequestTimer."""
+    
+    def test_nested_phases_are_exclusive(self, monkeypatch):
+        """Тест что вложенный этап не учитывается во внешнем."""
+        ticks = iter([0.0, 1.0, 3.0, 4.0])
+        monkeypatch.setattr('telecom_backend.timing.time.perf_counter', lambda: next(ticks))
+        timer = RequestTimer.__new__(RequestTimer)
+        timer.phases, timer._children = {}, []
+        
+        with timer.phase('page'):
+            with timer.phase('count'):
+                pass
+        
+        assert timer.phases == {'count': 2.0, 'page': 2.0}
+    
+    def test_header(self):
+        """Тест формата заголовка."""
+        timer = RequestTimer()
+        timer.record('auth', 0.0015)
+        timer.queries, timer.sql_time = 2, 0.004
+        
+        assert timer.header(0.01) == 'auth;dur=1.50, db;dur=4.00;desc="2 queries", total;dur=10.00'
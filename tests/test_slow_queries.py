@@ -0,0 +1,163 @@
+"""
+Тесты журнала медленных SQL запросов.
+Покрывают порог, нормализацию, EXPLAIN для новых форм запросов,
+ротацию файла и страницу админки.
+"""
+
+import pytest
+from django.http import QueryDict
+from django.urls import reverse
+
+from telecom_backend.slow_queries import fingerprint, normalize_params, normalize_sql, slow_query_log
+from tests.factories import EquipmentFactory, EquipmentTypeFactory
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_QUERY_LOG_FILE = str(tmp_path / 'slow' / 'slow.log')
+    settings.SLOW_QUERY_THRESHOLD_MS = 0.000001
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'slow-query-tests',
+        }
+    }
+    from django.core.cache import cache
+    cache.clear()
+    yield slow_query_log
+    slow_query_log.clear()
+
+
+class TestNormalization:
+    """Тесты нормализации SQL и параметров."""
+    
+    def test_same_shape_same_fingerprint(self):
+        """Тест что значения и длина IN списка не влияют на отпечаток."""
+        first = 'SELECT * FROM "equipment" WHERE "id" IN (%s, %s) AND "note" = \'a\' LIMIT 21'
+        second = 'SELECT * FROM "equipment" WHERE "id" IN (%s, %s, %s) AND "note" = \'b\' LIMIT 5'
+        
+        assert normalize_sql(first) == 'SELECT * FROM "equipment" WHERE "id" IN (...) AND "note" = ? LIMIT ?'
+        assert fingerprint(first) == fingerprint(second)
+        assert fingerprint(first) != fingerprint('SELECT * FROM "equipment_types"')
+    
+    def test_params_keep_only_ordering_values(self):
+        """Тест что значения фильтров скрыты, а ordering сохранен."""
+        params = QueryDict('search=123&equipment_type=5&ordering=-created_at&note=')
+        
+        assert normalize_params(params) == 'equipment_type=?&ordering=-created_at&search=?'
+
+
+@pytest.mark.django_db
+class TestSlowQueryMiddleware:
+    """Тесты SlowQueryMiddleware."""
+    
+    def test_records_view_filters_and_explain_once(self, slow_log, authenticated_client):
+        """Тест записи с именем URL, фильтрами и EXPLAIN только при первой встрече."""
+        equipment_type = EquipmentTypeFactory()
+        EquipmentFactory.create_batch(3, equipment_type=equipment_type)
+        url = reverse('equipment:equipment-list-create')
+        
+        authenticated_client.get(url, {'equipment_type': equipment_type.id, 'ordering': 'serial_number'})
+        authenticated_client.get(url, {'equipment_type': equipment_type.id, 'ordering': 'serial_number'})
+        
+        entries = [entry for entry in slow_log.entries() if entry['view'] == 'equipment-list-create']
+        page_queries = [entry for entry in entries if 'ORDER BY' in entry['sql'] and 'LIMIT' in entry['sql']]
+        assert len(page_queries) == 2
+        assert page_queries[0]['filters'] == 'equipment_type=?&ordering=serial_number'
+        assert page_queries[0]['method'] == 'GET'
+        assert page_queries[0]['explain']
+        assert 'explain' not in page_queries[1]
+        assert page_queries[0]['fingerprint'] == page_queries[1]['fingerprint']
+    
+    def test_explain_skipped_for_writes(self, slow_log, authenticated_client):
+        """Тест что EXPLAIN выполняется только для SELECT."""
+        equipment = EquipmentFactory()
+        
+        authenticated_client.patch(
+            reverse('equipment:equipment-detail', args=[equipment.id]), {'note': 'x'}, format='json'
+        )
+        
+        updates = [entry for entry in slow_log.entries() if entry['sql'].startswith('UPDATE')]
+        assert updates
+        assert all('explain' not in entry for entry in updates)
+    
+    def test_fast_queries_not_logged(self, slow_log, authenticated_client, settings):
+        """Тест что запросы быстрее порога не записываются."""
+        settings.SLOW_QUERY_THRESHOLD_MS = 60000
+        
+        authenticated_client.get(reverse('equipment:equipment-list-create'))
+        
+        assert slow_log.entries() == []
+    
+    def test_disabled_by_zero_threshold(self, slow_log, authenticated_client, settings):
+        """Тест что порог 0 отключает журнал."""
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        
+        authenticated_client.get(reverse('equipment:equipment-list-create'))
+        
+        assert slow_log.entries() == []
+
+
+@pytest.mark.django_db
+class TestSlowQueryLog:
+    """Тесты файла журнала и группировки."""
+    
+    def test_groups_by_fingerprint(self, slow_log, authenticated_client):
+        """Тест что запросы одной формы с разными значениями попадают в одну группу."""
+        first, second = EquipmentFactory.create_batch(2)
+        for equipment in (first, second):
+            authenticated_client.get(reverse('equipment:equipment-detail', args=[equipment.id]))
+        
+        groups = [group for group in slow_log.groups() if dict(group['views']).get('equipment-detail')]
+        detail_group = next(group for group in groups if 'FROM "equipment"' in group['sql'])
+        assert detail_group['count'] == 2
+        assert detail_group['views'] == [('equipment-detail', 2)]
+        assert detail_group['explain']
+        assert detail_group['max_ms'] >= detail_group['avg_ms'] > 0
+    
+    def test_rotation_keeps_backups_readable(self, slow_log, settings):
+        """Тест что записи читаются из всех файлов после ротации."""
+        settings.SLOW_QUERY_LOG_MAX_BYTES = 500
+        settings.SLOW_QUERY_LOG_BACKUPS = 3
+        slow_log.clear()
+        
+        for number in range(6):
+            slow_log.write({
+                'time': number, 'duration_ms': 1.0, 'alias': 'default', 'fingerprint': 'f',
+                'sql': 'SELECT ' + 'x' * 200, 'view': 'v', 'method': 'GET', 'filters': '',
+            })
+        
+        times = [entry['time'] for entry in slow_log.entries()]
+        assert len(slow_log.files()) > 1
+        assert times == sorted(times)
+        assert times[-1] == 5
+    
+    def test_log_is_private(self, slow_log, tmp_path):
+        """Тест что каталог и файл журнала доступны только владельцу."""
+        slow_log.clear()
+        slow_log.write({'time': 0, 'duration_ms': 1.0, 'sql': 'SELECT 1'})
+        
+        assert ((tmp_path / 'slow').stat().st_mode & 0o777) == 0o700
+        assert ((tmp_path / 'slow' / 'slow.log').stat().st_mode & 0o777) == 0o600
+    
+    def test_admin_page(self, slow_log, client, admin_user, authenticated_client, settings):
+        """Тест страницы журнала в админке и его очистки."""
+        authenticated_client.get(reverse('equipment:equipment-list-create'), {'search': '1'})
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        client.force_login(admin_user)
+        
+        page = client.get(reverse('slow-queries'))
+        client.post(reverse('slow-queries'))
+        
+        assert page.status_code == 200
+        assert 'equipment-list-create' in page.content.decode()
+        assert 'search=?' in page.content.decode()
+        assert slow_log.entries() == []
+    
+    def test_admin_page_requires_staff(self, client, regular_user):
+        """Тест что страница доступна только сотрудникам."""
+        client.force_login(regular_user)
+        
+        response = client.get(reverse('slow-queries'))
+        
+        assert response.status_code == 302
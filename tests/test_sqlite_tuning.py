@@ -0,0 +1,88 @@
+"""
+Тесты режима SQLite для однонодового production.
+"""
+
+import pytest
+from django.db import OperationalError, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+from telecom_backend.db.sqlite import retry_on_locked
+
+
+@pytest.fixture
+def tuned_settings(settings):
+    settings.SQLITE_PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 1234}
+    settings.SQLITE_WRITE_RETRY_DELAY = 0
+    return settings
+
+
+@pytest.mark.django_db
+class TestPragmas:
+    """Тесты прагм нового соединения."""
+    
+    def test_pragmas_applied_to_file_database(self, tuned_settings, tmp_path):
+        """Тест что прагмы применяются к файловой базе."""
+        wrapper = DatabaseWrapper({
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(tmp_path / 'tuned.sqlite3'),
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE'}, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False,
+            'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False, 'TIME_ZONE': None, 'TEST': {},
+        }, alias='tuned')
+        try:
+            with wrapper.cursor() as cursor:
+                assert cursor.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+                assert cursor.execute('PRAGMA synchronous').fetchone() == (1,)
+                assert cursor.execute('PRAGMA busy_timeout').fetchone() == (1234,)
+        finally:
+            wrapper.close()
+
+
+class TestRetryOnLocked:
+    """Тесты повтора заблокированной записи."""
+    
+    def make_flaky(self, failures, message='database is locked'):
+        calls = []
+        
+        def write():
+            calls.append(1)
+            if len(calls) <= failures:
+                raise OperationalError(message)
+            return 'ok'
+        
+        return write, calls
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_retries_until_success(self, tuned_settings):
+        """Тест что запись повторяется до успеха."""
+        write, calls = self.make_flaky(2)
+        
+        assert retry_on_locked(write)() == 'ok'
+        assert len(calls) == 3
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_gives_up_after_retries(self, tuned_settings):
+        """Тест что после исчерпания попыток ошибка пробрасывается."""
+        tuned_settings.SQLITE_WRITE_RETRIES = 2
+        write, calls = self.make_flaky(10)
+        
+        with pytest.raises(OperationalError):
+            retry_on_locked(write)()
+        assert len(calls) == 3
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_other_errors_not_retried(self, tuned_settings):
+        """Тест что прочие ошибки не повторяются."""
+        write, calls = self.make_flaky(1, message='no such table: x')
+        
+        with pytest.raises(OperationalError):
+            retry_on_locked(write)()
+        assert len(calls) == 1
+    
+    @pytest.mark.django_db(transaction=True)
+    def test_not_retried_inside_outer_transaction(self, tuned_settings):
+        """Тест что внутри внешней транзакции повтора нет."""
+        write, calls = self.make_flaky(1)
+        
+        with pytest.raises(OperationalError):
+            with transaction.atomic():
+                retry_on_locked(write)()
+        assert len(calls) == 1
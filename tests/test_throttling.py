@@ -0,0 +1,174 @@
+"""
+Тесты ограничения частоты запросов.
+Покрывают корзину токенов, выбор области ограничения и заголовок Retry-After.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+
+from telecom_backend.throttling import TokenBucketThrottle
+from tests.factories import UserFactory
+
+
+@pytest.fixture
+def throttle_cache(settings):
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'throttle-tests',
+        }
+    }
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+@pytest.fixture
+def rates(settings):
+    def set_rates(**scopes):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                **scopes,
+            },
+        }
+    return set_rates
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Тесты алгоритма корзины токенов."""
+    
+    @pytest.fixture
+    def make_throttle(self, rates):
+        def make(rate, clock):
+            class Throttle(TokenBucketThrottle):
+                scope = 'test'
+                timer = clock
+            
+            rates(test=rate)
+            return Throttle()
+        return make
+    
+    def test_burst_then_refill(self, throttle_cache, make_throttle):
+        """Тест что после исчерпания корзины токены восстанавливаются со временем."""
+        clock = FakeClock()
+        throttle = make_throttle('3/min', clock)
+        
+        assert [throttle.consume('k') for _ in range(4)] == [True, True, True, False]
+        assert throttle.wait() == pytest.approx(20)
+        
+        clock.now += 20
+        assert throttle.consume('k')
+        assert not throttle.consume('k')
+    
+    def test_idle_does_not_exceed_burst(self, throttle_cache, make_throttle):
+        """Тест что простой не накапливает больше burst токенов."""
+        clock = FakeClock()
+        throttle = make_throttle('3/min', clock)
+        throttle.consume('k')
+        
+        clock.now += 3600
+        assert [throttle.consume('k') for _ in range(4)] == [True, True, True, False]
+    
+    def test_new_bucket_keeps_concurrent_count(self, throttle_cache, make_throttle):
+        """Тест что создание корзины не обнуляет токены, уже списанные другим воркером."""
+        throttle = make_throttle('1/min', FakeClock())
+        throttle_cache.set('k:count', 1)
+        
+        assert not throttle.consume('k')
+    
+    def test_cache_error_fails_open(self, throttle_cache, make_throttle, monkeypatch):
+        """Тест что ошибка кэша пропускает запрос, а не превращается в 500."""
+        throttle = make_throttle('1/min', FakeClock())
+        
+        def unavailable(*args, **kwargs):
+            raise ConnectionError('cache unavailable')
+        
+        monkeypatch.setattr(throttle_cache, 'add', unavailable)
+        
+        assert all(throttle.consume('k') for _ in range(3))
+    
+    def test_cache_without_incr_fails_open(self, make_throttle):
+        """Тест что без рабочего кэша запросы не блокируются."""
+        throttle = make_throttle('1/min', FakeClock())
+        
+        assert all(throttle.consume('k') for _ in range(5))
+
+
+@pytest.mark.django_db
+@pytest.mark.api
+class TestThrottledEndpoints:
+    """Тесты ограничений на endpoints."""
+    
+    def test_login_throttled_by_ip(self, api_client, throttle_cache, rates):
+        """Тест ограничения попыток входа с заголовком Retry-After."""
+        rates(login='2/min')
+        url = reverse('authentication:login')
+        
+        for _ in range(2):
+            response = api_client.post(url, {'username': 'x', 'password': 'y'}, format='json')
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        
+        response = api_client.post(url, {'username': 'x', 'password': 'y'}, format='json')
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert int(response['Retry-After']) > 0
+    
+    def test_login_ignores_spoofed_forwarded_for(self, api_client, throttle_cache, rates, settings):
+        """Тест что подмена X-Forwarded-For не обходит ограничение входа."""
+        rates(login='2/min')
+        settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1}
+        url = reverse('authentication:login')
+        
+        statuses = [
+            api_client.post(
+                url, {'username': 'x', 'password': 'y'}, format='json',
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{number}, 192.0.2.1'
+            ).status_code
+            for number in range(3)
+        ]
+        
+        assert statuses[-1] == status.HTTP_429_TOO_MANY_REQUESTS
+    
+    def test_search_has_separate_bucket(self, authenticated_client, throttle_cache, rates):
+        """Тест что поиск ограничивается отдельно от обычного чтения."""
+        rates(search='1/min', read='100/min')
+        url = reverse('equipment:equipment-list-create')
+        
+        assert authenticated_client.get(url, {'search': 'abc'}).status_code == status.HTTP_200_OK
+        assert authenticated_client.get(url, {'search': 'abc'}).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert authenticated_client.get(url).status_code == status.HTTP_200_OK
+    
+    def test_buckets_are_per_user(self, api_client, throttle_cache, rates):
+        """Тест что у каждого пользователя своя корзина."""
+        rates(read='1/min')
+        url = reverse('equipment:equipment-list-create')
+        first, second = UserFactory(), UserFactory()
+        
+        api_client.force_authenticate(first)
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+        assert api_client.get(url).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        
+        api_client.force_authenticate(second)
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+    
+    def test_bulk_write_throttled(self, authenticated_client, throttle_cache, rates):
+        """Тест ограничения массового обновления."""
+        rates(bulk_write='1/min')
+        url = reverse('equipment:equipment-bulk-update')
+        
+        first = authenticated_client.patch(url, {'ids': [999999], 'note': 'x'}, format='json')
+        second = authenticated_client.patch(url, {'ids': [999999], 'note': 'x'}, format='json')
+        
+        assert first.status_code != status.HTTP_429_TOO_MANY_REQUESTS
+        assert second.status_code == status.HTTP_429_TOO_MANY_REQUESTS
@@ -0,0 +1,70 @@
+"""
+Тесты прогрева процесса и readiness endpoint.
+"""
+
+import pytest
+from django.urls import reverse
+
+from equipment.models import compile_serial_mask
+from telecom_backend import warmup
+from tests.factories import EquipmentTypeFactory
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    warmup.reset()
+    yield
+    warmup.reset()
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica1'])
+class TestWarmup:
+    """Тесты прогрева."""
+    
+    def test_not_ready_before_warmup(self, client):
+        """Тест что до прогрева readiness отвечает 503."""
+        response = client.get(reverse('readiness'))
+        
+        assert response.status_code == 503
+        assert response.json()['status'] == 'warming_up'
+        assert client.get(reverse('liveness')).status_code == 200
+    
+    def test_ready_after_warmup(self, client):
+        """Тест прогрева масок и готовности после него."""
+        EquipmentTypeFactory(serial_mask='NNAAXX')
+        EquipmentTypeFactory(serial_mask='NNAAXX')
+        EquipmentTypeFactory(serial_mask='ZZZNN')
+        compile_serial_mask.cache_clear()
+        
+        state = warmup.warm_up()
+        
+        assert state['ready']
+        assert state['serial_masks'] == 2
+        assert compile_serial_mask.cache_info().currsize == 2
+        
+        response = client.get(reverse('readiness'))
+        assert response.status_code == 200
+        assert response.json()['status'] == 'ready'
+    
+    def test_failed_warmup_not_ready(self, monkeypatch):
+        """Тест что ошибка прогрева оставляет воркер неготовым."""
+        def fail():
+            raise RuntimeError('база недоступна')
+        monkeypatch.setattr(warmup, 'open_connections', fail)
+        
+        state = warmup.warm_up()
+        
+        assert not state['ready']
+        assert state['error'] == 'база недоступна'
+    
+    def test_readiness_hides_error(self, client, monkeypatch):
+        """Тест что readiness не раскрывает текст ошибки прогрева."""
+        def fail():
+            raise RuntimeError("Access denied for user 'telecom_user'@'10.0.0.5'")
+        monkeypatch.setattr(warmup, 'open_connections', fail)
+        warmup.warm_up()
+        
+        response = client.get(reverse('readiness'))
+        
+        assert response.status_code == 503
+        assert response.json() == {'status': 'failed'}